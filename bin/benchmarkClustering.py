@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import sys
+import numpy as np
+
+# sys.path.insert(0,'') Uncomment and insert COFL root directory if necessary
+
+######################################
+
+### Imports from software modules
+from cofl.etc.configuration import NM_TO_M
+from cofl.etc.eSO6DataFields import SEGMENT_LAT_INIT, SEGMENT_LON_INIT, SEGMENT_TRACK, QOF_ESO6_FIELDS
+from cofl.lib.clusterSets import initClusterSets
+from cofl.lib.clustering import fifo
+from cofl.lib.neighbourSets import initNeighbourSets
+from cofl.lib.physics import convertMinuteDecimalToDregrees, calculateDistanceBetweenPoints, checkTracks
+######################################
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+RADIUS = 20 ## Clustering radius [NM]
+SPACING = 0.25 ## Latitude between consecutive flights of a chain [degrees], 15 NM: only consecutive flights are within RADIUS
+
+def chainPositions(order):
+
+	"""
+	Positions of flights along a meridian, order: flights from south to north
+	Consecutive flights are within RADIUS and flights two apart are not, A-B and B-C match while A-C does not
+	"""
+	vehiclesPosition = {}
+	for k, flight in enumerate(order):
+		vehiclesPosition[flight] = np.zeros(QOF_ESO6_FIELDS)
+		vehiclesPosition[flight][SEGMENT_LAT_INIT] = (45.0+k*SPACING)*60
+		vehiclesPosition[flight][SEGMENT_LON_INIT] = 0.0
+		vehiclesPosition[flight][SEGMENT_TRACK] = 0.0
+	return vehiclesPosition
+
+def listsFifo(vehiclesPosition, cruiseFlights):
+
+	"""
+	Clusters of the previous fifo, lists of the flights matching each flight propagated from the master flight
+	Returns {flight: cluster}
+	"""
+	clusters = dict((flight, []) for flight in cruiseFlights)
+	clusteredFlights = []
+	radius = float(RADIUS)*NM_TO_M
+	for flight in cruiseFlights:
+		if len(clusters[flight]) == 0 and flight not in clusteredFlights:
+			lat1, lon1 = convertMinuteDecimalToDregrees([vehiclesPosition[flight][SEGMENT_LAT_INIT], vehiclesPosition[flight][SEGMENT_LON_INIT]])
+			for otherFlight in filter(lambda otherFlight: otherFlight!=flight, cruiseFlights):
+				lat2, lon2 = convertMinuteDecimalToDregrees([vehiclesPosition[otherFlight][SEGMENT_LAT_INIT], vehiclesPosition[otherFlight][SEGMENT_LON_INIT]])
+				if calculateDistanceBetweenPoints(lat1,lon1,lat2,lon2) <= radius and checkTracks(float(vehiclesPosition[flight][SEGMENT_TRACK]),float(vehiclesPosition[otherFlight][SEGMENT_TRACK])):
+					if len(clusters[flight]) == 0: clusters[flight].append(flight)
+					clusteredFlights.append(flight)
+					clusters[flight].append(otherFlight)
+					if len(clusters[otherFlight]) > 1:
+						for f in clusters[otherFlight]:
+							if f not in clusters[flight]: clusters[flight].append(f)
+					clusteredFlights.append(otherFlight)
+	for flight in clusters:
+		for otherFlight in filter(lambda otherFlight: otherFlight!=flight, clusters[flight]): clusters[otherFlight]=clusters[flight]
+	return dict((flight, sorted(set(clusters[flight]))) for flight in clusters)
+
+def setsFifo(vehiclesPosition, cruiseFlights):
+
+	"""
+	Clusters of lib/clustering fifo over the cluster and neighbour sets of the network manager
+	Returns {flight: cluster}
+	"""
+	clusters, clusteredFlights, setClusters = fifo(dict((flight, []) for flight in cruiseFlights), vehiclesPosition, cruiseFlights, RADIUS, 0, initClusterSets(cruiseFlights), initNeighbourSets())
+	return clusters
+
+def isSymmetric(clusters):
+
+	"""
+	True when every clustered flight has the same cluster as all its members
+	"""
+	return all(clusters[otherFlight] == clusters[flight] for flight in clusters for otherFlight in clusters[flight])
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def main():
+
+	"""
+	Cluster membership of the previous and current fifo on chains of flights, A-B and B-C within radius while A-C is not
+	benchmarkClustering.py
+	The previous per flight lists were not symmetric on chains, a flight missed members that listed it and hprcFly waited
+	on them forever. Fails when a current cluster is not the whole chain
+	"""
+	failed = False
+	print('Chain\tFlight\tPrevious cluster\tCurrent cluster')
+	for order in [[1,2,3], [1,2,3,4], [2,1,3,4], [1,3,2,4], [4,3,2,1,5], [1,2,3,4,5,6,7,8]]:
+		vehiclesPosition = chainPositions(order)
+		cruiseFlights = sorted(order)
+		listsClusters = listsFifo(vehiclesPosition, cruiseFlights)
+		setsClusters = setsFifo(vehiclesPosition, cruiseFlights)
+		chain = '-'.join(str(flight) for flight in order)
+		for flight in cruiseFlights:
+			print(chain+'\t'+str(flight)+'\t'+str(listsClusters[flight])+'\t'+str(setsClusters[flight]))
+			if setsClusters[flight] != cruiseFlights: failed = True
+		print(chain+'\tsymmetric\t'+str(isSymmetric(listsClusters))+'\t'+str(isSymmetric(setsClusters)))
+	if failed: print('Current clusters are not whole chains'); sys.exit(1)
+
+if __name__ == "__main__":
+
+	"""
+	Benchmark of fifo cluster membership on chains of flights
+	"""
+	main()
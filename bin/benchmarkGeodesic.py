@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import sys
+import numpy as np
+from time import time
+
+# sys.path.insert(0,'') Uncomment and insert COFL root directory if necessary
+
+######################################
+
+### Imports from software modules
+from cofl.etc.configuration import FAST_DISTANCE_ERROR
+from cofl.lib.physics import calculateDistancesBetweenPoints
+######################################
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def antipodalPoints(pairs, randomState):
+
+	"""
+	Returns lat1, lon1, lat2, lon2 [degrees] of points at or within a degree of their antipodes
+	The first pairs are exactly antipodal
+	"""
+	lat1 = randomState.uniform(-89.0, 89.0, pairs)
+	lon1 = randomState.uniform(-180.0, 180.0, pairs)
+	offsets = randomState.uniform(-1.0, 1.0, (2, pairs))
+	offsets[:, :pairs//10] = 0.0
+	lon2 = (lon1+360.0+offsets[1]) % 360.0-180.0
+	return lat1, lon1, -lat1+offsets[0], lon2
+
+def globalPoints(pairs, randomState):
+
+	"""
+	Returns lat1, lon1, lat2, lon2 [degrees] of points anywhere
+	"""
+	return randomState.uniform(-89.0, 89.0, pairs), randomState.uniform(-180.0, 180.0, pairs), randomState.uniform(-89.0, 89.0, pairs), randomState.uniform(-180.0, 180.0, pairs)
+
+def nearPoints(pairs, randomState):
+
+	"""
+	Returns lat1, lon1, lat2, lon2 [degrees] of points within a degree, as flights compared by clustering
+	"""
+	lat1 = randomState.uniform(-80.0, 80.0, pairs)
+	lon1 = randomState.uniform(-180.0, 180.0, pairs)
+	return lat1, lon1, lat1+randomState.uniform(-1.0, 1.0, pairs), lon1+randomState.uniform(-1.0, 1.0, pairs)
+
+def timeDistances(points, mode):
+
+	"""
+	Returns the wall time of one distance [s] and the distances of points in mode
+	"""
+	initT=time()
+	distances = calculateDistancesBetweenPoints(points[0], points[1], points[2], points[3], mode)
+	endT=time()
+	return (endT-initT)/len(points[0]), distances
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def main():
+
+	"""
+	Accuracy and per distance cost of fast distances against WGS84 geodesics
+	benchmarkGeodesic.py [pairs]
+	Fails when a fast distance is not finite or its relative error is over FAST_DISTANCE_ERROR
+	"""
+	pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+	randomState = np.random.RandomState(1)
+	failed = False
+	print('Points\tPairs\tExact [us/distance]\tFast [us/distance]\tMax relative error\tNot finite')
+	for name, points in [('near', nearPoints), ('global', globalPoints), ('antipodal', antipodalPoints)]:
+		points = points(pairs, randomState)
+		exactTime, exact = timeDistances(points, 'exact')
+		fastTime, fast = timeDistances(points, 'fast')
+		notFinite = int(np.sum(~np.isfinite(fast)))
+		finite = np.isfinite(fast) & (exact > 0)
+		maxError = float(np.max(np.abs(fast[finite]-exact[finite])/exact[finite])) if np.any(finite) else 0.0
+		print(name+'\t'+str(pairs)+'\t'+'%.2f' % (exactTime*1e6)+'\t'+'%.2f' % (fastTime*1e6)+'\t'+'%.2e' % maxError+'\t'+str(notFinite))
+		if notFinite > 0 or maxError > FAST_DISTANCE_ERROR: failed = True
+	if failed: print('Fast distances are over FAST_DISTANCE_ERROR'); sys.exit(1)
+
+if __name__ == "__main__":
+
+	"""
+	Benchmark of the fast distance approximation
+	"""
+	main()
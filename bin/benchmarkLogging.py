@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import os
+import sys
+import shutil
+import tempfile
+from time import time
+
+# sys.path.insert(0,'') Uncomment and insert COFL root directory if necessary
+
+######################################
+
+### Imports from software modules
+from cofl.etc.info import LOG_DBG, LOG_STD
+from cofl.lib.logging import DEBUG_LOG, closeLogs, logger
+######################################
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def appendLogger(logFile,rankMsg,linetype,line):
+
+	"""
+	Logging by opening, appending and closing the log file at every line
+	"""
+	log=open(logFile,'a')
+	log.write(linetype+' '+line+'\n')
+	log.close()
+	print(rankMsg+line)
+
+def bufferedLines(logFile, lines):
+
+	"""
+	Logging standard lines with lib/logging
+	"""
+	for k in range(lines): logger(logFile,'[Rank 1 msg]: ',LOG_STD,'Current time = '+str(k))
+	closeLogs()
+
+def debugLines(logFile, lines):
+
+	"""
+	Per timestep debug lines as written in the simulators, dropped out of debugging
+	"""
+	for k in range(lines):
+		if DEBUG_LOG: logger(logFile,'[Rank 1 msg]: ',LOG_DBG,'Current time = '+str(k))
+	closeLogs()
+
+def appendLines(logFile, lines):
+
+	"""
+	Logging standard lines by opening and closing the log file
+	"""
+	for k in range(lines): appendLogger(logFile,'[Rank 1 msg]: ',LOG_STD,'Current time = '+str(k))
+
+def timeLines(logLines, lines):
+
+	"""
+	Returns the wall time of one logged line [s], printed lines are discarded
+	"""
+	logFolder=tempfile.mkdtemp()
+	sys.stdout = open(os.devnull, "w")
+	try:
+		initT=time()
+		logLines(logFolder+'/1.log', lines)
+		endT=time()
+	finally:
+		sys.stdout.close()
+		sys.stdout = sys.__stdout__
+		shutil.rmtree(logFolder)
+	return (endT-initT)/lines
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def main():
+
+	"""
+	Per line cost of logging
+	benchmarkLogging.py [lines] [budget us/line]
+	Fails when a buffered standard line costs more than the budget
+	"""
+	lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+	budget = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+	appendTime = timeLines(appendLines, lines)
+	bufferedTime = timeLines(bufferedLines, lines)
+	debugTime = timeLines(debugLines, lines)
+	print('Open/append/close [us/line]\tBuffered [us/line]\tDebug line out of debugging [us/line]\tBudget [us/line]')
+	print('%.3f' % (appendTime*1e6)+'\t'+'%.3f' % (bufferedTime*1e6)+'\t'+'%.3f' % (debugTime*1e6)+'\t'+'%.3f' % budget)
+	if bufferedTime*1e6 > budget: print('Buffered logging is over budget'); sys.exit(1)
+
+if __name__ == "__main__":
+
+	"""
+	Benchmark of the logging overhead
+	"""
+	main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import sys
+import random
+from time import time
+from networkx import DiGraph, shortest_path_length
+
+# sys.path.insert(0,'') Uncomment and insert COFL root directory if necessary
+
+######################################
+
+### Imports from software modules
+from cofl.lib.network import addEdges, calculateGRC, calculateLRC, setNetwork
+######################################
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def networkxGRC(flights, clusters):
+
+	"""
+	GRC of a timestep through a networkx graph rebuilt from the clusters and a shortest paths search from every node
+	"""
+	aircraftNetwork = DiGraph()
+	aircraftNetwork.add_nodes_from(flights)
+	for flight in clusters:
+		for otherFlight in filter(lambda otherFlight: otherFlight!=flight, clusters[flight]): aircraftNetwork.add_edge(flight,otherFlight)
+	nodes = list(sorted(aircraftNetwork.nodes()))
+	qOfAircraft = aircraftNetwork.number_of_nodes() -1
+	LRC = []
+	for node in nodes:
+		shortestPathsFromNode = shortest_path_length(aircraftNetwork, source=node)
+		LRC.append(float(len(shortestPathsFromNode)-1)/float(qOfAircraft))
+	return calculateGRC(LRC)
+
+def simulateClusters(flightsQ, steps, cliques):
+
+	"""
+	Clusters of cruise flights along timesteps, every timestep a flight leaves its cluster and two flights form one
+	cliques: False, a flight of a cluster also drops the other members while they keep it, as when clusters overlap
+	Returns [(cruise flights, clusters)]
+	"""
+	random.seed(flightsQ)
+	flights = list(range(1,flightsQ+1))
+	clusters = dict((flight, []) for flight in flights)
+	unclustered = list(flights)
+	random.shuffle(unclustered)
+	while len(unclustered) > flightsQ*2/5:
+		cluster = [unclustered.pop() for k in range(random.randint(2,5))]
+		for flight in cluster: clusters[flight] = list(cluster)
+	timesteps = []
+	for step in range(steps):
+		flight = random.choice([flight for flight in flights if len(clusters[flight]) > 0])
+		members = clusters[flight]
+		cluster = [otherFlight for otherFlight in members if otherFlight != flight]
+		if len(cluster) == 1: cluster = [] ## A flight is not clustered alone
+		for otherFlight in members:
+			clusters[otherFlight] = list(cluster) if otherFlight in cluster else []
+			if len(clusters[otherFlight]) == 0: unclustered.append(otherFlight)
+		cluster = [unclustered.pop(random.randrange(len(unclustered))) for k in range(2)]
+		for otherFlight in cluster: clusters[otherFlight] = list(cluster)
+		stepClusters = dict((f, list(clusters[f])) for f in flights)
+		if not cliques:
+			flight = random.choice([flight for flight in flights if len(clusters[flight]) > 0])
+			stepClusters[flight] = [flight]
+		timesteps.append((flights, stepClusters))
+	return timesteps
+
+def timeGRC(timesteps, incremental):
+
+	"""
+	Returns the mean wall time of a timestep GRC [s] and the GRC of every timestep
+	"""
+	GRCs = []
+	aircraftNetwork = None
+	initT=time()
+	for flights, clusters in timesteps:
+		if incremental:
+			aircraftNetwork = setNetwork(flights, aircraftNetwork)
+			GRCs.append(calculateGRC(calculateLRC(addEdges(aircraftNetwork, clusters))))
+		else: GRCs.append(networkxGRC(flights, clusters))
+	endT=time()
+	return (endT-initT)/len(timesteps), GRCs
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def main():
+
+	"""
+	Per timestep GRC time of networkx and lib/network
+	benchmarkNetwork.py [timesteps]
+	Cruise flights from 16 to 4096, clusters are cliques or overlap. Fails when GRC values differ
+	"""
+	steps = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+	timeGRC(simulateClusters(16, steps, False), True) ## Warming up
+	print('Flights\tClusters\tnetworkx [ms/step]\tlib/network [ms/step]\tSpeedup')
+	for flightsQ in [16*pow(2,k) for k in range(9)]:
+		for cliques in [True, False]:
+			timesteps = simulateClusters(flightsQ, steps, cliques)
+			networkxTime, networkxGRCs = timeGRC(timesteps, False)
+			networkTime, networkGRCs = timeGRC(timesteps, True)
+			if networkxGRCs != networkGRCs: print('GRC values differ for '+str(flightsQ)+' flights'); sys.exit(1)
+			print(str(flightsQ)+'\t'+('cliques' if cliques else 'overlapping')+'\t'+'%.3f' % (networkxTime*1000)+'\t'+'%.3f' % (networkTime*1000)+'\t'+'%.1f' % (networkxTime/networkTime))
+
+if __name__ == "__main__":
+
+	"""
+	Benchmark of the aircraft network GRC
+	"""
+	main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import os
+import sys
+import shutil
+import tempfile
+from socket import gethostname
+from time import time
+
+# sys.path.insert(0,'') Uncomment and insert COFL root directory if necessary
+
+######################################
+
+### Imports from software modules
+from cofl.etc.eSO6DataFields import SEGMENT_DATE_INIT, SEGMENT_DATE_END, SEGMENT_TIME_INIT, SEGMENT_TIME_END
+from cofl.lib.folders import createFolders
+from cofl.lib.pctime import calculateInitAndEndTime, calculateSecFromEpoch
+######################################
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def shellStartup(trajectoriesFolder, flightsQ, workFolder):
+
+	"""
+	Startup file operations of one rank through shell commands (head, tail, hostname, mkdir)
+	"""
+	initTimes=[]
+	endTimes=[]
+	for rank in range(1,flightsQ+1):
+		trajFile=trajectoriesFolder+'/'+str(rank).zfill(len(str(flightsQ)))+'.eSo6'
+		firstLine=os.popen('head -1 '+trajFile).read().split()
+		endLine=os.popen('tail -1 '+trajFile).read().split()
+		initTimes.append(calculateSecFromEpoch(firstLine[SEGMENT_DATE_INIT],firstLine[SEGMENT_TIME_INIT]))
+		endTimes.append(calculateSecFromEpoch(endLine[SEGMENT_DATE_END],endLine[SEGMENT_TIME_END]))
+	hostname=os.popen('hostname').read()[0:-1]
+	os.popen('mkdir -p '+workFolder+'/shell').close()
+	return min(initTimes), max(endTimes), hostname
+
+def fileStartup(trajectoriesFolder, flightsQ, workFolder):
+
+	"""
+	Startup file operations of one rank in process
+	"""
+	initTime, endTime = calculateInitAndEndTime(trajectoriesFolder, flightsQ+1, flightsQ)
+	hostname=gethostname()
+	createFolders([workFolder+'/file'])
+	return initTime, endTime, hostname
+
+def timeStartup(startup, trajectoriesFolder, flightsQ, repetitions):
+
+	"""
+	Returns the mean wall time of one rank startup [s] and its result
+	"""
+	workFolder=tempfile.mkdtemp()
+	try:
+		initT=time()
+		for k in range(repetitions): result=startup(trajectoriesFolder, flightsQ, workFolder)
+		endT=time()
+	finally: shutil.rmtree(workFolder)
+	return (endT-initT)/repetitions, result
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def main():
+
+	"""
+	Per rank startup time of shell and in process file operations
+	benchmarkStartup.py <trajectories folder> <flights> [repetitions]
+	Every rank of a run performs these operations, a run of N flights multiplies them by N+1
+	"""
+	if len(sys.argv) < 3: print('### USAGE ###\nbenchmarkStartup.py <trajectories folder> <flights> [repetitions]'); sys.exit(0)
+	trajectoriesFolder=sys.argv[1]
+	flightsQ=int(sys.argv[2])
+	repetitions=int(sys.argv[3]) if len(sys.argv) > 3 else 5
+	shellTime, shellResult = timeStartup(shellStartup, trajectoriesFolder, flightsQ, repetitions)
+	fileTime, fileResult = timeStartup(fileStartup, trajectoriesFolder, flightsQ, repetitions)
+	if shellResult != fileResult: print('Startup results differ: '+str(shellResult)+' '+str(fileResult)); sys.exit(1)
+	print('Flights\tShell [ms/rank]\tIn process [ms/rank]\tShell, all ranks [s]\tIn process, all ranks [s]')
+	print(str(flightsQ)+'\t'+'%.2f' % (shellTime*1000)+'\t'+'%.2f' % (fileTime*1000)+'\t'+'%.2f' % (shellTime*(flightsQ+1))+'\t'+'%.2f' % (fileTime*(flightsQ+1)))
+
+if __name__ == "__main__":
+
+	"""
+	Benchmark of the startup file operations of every rank
+	"""
+	main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import sys
+import numpy as np
+from mpi4py import MPI
+from time import time
+
+# sys.path.insert(0,'') Uncomment and insert COFL root directory if necessary
+
+######################################
+
+### Imports from software modules
+from cofl.etc.info import TELEMETRY_TAG, NM_CLUSTERS_TAG, AC_SLAVES_TAG, CLIMB, CRUISE
+from cofl.etc.eSO6DataFields import QOF_ESO6_FIELDS
+from cofl.lib.mpif import TELEMETRY_DTYPE, packTelemetry, receivePickledMsg, sendPickledMsgs
+######################################
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def collectiveStep(comm, cruising, cruiseFlights):
+
+	"""
+	One timestep of the collective exchange with barriers (NM_EXCHANGE = 'collective')
+	Every flight takes part in the gather of telemetry, the scatter of clusters and the gather of responses
+	"""
+	rank, size = comm.Get_rank(), comm.Get_size()
+	records = np.empty(size, dtype=TELEMETRY_DTYPE)
+	mine = packTelemetry({rank: CRUISE if cruising else CLIMB}, {rank: np.zeros(QOF_ESO6_FIELDS)} if cruising else {})
+	comm.Gather([mine, MPI.BYTE], [records, MPI.BYTE], root=0)
+	comm.Barrier()
+	comm.scatter([cruiseFlights if flight in cruiseFlights else None for flight in range(size)] if rank == 0 else None, root=0)
+	comm.gather(True if cruising else None, root=0)
+	comm.Barrier()
+	comm.Barrier()
+
+def cruiseStep(comm, cruising, cruiseFlights):
+
+	"""
+	One timestep of the barrier-free exchange (NM_EXCHANGE = 'cruise')
+	Only cruise flights exchange messages with the network manager, idle flights do nothing
+	"""
+	rank = comm.Get_rank()
+	if rank == 0:
+		records = np.empty(len(cruiseFlights), dtype=TELEMETRY_DTYPE)
+		requests = [comm.Irecv([records[i:i+1], MPI.BYTE], source=flight, tag=TELEMETRY_TAG) for i, flight in enumerate(cruiseFlights)]
+		MPI.Request.Waitall(requests)
+		sendPickledMsgs(comm, dict((flight, cruiseFlights) for flight in cruiseFlights), NM_CLUSTERS_TAG)
+		decisions = np.empty(len(cruiseFlights), dtype=np.int8)
+		requests = [comm.Irecv([decisions[i:i+1], MPI.BYTE], source=flight, tag=AC_SLAVES_TAG) for i, flight in enumerate(cruiseFlights)]
+		MPI.Request.Waitall(requests)
+	elif cruising:
+		comm.Send([packTelemetry({rank: CRUISE}, {rank: np.zeros(QOF_ESO6_FIELDS)}), MPI.BYTE], dest=0, tag=TELEMETRY_TAG)
+		receivePickledMsg(comm, 0, NM_CLUSTERS_TAG)
+		comm.Send([np.ones(1, dtype=np.int8), MPI.BYTE], dest=0, tag=AC_SLAVES_TAG)
+
+def timeSteps(comm, step, steps, cruising, cruiseFlights):
+
+	"""
+	Returns the mean wall time of one timestep at the network manager [s]
+	"""
+	comm.Barrier()
+	initT = time()
+	for k in range(steps): step(comm, cruising, cruiseFlights)
+	endT = time()
+	comm.Barrier()
+	return (endT-initT)/steps
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def main():
+
+	"""
+	Per timestep wall time of the NM exchange protocols against the quantity of flights
+	mpirun -np <flights+1> benchmarkSteps.py [steps] [cruise ratio]
+	Rank 0 is the network manager, flights are 1, 2, 4, ... ranks of the run
+	"""
+	comm = MPI.COMM_WORLD
+	rank, size = comm.Get_rank(), comm.Get_size()
+	if size < 2:
+		if rank == 0: print('### USAGE ###\nmpirun -np <flights+1> benchmarkSteps.py [steps] [cruise ratio]')
+		sys.exit(0)
+	steps = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+	cruiseRatio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.25
+	if rank == 0: print('Flights\tCruise\tCollective [ms/step]\tCruise only [ms/step]')
+	flightsQ = 1
+	while flightsQ < size:
+		subComm = comm.Split(0 if rank <= flightsQ else MPI.UNDEFINED, rank)
+		if subComm != MPI.COMM_NULL:
+			cruiseFlights = list(range(1, 1+int(round(cruiseRatio*flightsQ))))
+			cruising = rank in cruiseFlights
+			collectiveTime = timeSteps(subComm, collectiveStep, steps, cruising, cruiseFlights)
+			cruiseTime = timeSteps(subComm, cruiseStep, steps, cruising, cruiseFlights)
+			if rank == 0: print(str(flightsQ)+'\t'+str(len(cruiseFlights))+'\t'+'%.4f' % (collectiveTime*1000)+'\t'+'%.4f' % (cruiseTime*1000))
+			subComm.Free()
+		comm.Barrier()
+		flightsQ*=2
+
+if __name__ == "__main__":
+
+	"""
+	Benchmark of the per timestep exchange with the network manager
+	"""
+	main()
@@ -21,7 +21,9 @@ sys.path.insert(0,'/local')
 ######################################
 
 ### Imports from software modules
+from cofl.etc.info import OUTPUT_FOLDER, EVENTS_FILE
 from cofl.lib.commands import executeCommand, executeCommandInNode
+from cofl.lib.events import readEvents
 ######################################
 
 ######################################################################################################################################################
@@ -46,13 +48,7 @@ def main():
 		out = executeCommand(command)
 		if out[2] == 0:
 
-			logsFolder = folder+'/logs'
-			logs = os.listdir(logsFolder)
-			logs.remove('0.log')
-			logs=[logsFolder+'/'+f for f in logs]
-
-			cruiseTimes = []
-			for log in logs: cruiseTimes.append(int(os.popen("cat "+log+" | grep 'Cruise starts at time'").read().split()[5]))
+			cruiseTimes = [event['cruiseTime'] for event in readEvents(folder+'/'+OUTPUT_FOLDER+'/'+EVENTS_FILE, ['timeline'])]
 			clustersInfoTestCases[idTC] = max(cruiseTimes) - min(cruiseTimes)
 			print('Cruise duration is '+str(clustersInfoTestCases[idTC]))
 		else: print('Test case not done')
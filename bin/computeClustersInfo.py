@@ -21,7 +21,9 @@ sys.path.insert(0,'/local')
 ######################################
 
 ### Imports from software modules
+from cofl.etc.info import OUTPUT_FOLDER, EVENTS_FILE
 from cofl.lib.commands import executeCommand, executeCommandInNode
+from cofl.lib.events import readEvents
 ######################################
 
 ######################################################################################################################################################
@@ -48,30 +50,20 @@ def main():
 			clustersInfoTestCases[idTC] = {}
 			clustersInfoTestCases[idTC]['ATST'] = {}
 			clustersInfoTestCases[idTC]['CS'] = {}
-			logsFolder = folder+'/logs'
 			clustersSizes = []
 			clustersATST = []
-			lines = os.popen("cat "+logsFolder+"/0.log | grep 'Clusters calculated by Network Manager: '").read().split('\n')
-			for line in lines:
-				clustersline='{'+line.replace("[STD] Clusters calculated by Network Manager: ", "")[0:-1].replace(']','],')[0:-1]+'}'
-				clusters = eval(clustersline)
-				clusteredFlights = []
-				atst = 0
-				for flight in clusters:
-					if flight not in clusteredFlights and len(clusters[flight])>0:
-						clustersSizes.append(len(clusters[flight]))
-						atst +=1
-						for f in clusters[flight]: clusteredFlights.append(f)
-				clustersATST.append(atst)
+			for event in readEvents(folder+'/'+OUTPUT_FOLDER+'/'+EVENTS_FILE, ['clusters']):
+				for cluster in event['clusters']: clustersSizes.append(len(cluster))
+				clustersATST.append(len(event['clusters']))
 			maxSize = max(clustersSizes) if len(clustersSizes) > 0 else 0
 			minSize = min(clustersSizes) if len(clustersSizes) > 0 else 0
 			avgSize = float(sum(clustersSizes))/len(clustersSizes) if len(clustersSizes) > 0 else 0
 			clustersInfoTestCases[idTC]['CS']['max'] = maxSize
 			clustersInfoTestCases[idTC]['CS']['min'] = minSize
 			clustersInfoTestCases[idTC]['CS']['avg'] = avgSize
-			maxATST = max(clustersATST)
-			minATST = min(clustersATST)
-			avgATST = float(sum(clustersATST))/len(clustersATST)
+			maxATST = max(clustersATST) if len(clustersATST) > 0 else 0
+			minATST = min(clustersATST) if len(clustersATST) > 0 else 0
+			avgATST = float(sum(clustersATST))/len(clustersATST) if len(clustersATST) > 0 else 0
 			clustersInfoTestCases[idTC]['ATST']['max'] = maxATST
 			clustersInfoTestCases[idTC]['ATST']['min'] = minATST
 			clustersInfoTestCases[idTC]['ATST']['avg'] = avgATST
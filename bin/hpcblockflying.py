@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import sys
+import numpy as np
+from datetime import datetime
+from functools import partial
+from mpi4py import MPI
+
+# sys.path.insert(0,'') Uncomment and insert COFL root directory if necessary
+
+######################################
+
+### Imports from software modules
+from cofl.etc.configuration import DECOMPOSITION
+from cofl.etc.info import DATA_ROOT_FOLDER, TRAJ_FOLDER, HPC_TRAJ_FOLDER, OUTPUT_FOLDER, LOGS_FOLDER, LOG_DBG, LOG_STD, FLIGHT_PHASES
+from cofl.lib.decomposition import getDeparturePositions, regionDecomposition, roundRobinDecomposition
+from cofl.lib.engine import exchangeClusters, getActiveTimes, getEvents, getFlightsSummaries, getStatuses, getTelemetry, loadFleet, updatePhases, updateTimesteps, writeTrajectoryFiles
+from cofl.lib.events import closeEvents, emitEvents, getRankEventsFile, mergeEvents
+from cofl.lib.folders import createFolders
+from cofl.lib.info import usage
+from cofl.lib.ioFiles import readInfrastructureFile, readXMLInput, wrapIT, writeCooperativeFlightsFile, writePerformanceFile, writeResultsFile, writeSummaryFile
+from cofl.lib.logging import DEBUG_LOG, logger
+from cofl.lib.mpif import gatherPickledMsg, packTelemetry, routeClusterMessages, scatterPickledMsgs, unpackTelemetry
+from cofl.lib.networkManager import computeNMClusters, computeSimulationSummary, countAcceptedClusters, initNetworkManager
+from cofl.lib.networkManager import removeUnclusteredFlights, storeStepResults, updateAircraftNetworkImage
+from cofl.lib.pctime import getComputingTime, getDateAndTime, returnSeconds, returnSecondsFromEpoch
+from cofl.lib.performance import checkBandwidth, checkLatency
+######################################
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+DECOMPOSITIONS = ['roundrobin', 'region']
+
+def gatherMPIMsg(data):
+
+	"""
+	Gathering data of every worker rank at the network manager
+	Returns [data of rank 1, data of rank 2, ...] at the network manager
+	"""
+	initT = datetime.now()
+	gathered, msgBytes, receivedBytes = gatherPickledMsg(comm, data, 0)
+	endT = datetime.now()
+	if gathered is None:
+		stats['qOfMSGSent']+=1
+		stats['bytesSent']+=msgBytes
+		stats['sendingTime']+=returnSeconds(initT,endT)
+		return None
+	for workerBytes in receivedBytes[1:]:
+		stats['qOfMSGReceived']+=1
+		stats['bytesReceived']+=workerBytes
+	stats['receivingTime']+=returnSeconds(initT,endT)
+	return gathered[1:]
+
+def scatterMPIMsg(data=None):
+
+	"""
+	Scattering data of the network manager to worker ranks
+	data: [data for rank 1, data for rank 2, ...] at the network manager
+	"""
+	initT = datetime.now()
+	workerData, msgBytes, sentBytes = scatterPickledMsgs(comm, None if data is None else [None]+data, 0)
+	endT = datetime.now()
+	if data is None:
+		stats['qOfMSGReceived']+=1
+		stats['bytesReceived']+=msgBytes
+		stats['receivingTime']+=returnSeconds(initT,endT)
+		return workerData
+	for workerBytes in sentBytes[1:]:
+		stats['qOfMSGSent']+=1
+		stats['bytesSent']+=workerBytes
+	stats['sendingTime']+=returnSeconds(initT,endT)
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def main():
+
+	"""
+	Parallel cooperative flights, blocks of flights per MPI process
+	Rank 0 is the network manager, every other rank flies a block of flights with the
+	vectorized engine (lib/engine) and takes part in one gather or scatter of the
+	network manager per step and exchange. Cooperative messages between flights of different ranks
+	are routed in alltoall rounds of the workers communicator.
+	Same test case input and results, summary, HPC trajectory and events files as bin/hpccoopflying.py
+	"""
+	global comm, stats
+
+	##################################################################################################################################################
+	### MPI parallel libraries
+	comm = MPI.COMM_WORLD
+	rank = comm.Get_rank()
+	size = comm.Get_size()
+	nmRank=0
+	slavesComm=comm.Create(comm.Get_group().Excl([nmRank]))
+	rankMsg = '[Rank '+str(rank)+' msg]: '
+	stats = {'bytesSent':0, 'bytesReceived':0, 'sendingTime':0, 'receivingTime':0, 'qOfMSGSent':0, 'qOfMSGReceived':0}
+	##################################################################################################################################################
+
+	##################################################################################################################################################
+	### Reading parameters and setting working space
+	decomposition = sys.argv[2] if len(sys.argv) == 3 else DECOMPOSITION
+	if len(sys.argv) not in [2,3] or decomposition not in DECOMPOSITIONS or size < 2:
+		if rank == nmRank: usage('hpcblockflying.py','['+'|'.join(DECOMPOSITIONS)+'] (at least 2 MPI processes)')
+		sys.exit(0)
+	testCaseFile=sys.argv[1]
+	tcID, flightsQ, scenario, model, grouping, radius, alonefuelparameter, coopfuelparameter, approachedDistance, infrastructureFile, log = readXMLInput(rankMsg,testCaseFile)
+	machines, qOfMachines = readInfrastructureFile(infrastructureFile)
+	parameters = {'model':model, 'alonefuelparameter':alonefuelparameter, 'coopfuelparameter':coopfuelparameter, 'approachedDistance':approachedDistance}
+	tcFolder=DATA_ROOT_FOLDER+'/'+scenario+'/'+tcID
+	trajectoriesFolder=tcFolder+'/'+TRAJ_FOLDER
+	hpcTrajectoriesFolder=tcFolder+'/'+HPC_TRAJ_FOLDER
+	outputFolder=tcFolder+'/'+OUTPUT_FOLDER
+	logsFolder=tcFolder+'/'+LOGS_FOLDER
+	myLogFile=logsFolder+'/'+str(rank)+'.log'
+	myPerformanceFile=outputFolder+'/'+str(rank)+'_perf.txt'
+	myEventsFile=getRankEventsFile(outputFolder, rank)
+	resultsFile = outputFolder+'/results.txt'
+	summaryFile = outputFolder+'/summary.txt'
+	cooperativeFlightsFile = outputFolder+'/cooperativeFlights.txt'
+	if rank == nmRank:
+		logger(myLogFile,rankMsg,LOG_STD,'Setting work space')
+		createFolders([tcFolder, trajectoriesFolder, hpcTrajectoriesFolder, outputFolder, logsFolder])
+	comm.Barrier()
+	##################################################################################################################################################
+
+	##################################################################################################################################################
+	### Starting clock and setting performance files
+	myClockInitTime, myCompInitTime, myInitDateTime = returnSecondsFromEpoch(), getComputingTime(), getDateAndTime()
+	writePerformanceFile(myPerformanceFile, rank, tcID, int(flightsQ)+1, qOfMachines, myInitDateTime)
+	if rank == nmRank:
+		writeResultsFile(resultsFile)
+		writeCooperativeFlightsFile(cooperativeFlightsFile)
+		bandwidth = checkBandwidth(machines,rankMsg,myLogFile)
+		latency = checkLatency(machines,rankMsg,myLogFile)
+		perFile = open(myPerformanceFile,'a')
+		perFile.write('Average bandwidth UDP: '+str(bandwidth['UDP'])+'\n')
+		perFile.write('Average bandwidth TCP: '+str(bandwidth['TCP'])+'\n')
+		perFile.write('Average Latency: '+str(latency)+'\n')
+		perFile.close()
+	##################################################################################################################################################
+
+	##################################################################################################################################################
+	### Assigning blocks of flights to worker ranks
+	blocks = None
+	if rank == nmRank:
+		logger(myLogFile,rankMsg,LOG_STD,'Assigning flights to '+str(size-1)+' worker ranks by '+decomposition)
+		if decomposition == 'region': blocks = regionDecomposition(getDeparturePositions(trajectoriesFolder, flightsQ), size-1)
+		else: blocks = roundRobinDecomposition(range(1,int(flightsQ)+1), size-1)
+		for worker in range(size-1): logger(myLogFile,rankMsg,LOG_STD,'Rank '+str(worker+1)+' flights: '+str(blocks[worker]))
+	blocks = comm.bcast(blocks, root=nmRank)
+	owners = {}
+	for worker in range(size-1):
+		for flight in blocks[worker]: owners[flight] = worker
+	##################################################################################################################################################
+
+	##################################################################################################################################################
+	### Reading trajectories and computing simulation init and end time
+	myInitTime = sys.maxsize; myEndTime = -sys.maxsize
+	if rank != nmRank:
+		logger(myLogFile,rankMsg,LOG_STD,'Reading original trajectories of flights '+str(blocks[rank-1]))
+		fleet = loadFleet(trajectoriesFolder, flightsQ, blocks[rank-1])
+		if fleet['qOfFlights'] > 0: myInitTime = int(fleet['initTime'].min()); myEndTime = int(fleet['endTime'].max())
+		transport = partial(routeClusterMessages, slavesComm, owners, stats)
+	initTime = comm.allreduce(myInitTime, op=MPI.MIN)
+	endTime = comm.allreduce(myEndTime, op=MPI.MAX)
+	logger(myLogFile,rankMsg,LOG_STD,'Init time: '+str(initTime)+' , End time = '+str(endTime))
+	### Phase times of all flights, every rank steps the same active times (lib/engine.getActiveTimes)
+	phaseTimes = ['initTime', 'cruiseTime', 'descentTime', 'endTime']
+	blocksTimes = comm.allgather(None if rank == nmRank else dict((key, fleet[key]) for key in phaseTimes))
+	timeline = dict((key, np.concatenate([blockTimes[key] for blockTimes in blocksTimes if blockTimes is not None])) for key in phaseTimes)
+	activeTimes = getActiveTimes(timeline, initTime, endTime)
+	##################################################################################################################################################
+
+	##################################################################################################################################################
+	### HPC cooperative flights simulation
+	logger(myLogFile,rankMsg,LOG_STD,'Starting simulation')
+	if rank == nmRank:
+		nm = initNetworkManager([i for i in range(1,int(flightsQ)+1)])
+		for currTime, qOfSteps in activeTimes:
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'-------------------------------------------------------')
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Current time = '+str(currTime))
+
+			### Get status and telemetry of all flights -- One MPI gather of worker ranks blocks
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Receiving flights current status')
+			blocksStatuses={}; telemetry={}
+			for records in gatherMPIMsg(None):
+				blockStatuses, blockTelemetry = unpackTelemetry(records)
+				blocksStatuses.update(blockStatuses)
+				telemetry.update(blockTelemetry)
+			statuses={}
+			for flight in sorted(blocksStatuses):
+				statuses[flight]=blocksStatuses[flight]
+				if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Flight: '+str(flight)+' -- '+str(statuses[flight]))
+			updateAircraftNetworkImage(nm, statuses, myLogFile, rankMsg)
+			nm['vehiclesPosition'].update(telemetry)
+
+			### Calculating NM clusters and sending them to worker ranks
+			computeNMClusters(nm, grouping, radius, currTime, myLogFile, rankMsg, myEventsFile)
+			cruiseFlights = set(nm['cruiseFlights'])
+			scatterMPIMsg([dict((flight, nm['clusters'][flight]) for flight in block if flight in cruiseFlights) for block in blocks])
+
+			### Updating clusters and aircraft network with aircraft responses
+			responses = {}
+			for blockResponses in gatherMPIMsg(None): responses.update(blockResponses)
+			removeUnclusteredFlights(nm, [flight for flight in nm['clusteredFlights'] if not responses[flight]])
+			countAcceptedClusters(nm, myLogFile, rankMsg, qOfSteps)
+			storeStepResults(nm, resultsFile, currTime)
+
+		### Computing and writing simulation summary
+		logger(myLogFile,rankMsg,LOG_STD,'Receiving flight simulation summaries')
+		blocksSummaries = {}
+		procsSummaries = []
+		for blockSummaries, procSummary in gatherMPIMsg(None):
+			blocksSummaries.update(blockSummaries)
+			procsSummaries.append(procSummary)
+		flightsSummaries = {}
+		for flight in sorted(blocksSummaries): flightsSummaries[flight] = blocksSummaries[flight]
+		procsSummaries.append([stats['bytesSent'], stats['bytesReceived'], stats['sendingTime'], stats['receivingTime'], stats['qOfMSGSent'], stats['qOfMSGReceived']])
+		logger(myLogFile,rankMsg,LOG_STD,'Computing and writing simulation summary')
+		testCaseResults = [tcID,
+						   scenario,
+						   int(flightsQ),
+						   size,
+						   qOfMachines,
+						   machines,
+						   model,
+						   grouping,
+						   radius,
+						   alonefuelparameter,
+						   coopfuelparameter,
+						   approachedDistance]
+		summaryResults, flightsClusteredFlights = computeSimulationSummary(nm, testCaseResults, flightsSummaries, procsSummaries)
+		writeSummaryFile(summaryFile,summaryResults)
+		logger(myLogFile,rankMsg,LOG_STD,'Writing cooperative flights file')
+		writeCooperativeFlightsFile(cooperativeFlightsFile,flightsClusteredFlights,False)
+
+	else:
+		for currTime, qOfSteps in activeTimes:
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Current time = '+str(currTime))
+
+			### Sending status and telemetry of my flights
+			statuses = getStatuses(fleet, updatePhases(fleet, currTime))
+			phases = dict((flight, FLIGHT_PHASES.index(statuses[flight])) for flight in statuses)
+			gatherMPIMsg(packTelemetry(phases, getTelemetry(fleet, [flight for flight in statuses if statuses[flight] == 'CRUISE'])))
+
+			### Executing HPC flying model and sending acceptance of clusters
+			clusters = scatterMPIMsg()
+			gatherMPIMsg(exchangeClusters(fleet, clusters, currTime, parameters, myLogFile, rankMsg, transport))
+			emitEvents(myEventsFile, getEvents(fleet, currTime))
+
+			### timestep updating
+			updateTimesteps(fleet, qOfSteps)
+		emitEvents(myEventsFile, getEvents(fleet, endTime))
+
+		### Informing NM with complete statistics and writing HPC trajectory files
+		logger(myLogFile,rankMsg,LOG_STD,'Informing NM with simulation summary')
+		procSummary = [stats['bytesSent'], stats['bytesReceived'], stats['sendingTime'], stats['receivingTime'], stats['qOfMSGSent'], stats['qOfMSGReceived']]
+		gatherMPIMsg([getFlightsSummaries(fleet), procSummary])
+		logger(myLogFile,rankMsg,LOG_STD,'Writing cooperative trajectories')
+		writeTrajectoryFiles(fleet, hpcTrajectoriesFolder)
+	##################################################################################################################################################
+
+	##################################################################################################################################################
+	### Finishing
+	logger(myLogFile,rankMsg,LOG_STD,'Finishing simulation')
+	myClockEndTime, myCompEndTime, myEndDateTime = returnSecondsFromEpoch(), getComputingTime(), getDateAndTime()
+	writePerformanceFile(myPerformanceFile, rank, tcID, int(flightsQ)+1, qOfMachines, myEndDateTime, False, [myClockInitTime, myClockEndTime], [myCompInitTime, myCompEndTime])
+	closeEvents()
+	comm.Barrier() ## Check for the flights to finish
+	if rank == nmRank:
+		logger(myLogFile,rankMsg,LOG_STD,'Computing performance file')
+		wrapIT(rankMsg,outputFolder, size)
+		logger(myLogFile,rankMsg,LOG_STD,'Merging events files')
+		mergeEvents(outputFolder, size)
+	logger(myLogFile,rankMsg,LOG_STD,'I am done :)')
+	##################################################################################################################################################
+
+if __name__ == "__main__":
+
+	"""
+	Parallel cooperative flights, blocks of flights per MPI process
+	"""
+	main()
@@ -14,9 +14,9 @@
 
 ### imports ##########################
 
-import os
 import sys
 import getopt
+import numpy as np
 from datetime import datetime
 from math import cos, sin, radians, sqrt, pow
 from mpi4py import MPI
@@ -27,28 +27,47 @@ from time import sleep
 ######################################
 
 ### Imports from software modules
-from cofl.etc.configuration import  TIME_STEP
-from cofl.etc.info import DATA_ROOT_FOLDER, TRAJ_FOLDER, HPC_TRAJ_FOLDER, OUTPUT_FOLDER, LOGS_FOLDER, LOG_STD, LOG_ERR
-from cofl.etc.info import STATUS_TAG, TELEMETRY_TAG, NM_CLUSTERS_TAG, AC_SLAVES_TAG, CLUSTERED_TAG, APPROACHING_TAG, VICSEK_TAG, SIM_SUMARY_TAG
+from cofl.etc.configuration import  TIME_STEP, NM_BUFFERS, NM_EXCHANGE, CLUSTER_COMMS
+from cofl.etc.info import DATA_ROOT_FOLDER, TRAJ_FOLDER, HPC_TRAJ_FOLDER, OUTPUT_FOLDER, LOGS_FOLDER, LOG_DBG, LOG_STD, LOG_ERR
+from cofl.etc.info import TELEMETRY_TAG, NM_CLUSTERS_TAG, AC_SLAVES_TAG, CLUSTERED_TAG, APPROACHING_TAG, VICSEK_TAG, SIM_SUMARY_TAG, CLUSTER_COMM_TAG
+from cofl.etc.info import NOT_STARTED, CRUISE, FLIGHT_PHASES
 from cofl.etc.eSO6DataFields import *
 from cofl.lib.conflicts import discoverConflicts
-from cofl.lib.clustering import fifo
-from cofl.lib.ioFiles import readInfrastructureFile, readESO6Trajectory, readXMLInput, wrapIT, writeResultsFile, writePerformanceFile
+from cofl.lib.engine import getActiveTimes, updatePhases
+from cofl.lib.ioFiles import readInfrastructureFile, readXMLInput, wrapIT, writeResultsFile, writePerformanceFile
 from cofl.lib.ioFiles import writeCooperativeFlightsFile, writeSummaryFile
 from cofl.lib.folders import createFolders
 from cofl.lib.formationFlying import formationFlying
 from cofl.lib.info import usage
 from cofl.lib.kpis import computeFuel, computeKd
-from cofl.lib.logging import logger
-from cofl.lib.network import addEdges, calculateGRC, calculateLRC, setNetwork
-from cofl.lib.pctime import calculateInitAndEndTime, getComputingTime, getDateAndTime, getFormattedDate, returnSeconds, returnSecondsFromEpoch
+from cofl.lib.events import closeEvents, emitEvent, getRankEventsFile, mergeEvents
+from cofl.lib.logging import DEBUG_LOG, logger
+from cofl.lib.mpif import TELEMETRY_DTYPE, allgatherPickledMsg, exchangeWithNodes, gatherPickledMsg, packTelemetry, receivePickledMsg
+from cofl.lib.mpif import scatterPickledMsgs, sendPickledMsg, sendPickledMsgs, unpackTelemetry
+from cofl.lib.networkManager import computeNMClusters, computeSimulationSummary, countAcceptedClusters, initNetworkManager
+from cofl.lib.networkManager import removeUnclusteredFlights, storeStepResults, updateAircraftNetworkImage
+from cofl.lib.pctime import getComputingTime, getDateAndTime, getFormattedDate, returnSeconds, returnSecondsFromEpoch
 from cofl.lib.performance import checkBandwidth, checkLatency, getBytes
-from cofl.lib.physics import calculateDistanceBetweenPoints, getPoint, roundUP, convertMtoNM, convertNMtoM
+from cofl.lib.physics import calculateDistancesBetweenPoints, getPoint, roundUP, convertMtoNM, convertNMtoM
+from cofl.lib.trajectoryStore import getLevelledSegments, getSegment, readTrajectory, setSegmentValue, writeHPCTrajectory
 ######################################
 
 ######################################################################################################################################################
 ######################################################################################################################################################
 
+def agreeWithNodes(decision,currentCluster):
+
+	"""
+	Returns True if every node in my cluster, me included, decided True
+	Logical AND allreduce of a one byte buffer in the cluster sub-communicator
+	"""
+	agreement = np.array([decision], dtype=np.bool_)
+	initT = datetime.now()
+	getClusterComm(currentCluster).Allreduce(MPI.IN_PLACE, [agreement, MPI.C_BOOL], op=MPI.LAND)
+	endT = datetime.now()
+	countClusterMsgs(len(currentCluster)-1, getBytes(agreement), getBytes(agreement), returnSeconds(initT,endT))
+	return bool(agreement[0])
+
 def approachCluster(nextPositionHPC, currentCluster):
 	"""
 	Initial approaching to cluster neighbours
@@ -60,14 +79,15 @@ def approachCluster(nextPositionHPC, currentCluster):
 	myLat = nextPositionHPC['LAT']
 	myLon = nextPositionHPC['LON']
 	maxSeparation = 0.0
-	for flight in response:
-		fLat = response[flight]['LAT']
-		fLon = response[flight]['LON']
-		dist = calculateDistanceBetweenPoints(myLat,myLon,fLat,fLon)
-		if dist > maxSeparation: maxSeparation = dist
+	if len(response) > 0:
+		fLats = [response[flight]['LAT'] for flight in response]
+		fLons = [response[flight]['LON'] for flight in response]
+		maxSeparation = max(0.0, float(calculateDistancesBetweenPoints(myLat,myLon,fLats,fLons).max()))
 	if maxSeparation <= clusterSize*float(approachedDistance): inPosition = True ## Potential conflicts -- Needs addressing
-	response = informNodes(inPosition,currentCluster,APPROACHING_TAG)
-	if all(flightReady for flightReady in response.values()) and inPosition: joined = True
+	if CLUSTER_COMMS: joined = agreeWithNodes(inPosition,currentCluster)
+	else:
+		response = informNodes(inPosition,currentCluster,APPROACHING_TAG)
+		if all(flightReady for flightReady in response.values()) and inPosition: joined = True
 	logger(myLogFile,rankMsg,LOG_STD,'JOINED - '+str(joined).upper())
 	return joined
 
@@ -78,19 +98,14 @@ def calculateCruise():
 	"""
 	global cruiseTime
 	cruiseTime = myInitTime
+	levelled = getLevelledSegments(originalTrajectory).tolist()
 	line=0
-	for segment in originalTrajectory:
+	for segmentLevelled in levelled:
 
-		flInit = int(segment[SEGMENT_LEVEL_INIT])
-		flEnd = int(segment[SEGMENT_LEVEL_END])
-		status = segment[STATUS]
-		if flInit == flEnd  and status == '2':
+		if segmentLevelled:
 			stop=True
 			for i in range(1,4):
-				flInitAux = int(originalTrajectory[line+i][SEGMENT_LEVEL_INIT])
-				flEndAux = int(originalTrajectory[line+i][SEGMENT_LEVEL_END])
-				statAux = originalTrajectory[line+i][STATUS]
-				if flInitAux == flEndAux  and statAux == '2': pass
+				if levelled[line+i]: pass
 				else: stop = False; break
 			if stop: break
 		else: cruiseTime+= TIME_STEP
@@ -108,26 +123,21 @@ def calculateDescent():
 	global descentTime
 	global tod
 	descentTime = myEndTime
-	line = len(originalTrajectory)
-	for segment in reversed(originalTrajectory):
-		flInit = int(segment[SEGMENT_LEVEL_INIT])
-		flEnd = int(segment[SEGMENT_LEVEL_END])
-		status = segment[STATUS]
-		if flInit == flEnd  and status == '2':
+	levelled = getLevelledSegments(originalTrajectory).tolist()
+	line = len(levelled)
+	for segmentLevelled in reversed(levelled):
+		if segmentLevelled:
 			stop=True
 			for i in range(1,4):
-				flInitAux = int(originalTrajectory[line-i][SEGMENT_LEVEL_INIT])
-				flEndAux = int(originalTrajectory[line-i][SEGMENT_LEVEL_END])
-				statAux = originalTrajectory[line-i][STATUS]
-				if flInitAux == flEndAux  and statAux == '2': pass
+				if levelled[line-i]: pass
 				else: stop = False; break
 			if stop: break
 		else: descentTime-= TIME_STEP
 		line-=1
 	tod = {}
-	tod['LAT'] = originalTrajectory[line][SEGMENT_LAT_INIT]
-	tod['LON'] = originalTrajectory[line][SEGMENT_LON_INIT]
-	tod['ALT'] = originalTrajectory[line][SEGMENT_LEVEL_INIT]
+	tod['LAT'] = originalTrajectory[SEGMENT_LAT_INIT][line]
+	tod['LON'] = originalTrajectory[SEGMENT_LON_INIT][line]
+	tod['ALT'] = originalTrajectory[SEGMENT_LEVEL_INIT][line]
 	logger(myLogFile,rankMsg,LOG_STD,'Descending starts at time '+str(descentTime)+' [s]')
 	return line
 
@@ -162,16 +172,18 @@ def checkFuelCost(nextPositionHPC):
 	clustered = True
 	latTOD = float(tod['LAT'])/60
 	lonTOD = float(tod['LON'])/60
-	latCurrent=float(hpcTrajectory[timestep][SEGMENT_LAT_INIT])/60
-	lonCurrent=float(hpcTrajectory[timestep][SEGMENT_LON_INIT])/60
+	latCurrent=float(hpcTrajectory[SEGMENT_LAT_INIT][timestep])/60
+	lonCurrent=float(hpcTrajectory[SEGMENT_LON_INIT][timestep])/60
 	latHPC=nextPositionHPC['LAT']
 	lonHPC=nextPositionHPC['LON']
-	dist1 = calculateDistanceBetweenPoints(latCurrent,lonCurrent,latTOD,lonTOD)
-	dist2 = calculateDistanceBetweenPoints(latCurrent,lonCurrent,latHPC,lonHPC)
-	dist3 = calculateDistanceBetweenPoints(latHPC,lonHPC,latTOD,lonTOD)
-	dist1 = convertMtoNM(dist1)
-	dist2 = convertMtoNM(dist2)
-	dist3 = convertMtoNM(dist3)
+	dist1, dist2, dist3 = calculateDistancesBetweenPoints(
+			[latCurrent,latCurrent,latHPC],
+			[lonCurrent,lonCurrent,lonHPC],
+			[latTOD,latHPC,latTOD],
+			[lonTOD,lonHPC,lonTOD])
+	dist1 = convertMtoNM(float(dist1))
+	dist2 = convertMtoNM(float(dist2))
+	dist3 = convertMtoNM(float(dist3))
 	fuel1 = myKd*dist1*float(alonefuelparameter)
 	fuel2 = myKd*dist2*float(coopfuelparameter)
 	fuel3 = myKd*dist3*float(alonefuelparameter)
@@ -181,6 +193,7 @@ def checkFuelCost(nextPositionHPC):
 	logger(myLogFile,rankMsg,LOG_STD,'HPC-'+model+' Fuel = '+str(hpcFuel))
 	logger(myLogFile,rankMsg,LOG_STD,'Difference Fuel = '+str(nominalFuel-hpcFuel))
 	if nominalFuel < hpcFuel: clustered = False
+	emitEvent(myEventsFile,'fuelDecision',currTime,rank,{'nominalFuel': nominalFuel, 'hpcFuel': hpcFuel, 'clustered': clustered})
 	if clustered: logger(myLogFile,rankMsg,LOG_STD,'FUEL COST check - PASS')
 	else: logger(myLogFile,rankMsg,LOG_STD,'FUEL COST check - FAIL')
 	return clustered
@@ -209,21 +222,38 @@ def checkMyStatus(currTime):
 	if currTime == myInitTime:
 		#dateFormatted = getFormattedDate(hpcTrajectory[timestep][SEGMENT_DATE_INIT],hpcTrajectory[timestep][SEGMENT_TIME_INIT])
 		logger(myLogFile,rankMsg,LOG_STD,'I have started climbing at currTime: '+str(currTime))
+		emitEvent(myEventsFile,'phase',currTime,rank,{'phase': 'CLIMB'})
 	### Cruising
 	elif currTime == cruiseTime:
 		#dateFormatted = getFormattedDate(hpcTrajectory[timestep][SEGMENT_DATE_INIT],hpcTrajectory[timestep][SEGMENT_TIME_INIT])
 		logger(myLogFile,rankMsg,LOG_STD,'I have started cruise phase at currTime: '+str(currTime))
+		emitEvent(myEventsFile,'phase',currTime,rank,{'phase': 'CRUISE'})
 	### Descending
 	elif currTime == descentTime:
 		#dateFormatted = getFormattedDate(hpcTrajectory[timestep][SEGMENT_DATE_INIT],hpcTrajectory[timestep][SEGMENT_TIME_INIT])
 		logger(myLogFile,rankMsg,LOG_STD,'I have started descending at currTime: '+str(currTime))
+		emitEvent(myEventsFile,'phase',currTime,rank,{'phase': 'DESCENT'})
 	### Finishing
 	elif currTime == myEndTime:
 		#dateFormatted = getFormattedDate(hpcTrajectory[timestep-1][SEGMENT_DATE_INIT],hpcTrajectory[timestep-1][SEGMENT_TIME_INIT])
 		logger(myLogFile,rankMsg,LOG_STD,'I have finished my flight at currTime: '+str(currTime))
+		emitEvent(myEventsFile,'phase',currTime,rank,{'phase': 'FINISHED'})
 
 	return flightStatus
 
+def countClusterMsgs(qOfNodes, msgBytes, receivedBytes, msgDuration):
+
+	"""
+	Counting a collective exchange with qOfNodes nodes of my cluster as point to point messages
+	"""
+	global qOfMSGSent, bytesSent, qOfClusteredMSGSent, bytesClusteredSent
+	global qOfMSGReceived, bytesReceived, receivingTime, qOfClusteredMSGReceived, bytesClusteredReceived, receivingClusteredTime
+	qOfMSGSent+=qOfNodes; qOfClusteredMSGSent+=qOfNodes
+	bytesSent+=msgBytes*qOfNodes; bytesClusteredSent+=msgBytes*qOfNodes
+	qOfMSGReceived+=qOfNodes; qOfClusteredMSGReceived+=qOfNodes
+	bytesReceived+=receivedBytes; bytesClusteredReceived+=receivedBytes
+	receivingTime+=msgDuration; receivingClusteredTime+=msgDuration
+
 def finishClock():
 
 	"""
@@ -243,19 +273,171 @@ def finishSim():
 	"""
 	writePerformanceFile(myPerformanceFile, rank, tcID, size, qOfMachines, myInitDateTime, False, myClockTimes, myCompTimes)
 
+def freeClusterComms(currentCluster=[]):
+
+	"""
+	Freeing cached sub-communicators of clusters other than currentCluster
+	Members of a cluster receive the same cluster from the network manager,
+	so all of them keep or free its sub-communicator at the same timestep
+	"""
+	members = tuple(sorted(currentCluster))
+	for key in list(clusterComms):
+		if key != members:
+			clusterComms[key].Free()
+			del(clusterComms[key])
+
+def gatherFlightsState(flightStatus=None, telemetry=None):
+
+	"""
+	Gathering status and telemetry (CRUISE flights) of every flight at the network manager
+	Collective exchange: one gather, pickled objects or TELEMETRY_DTYPE records (NM_BUFFERS)
+	Cruise exchange: statuses come from the flights timeline, only cruise flights send telemetry
+	Returns {flight: status}, {flight: telemetry} at the network manager
+	"""
+	global qOfMSGSent, bytesSent, sendingTime
+	global qOfMSGReceived, bytesReceived, receivingTime
+	if NM_EXCHANGE == 'cruise':
+		if rank != nmRank:
+			if telemetry is None: return None, None
+			data = packTelemetry({rank: CRUISE}, {rank: telemetry})
+			initT = datetime.now()
+			comm.Send([data, MPI.BYTE], dest=nmRank, tag=TELEMETRY_TAG)
+			endT = datetime.now()
+			qOfMSGSent+=1
+			bytesSent+=getBytes(data)
+			sendingTime+=returnSeconds(initT,endT)
+			return None, None
+		statuses = dict(zip(timeline['flights'], [FLIGHT_PHASES[phase] for phase in updatePhases(timeline, currTime).tolist()]))
+		cruiseFlights = [flight for flight in statuses if statuses[flight] == 'CRUISE']
+		records = np.empty(len(cruiseFlights), dtype=TELEMETRY_DTYPE)
+		initT = datetime.now()
+		requests = [comm.Irecv([records[i:i+1], MPI.BYTE], source=flight, tag=TELEMETRY_TAG) for i, flight in enumerate(cruiseFlights)]
+		MPI.Request.Waitall(requests)
+		endT = datetime.now()
+		qOfMSGReceived+=len(cruiseFlights)
+		bytesReceived+=getBytes(records)
+		receivingTime+=returnSeconds(initT,endT)
+		return statuses, unpackTelemetry(records)[1]
+	if NM_BUFFERS:
+		data = packTelemetry({rank: NOT_STARTED if rank == nmRank else FLIGHT_PHASES.index(flightStatus)}, {} if telemetry is None else {rank: telemetry})
+		records = np.empty(size, dtype=TELEMETRY_DTYPE) if rank == nmRank else None
+		initT = datetime.now()
+		comm.Gather([data, MPI.BYTE], None if records is None else [records, MPI.BYTE], root=nmRank)
+		endT = datetime.now()
+		msgBytes = getBytes(data)
+		receivedBytes = [msgBytes]*size
+		if rank == nmRank: statuses, vehiclesPosition = unpackTelemetry(records[1:])
+	else:
+		data = None if rank == nmRank else (flightStatus, telemetry)
+		initT = datetime.now()
+		states, msgBytes, receivedBytes = gatherPickledMsg(comm, data, nmRank)
+		endT = datetime.now()
+		if rank == nmRank:
+			statuses = {}; vehiclesPosition = {}
+			for flight in range(1,size):
+				statuses[flight] = states[flight][0]
+				if statuses[flight] == 'CRUISE': vehiclesPosition[flight] = states[flight][1]
+	msgDuration = returnSeconds(initT,endT)
+	if rank != nmRank:
+		qOfMSGSent+=1
+		bytesSent+=msgBytes
+		sendingTime+=msgDuration
+		return None, None
+	for flight in range(1,size):
+		qOfMSGReceived+=1
+		bytesReceived+=receivedBytes[flight]
+	receivingTime+=msgDuration
+	return statuses, vehiclesPosition
+
+def gatherResponses(clustered=None, cruising=False, flights=[]):
+
+	"""
+	Gathering cluster decisions of clustered flights at the network manager
+	Cruise exchange: every cruise flight answers, flights is the list of cruise flights at the network manager
+	Returns {flight: clustered} at the network manager
+	"""
+	global qOfMSGSent, bytesSent, sendingTime
+	global qOfMSGReceived, bytesReceived, receivingTime
+	if NM_EXCHANGE == 'cruise':
+		if rank != nmRank:
+			if not cruising: return None
+			data = np.array([-1 if clustered is None else int(clustered)], dtype=np.int8)
+			initT = datetime.now()
+			comm.Send([data, MPI.BYTE], dest=nmRank, tag=AC_SLAVES_TAG)
+			endT = datetime.now()
+			qOfMSGSent+=1
+			bytesSent+=getBytes(data)
+			sendingTime+=returnSeconds(initT,endT)
+			return None
+		decisions = np.empty(len(flights), dtype=np.int8)
+		initT = datetime.now()
+		requests = [comm.Irecv([decisions[i:i+1], MPI.BYTE], source=flight, tag=AC_SLAVES_TAG) for i, flight in enumerate(flights)]
+		MPI.Request.Waitall(requests)
+		endT = datetime.now()
+		qOfMSGReceived+=len(flights)
+		bytesReceived+=getBytes(decisions)
+		receivingTime+=returnSeconds(initT,endT)
+		responses={}
+		for flight, decision in zip(flights, decisions.tolist()):
+			if decision >= 0: responses[flight] = bool(decision)
+		return responses
+	initT = datetime.now()
+	decisions, msgBytes, receivedBytes = gatherPickledMsg(comm, clustered, nmRank)
+	endT = datetime.now()
+	msgDuration = returnSeconds(initT,endT)
+	if rank != nmRank:
+		if clustered is not None:
+			qOfMSGSent+=1
+			bytesSent+=msgBytes
+			sendingTime+=msgDuration
+		return None
+	responses={}
+	for flight in range(1,size):
+		if decisions[flight] is None: continue
+		responses[flight]=decisions[flight]
+		qOfMSGReceived+=1
+		bytesReceived+=receivedBytes[flight]
+	receivingTime+=msgDuration
+	return responses
+
+def gatherTimeline():
+
+	"""
+	Gathering init, cruise, descent and end times of every flight at every rank
+	Returns the flights timeline, see lib/engine.updatePhases and lib/engine.getActiveTimes
+	"""
+	times = comm.allgather(None if rank == nmRank else [myInitTime, cruiseTime, descentTime, myEndTime])
+	flightsTimeline = {'flights': list(range(1,size))}
+	for i, key in enumerate(['initTime', 'cruiseTime', 'descentTime', 'endTime']):
+		flightsTimeline[key] = np.array([times[flight][i] for flight in range(1,size)], dtype=np.int64)
+	return flightsTimeline
+
+def getClusterComm(currentCluster):
+
+	"""
+	Returns the sub-communicator of my cluster
+	Created by all members on first use and cached while the membership is unchanged
+	"""
+	members = tuple(sorted(currentCluster))
+	if members not in clusterComms:
+		group = comm.Get_group().Incl(list(members))
+		clusterComms[members] = comm.Create_group(group, CLUSTER_COMM_TAG)
+		group.Free()
+	return clusterComms[members]
+
 def hprcFly(currentCluster):
 
 	"""
 	Flying cooperatively -- slaves function
 	Flying cooperatively if a suitable cluster exists
 	"""
-	global hpcTrajectory, clustered, joined, myClusteredDuration
+	global hpcTrajectory, hpcChanges, clustered, joined, myClusteredDuration
 	clustered = True; nextPositionHPC = {}
 	if len(currentCluster)>1:
 
 		########################################################################################
 		### New cluster logging
-		logger(myLogFile,rankMsg,LOG_STD,'-------------------------------------------------------')
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'-------------------------------------------------------')
 		########################################################################################
 
 		########################################################################################
@@ -276,9 +458,9 @@ def hprcFly(currentCluster):
 			nextPositionHPC, myNewFL = eval(model+'(currentCluster)')
 			joined = approachCluster(nextPositionHPC, currentCluster)
 			if joined:
-				logger(myLogFile,rankMsg,LOG_STD,'I have been clustered :)')
-				logger(myLogFile,rankMsg,LOG_STD,'Current cluster = '+str(currentCluster)+' , current time = '+str(currTime)+' , time step = '+str(timestep))
-				logger(myLogFile,rankMsg,LOG_STD,'Model = '+str(model))
+				if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'I have been clustered :)')
+				if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Current cluster = '+str(currentCluster)+' , current time = '+str(currTime)+' , time step = '+str(timestep))
+				if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Model = '+str(model))
 		########################################################################################
 
 		########################################################################################
@@ -318,48 +500,48 @@ def hprcFly(currentCluster):
 			nextPositionHPC.update((x, round(y*60,6)) for x, y in nextPositionHPC.items())
 			nextPositionHPC['ALT']=myNewFL
 			nextPositionHPC.update((x,str(y)) for x,y in nextPositionHPC.items())
-			logger(myLogFile,rankMsg,LOG_STD,'New HPC position calculated in current time: '+str(currTime))
-			logger(myLogFile,rankMsg,LOG_STD,'New HPC position: '+str(nextPositionHPC))
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'New HPC position calculated in current time: '+str(currTime))
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'New HPC position: '+str(nextPositionHPC))
 			myClusteredDuration+=1
 			for otherFlight in currentCluster:
 				if otherFlight not in myClusteredFlights and otherFlight != rank: myClusteredFlights.append(otherFlight)
 		else:
 			joined = False
-			nextPositionHPC['LAT'] = hpcTrajectory[timestep+1][SEGMENT_LAT_INIT]
-			nextPositionHPC['LON'] = hpcTrajectory[timestep+1][SEGMENT_LON_INIT]
-			nextPositionHPC['ALT'] = hpcTrajectory[timestep+1][SEGMENT_LEVEL_INIT]
-			logger(myLogFile,rankMsg,LOG_STD,'Original trajectory is kept in current time: '+str(currTime))
+			nextPositionHPC['LAT'] = (timestep+1, SEGMENT_LAT_INIT)
+			nextPositionHPC['LON'] = (timestep+1, SEGMENT_LON_INIT)
+			nextPositionHPC['ALT'] = (timestep+1, SEGMENT_LEVEL_INIT)
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Original trajectory is kept in current time: '+str(currTime))
 		### Changes to current timestep
-		hpcTrajectory[timestep][SEGMENT_LAT_END]=nextPositionHPC['LAT']
-		hpcTrajectory[timestep][SEGMENT_LON_END]=nextPositionHPC['LON']
-		hpcTrajectory[timestep][SEGMENT_LEVEL_END]=nextPositionHPC['ALT']
+		setSegmentValue(hpcTrajectory, hpcChanges, timestep, SEGMENT_LAT_END, nextPositionHPC['LAT'])
+		setSegmentValue(hpcTrajectory, hpcChanges, timestep, SEGMENT_LON_END, nextPositionHPC['LON'])
+		setSegmentValue(hpcTrajectory, hpcChanges, timestep, SEGMENT_LEVEL_END, nextPositionHPC['ALT'])
 		### Changes to next timestep
-		hpcTrajectory[timestep+1][SEGMENT_LAT_INIT]=nextPositionHPC['LAT']
-		hpcTrajectory[timestep+1][SEGMENT_LON_INIT]=nextPositionHPC['LON']
-		hpcTrajectory[timestep+1][SEGMENT_LEVEL_INIT]=nextPositionHPC['ALT']
+		setSegmentValue(hpcTrajectory, hpcChanges, timestep+1, SEGMENT_LAT_INIT, nextPositionHPC['LAT'])
+		setSegmentValue(hpcTrajectory, hpcChanges, timestep+1, SEGMENT_LON_INIT, nextPositionHPC['LON'])
+		setSegmentValue(hpcTrajectory, hpcChanges, timestep+1, SEGMENT_LEVEL_INIT, nextPositionHPC['ALT'])
 		####################################################################################
 
 		########################################################################################
 		### Updating segment fuel
-		latInit = float(hpcTrajectory[timestep][SEGMENT_LAT_INIT])/60
-		lonInit = float(hpcTrajectory[timestep][SEGMENT_LON_INIT])/60
-		latEnd = float(hpcTrajectory[timestep][SEGMENT_LAT_END])/60
-		lonEnd = float(hpcTrajectory[timestep][SEGMENT_LON_END])/60
-		segmentDistanceM = calculateDistanceBetweenPoints(latInit,lonInit,latEnd,lonEnd)
+		latInit = float(hpcTrajectory[SEGMENT_LAT_INIT][timestep])/60
+		lonInit = float(hpcTrajectory[SEGMENT_LON_INIT][timestep])/60
+		latEnd = float(hpcTrajectory[SEGMENT_LAT_END][timestep])/60
+		lonEnd = float(hpcTrajectory[SEGMENT_LON_END][timestep])/60
+		segmentDistanceM = float(calculateDistancesBetweenPoints(latInit,lonInit,latEnd,lonEnd))
 		segmentDistanceNM = convertMtoNM(segmentDistanceM)
 		fuelFactor = float(coopfuelparameter) if clustered else float(alonefuelparameter)
 		fuelSegment = myKd*segmentDistanceNM*fuelFactor
 		testCoordinates = {'latInit':latInit,'lonInit':lonInit,'latEnd':latEnd,'lonEnd':lonEnd}
-		logger(myLogFile,rankMsg,LOG_STD,'Test coordinates: '+str(testCoordinates))
-		hpcTrajectory[timestep][SEGMENT_FUEL] = str(fuelSegment)
-		logger(myLogFile,rankMsg,LOG_STD,'Distance in segment: '+str(segmentDistanceNM))
-		logger(myLogFile,rankMsg,LOG_STD,'Fuel factor in segment: '+str(fuelFactor))
-		logger(myLogFile,rankMsg,LOG_STD,'Fuel consumed in segment: '+str(fuelSegment))
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Test coordinates: '+str(testCoordinates))
+		setSegmentValue(hpcTrajectory, hpcChanges, timestep, SEGMENT_FUEL, str(fuelSegment))
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Distance in segment: '+str(segmentDistanceNM))
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Fuel factor in segment: '+str(fuelFactor))
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Fuel consumed in segment: '+str(fuelSegment))
 		########################################################################################
 
 		####################################################################################
 		## Wrapping things up
-		logger(myLogFile,rankMsg,LOG_STD,'-------------------------------------------------------')
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'-------------------------------------------------------')
 		########################################################################################
 	else: clustered = False
 
@@ -368,16 +550,31 @@ def informNodes(info,currentCluster,tag):
 	"""
 	Informing nodes in my cluster about my decision to
 	remain in the cluster
+	One allgather in the cluster sub-communicator (CLUSTER_COMMS) or
+	one non-blocking round, see exchangeWithNodes
 	"""
-	response={}
-	for flight in currentCluster:
-		if flight != rank: sendMPIMsg(flight,info,tag)
-	for flight in currentCluster:
-		if flight != rank:
-			dataDict = receiveMPIMsg(flight,tag)
-			sender = dataDict['sender']
-			info = dataDict['data']
-			response[sender] = info
+	global qOfMSGSent, bytesSent, sendingTime
+	global qOfClusteredMSGSent, bytesClusteredSent, sendingClusteredTime
+	global qOfMSGReceived, bytesReceived, receivingTime
+	global qOfClusteredMSGReceived, bytesClusteredReceived, receivingClusteredTime
+	nodes = [flight for flight in currentCluster if flight != rank]
+	if CLUSTER_COMMS:
+		initT = datetime.now()
+		infos, msgBytes, receivedBytes = allgatherPickledMsg(getClusterComm(currentCluster), info)
+		endT = datetime.now()
+		infos = dict(zip(sorted(currentCluster), infos))
+		receivedBytes = dict(zip(sorted(currentCluster), receivedBytes))
+		response = {}
+		for flight in nodes: response[flight] = infos[flight]
+		countClusterMsgs(len(nodes), msgBytes, sum(receivedBytes[flight] for flight in nodes), returnSeconds(initT,endT))
+		return response
+	response, msgBytes, receivedBytes, msgSendingTime, msgReceivingTime = exchangeWithNodes(comm, info, nodes, tag)
+	qOfMSGSent+=len(nodes); qOfClusteredMSGSent+=len(nodes)
+	bytesSent+=msgBytes*len(nodes); bytesClusteredSent+=msgBytes*len(nodes)
+	sendingTime+=msgSendingTime; sendingClusteredTime+=msgSendingTime
+	qOfMSGReceived+=len(nodes); qOfClusteredMSGReceived+=len(nodes)
+	bytesReceived+=sum(receivedBytes.values()); bytesClusteredReceived+=sum(receivedBytes.values())
+	receivingTime+=msgReceivingTime; receivingClusteredTime+=msgReceivingTime
 	return response
 
 def readParameters():
@@ -411,14 +608,12 @@ def receiveMPIMsg(src=MPI.ANY_SOURCE,t=MPI.ANY_TAG):
 	global qOfMSGReceived, bytesReceived, receivingTime
 	global qOfClusteredMSGReceived, bytesClusteredReceived, receivingClusteredTime
 	dataDict={}
-	status = MPI.Status()
 	initT = datetime.now()
-	data=comm.recv(source=src, tag=t, status=status)
+	data, sender, msgBytes = receivePickledMsg(comm, src, t)
 	endT = datetime.now()
 	dataDict['data']=data
-	dataDict['sender']=int(status.Get_source())
+	dataDict['sender']=int(sender)
 	msgDuration = returnSeconds(initT,endT)
-	msgBytes = getBytes(data)
 	qOfMSGReceived+=1
 	bytesReceived+=msgBytes
 	receivingTime+=msgDuration
@@ -436,10 +631,9 @@ def sendMPIMsg(destination,data,t=MPI.ANY_TAG):
 	global qOfMSGSent, bytesSent, sendingTime
 	global qOfClusteredMSGSent, bytesClusteredSent, sendingClusteredTime
 	initT = datetime.now()
-	comm.send(data, dest=destination,tag=t)
+	msgBytes = sendPickledMsg(comm, destination, data, t)
 	endT = datetime.now()
 	msgDuration = returnSeconds(initT,endT)
-	msgBytes = getBytes(data)
 	qOfMSGSent+=1
 	bytesSent+=msgBytes
 	sendingTime+=msgDuration
@@ -448,14 +642,57 @@ def sendMPIMsg(destination,data,t=MPI.ANY_TAG):
 		bytesClusteredSent+=msgBytes
 		sendingClusteredTime+=msgDuration
 
+def scatterClusters(clusters=None, cruising=False):
+
+	"""
+	Scattering clusters assigned by the network manager to cruise flights
+	clusters: {flight: cluster} at the network manager
+	Returns my cluster, None if I am not cruising
+	"""
+	global qOfMSGSent, bytesSent, sendingTime
+	global qOfMSGReceived, bytesReceived, receivingTime
+	if NM_EXCHANGE == 'cruise':
+		initT = datetime.now()
+		if rank == nmRank:
+			msgBytes = sendPickledMsgs(comm, clusters, NM_CLUSTERS_TAG)
+			endT = datetime.now()
+			qOfMSGSent+=len(msgBytes)
+			bytesSent+=sum(msgBytes.values())
+			sendingTime+=returnSeconds(initT,endT)
+			return None
+		if not cruising: return None
+		myCluster, sender, msgBytes = receivePickledMsg(comm, nmRank, NM_CLUSTERS_TAG)
+		endT = datetime.now()
+		qOfMSGReceived+=1
+		bytesReceived+=msgBytes
+		receivingTime+=returnSeconds(initT,endT)
+		return myCluster
+	data = None
+	if rank == nmRank: data = [clusters.get(flight) for flight in range(size)]
+	initT = datetime.now()
+	myCluster, msgBytes, sentBytes = scatterPickledMsgs(comm, data, nmRank)
+	endT = datetime.now()
+	msgDuration = returnSeconds(initT,endT)
+	if rank == nmRank:
+		for flight in clusters:
+			qOfMSGSent+=1
+			bytesSent+=sentBytes[flight]
+		sendingTime+=msgDuration
+	elif myCluster is not None:
+		qOfMSGReceived+=1
+		bytesReceived+=msgBytes
+		receivingTime+=msgDuration
+	return myCluster
+
 def settingSimFiles():
 
 	"""
 	Setting simulation flights
 	"""
-	global myPerformanceFile
+	global myPerformanceFile, myEventsFile
 	global resultsFile, summaryFile, cooperativeFlightsFile
 	myPerformanceFile=outputFolder+'/'+str(rank)+'_perf.txt'
+	myEventsFile=getRankEventsFile(outputFolder, rank)
 	resultsFile = outputFolder+'/results.txt'
 	summaryFile = outputFolder+'/summary.txt'
 	cooperativeFlightsFile = outputFolder+'/cooperativeFlights.txt'
@@ -477,7 +714,7 @@ def settingOriginalTrajectory():
 	Setting original trajectory
 	"""
 	global rankTrajectoryFile, rankTrajectoryHPCFile
-	global originalTrajectory, hpcTrajectory
+	global originalTrajectory, hpcTrajectory, hpcChanges
 	global myInitTime, myEndTime
 
 	########################################################################################
@@ -485,12 +722,13 @@ def settingOriginalTrajectory():
 	rankTrajectoryFile=trajectoriesFolder+'/'+str(rank).zfill(len(str(flightsQ)))+'.eSo6'
 	rankTrajectoryHPCFile=hpcTrajectoriesFolder+'/'+str(rank).zfill(len(str(flightsQ)))+'.eSo6'
 	logger(myLogFile,rankMsg,LOG_STD,'Reading original trajectory')
-	originalTrajectory, myInitTime, myEndTime = readESO6Trajectory(rankTrajectoryFile)
+	originalTrajectory, myInitTime, myEndTime = readTrajectory(trajectoriesFolder, flightsQ, rank)
 	########################################################################################
 
 	########################################################################################
 	### Replacing original trajectory for hpc trajectory
-	hpcTrajectory=[x[:] for x in originalTrajectory]
+	hpcTrajectory=dict((field, originalTrajectory[field].copy()) for field in originalTrajectory)
+	hpcChanges={}
 	########################################################################################
 
 	logger(myLogFile,rankMsg,LOG_STD,'Original trajectory has been read') ###
@@ -531,7 +769,10 @@ def startClock():
 	global initTime, endTime, currTime
 	myClockInitTime, myCompInitTime, myInitDateTime = returnSecondsFromEpoch(), getComputingTime(), getDateAndTime()
 	myClockTimes=[]; myCompTimes=[]
-	initTime, endTime = calculateInitAndEndTime(trajectoriesFolder, size, flightsQ)
+	### Every flight reads only its own trajectory, the simulation window is reduced over all flights
+	if rank != nmRank: settingOriginalTrajectory()
+	initTime = comm.allreduce(myInitTime if rank != nmRank else sys.maxsize, op=MPI.MIN)
+	endTime = comm.allreduce(myEndTime if rank != nmRank else -sys.maxsize, op=MPI.MAX)
 	currTime=initTime
 	if rank == nmRank:
 		logger(myLogFile,rankMsg,LOG_STD,' Calculating simulation init and end time')
@@ -544,9 +785,9 @@ def updateCluster(response, currentCluster):
 	Updating cluster
 	"""
 	for flight in response:
-		logger(myLogFile,rankMsg,LOG_STD,'Flight '+str(flight)+', clustered status: '+str(response[flight]))
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Flight '+str(flight)+', clustered status: '+str(response[flight]))
 		if response[flight] == False:
-			logger(myLogFile,rankMsg,LOG_STD,'Deleting Flight '+str(flight)+' from my current cluster')
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Deleting Flight '+str(flight)+' from my current cluster')
 			if flight in currentCluster: del(currentCluster[currentCluster.index(flight)])
 	return currentCluster
 
@@ -558,9 +799,9 @@ def vicsek(currentCluster):
 	Returns the next position according to Vicsek model
 	"""
 	clusterSize=len(currentCluster)
-	track=float(hpcTrajectory[timestep][SEGMENT_TRACK])
-	flightLevel=int(hpcTrajectory[timestep][SEGMENT_LEVEL_INIT])
-	groundSpeed=float(hpcTrajectory[timestep][SEGMENT_GROUND_SPEED])
+	track=float(hpcTrajectory[SEGMENT_TRACK][timestep])
+	flightLevel=int(hpcTrajectory[SEGMENT_LEVEL_INIT][timestep])
+	groundSpeed=float(hpcTrajectory[SEGMENT_GROUND_SPEED][timestep])
 	info = [track,flightLevel,groundSpeed]
 	response = informNodes(info,currentCluster,VICSEK_TAG)
 	myNewTrack=0.0
@@ -582,11 +823,11 @@ def vicsek(currentCluster):
 	dy=myNewGS*deltaT*sin(radians(myNewTrack))
 	dist=sqrt(pow(dx,2)+pow(dy,2))
 	dist = convertNMtoM(dist)
-	latCurrent=float(hpcTrajectory[timestep][SEGMENT_LAT_INIT])/60
-	lonCurrent=float(hpcTrajectory[timestep][SEGMENT_LON_INIT])/60
+	latCurrent=float(hpcTrajectory[SEGMENT_LAT_INIT][timestep])/60
+	lonCurrent=float(hpcTrajectory[SEGMENT_LON_INIT][timestep])/60
 	nextPositionHPC=getPoint(latCurrent,lonCurrent,myNewTrack,dist)
 	testCoordinates = {'latInit':latCurrent,'lonInit':lonCurrent,'latEnd':nextPositionHPC['LAT'],'lonEnd':nextPositionHPC['LON']}
-	logger(myLogFile,rankMsg,LOG_STD,'Vicsek -- Test coordinates: '+str(testCoordinates))
+	if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Vicsek -- Test coordinates: '+str(testCoordinates))
 	return nextPositionHPC, myNewFL
 
 def writeTrajectoryFile():
@@ -595,17 +836,8 @@ def writeTrajectoryFile():
 	Writing trajectory file
 	"""
 	logger(myLogFile,rankMsg,LOG_STD,'Writing cooperative trajectory')
-	if originalTrajectory == hpcTrajectory:
-		logger(myLogFile,rankMsg,LOG_STD,'My original trajectory was not modified')
-		os.system('cp '+rankTrajectoryFile+' '+rankTrajectoryHPCFile)
-	else:
-		logger(myLogFile,rankMsg,LOG_STD,'My original trajectory was modified')
-		newTrajFile=open(rankTrajectoryHPCFile,'a')
-		for segment in hpcTrajectory:
-			line=''
-			for data in segment: line+=data+' '
-			newTrajFile.write(line+'\n')
-		newTrajFile.close()
+	if writeHPCTrajectory(rankTrajectoryFile, rankTrajectoryHPCFile, hpcChanges): logger(myLogFile,rankMsg,LOG_STD,'My original trajectory was modified')
+	else: logger(myLogFile,rankMsg,LOG_STD,'My original trajectory was not modified')
 	logger(myLogFile,rankMsg,LOG_STD,'Trajectory file created')
 
 ######################################################################################################################################################
@@ -628,15 +860,12 @@ def main():
 
 	##################################################################################################################################################
 	### Network Manager variables
-	global vehiclesPosition, liveFlights, nmQOfClusters, qOfClusters, clusters, cruiseFlights, clusteredFlights, setClusters, aircraftNetwork
-	global GRC_sum, GRC_updates, totalOriginalFuel, totalCooperatedFuel, aircraftQOfClusters, aircraftClusteredDuration, flightsClusteredFlights
-	global procsBytesSent, procsBytesReceived, procsSendingTime, procsReceivingTime, procsQOfMSGSent, procsQOfMSGReceived
-	global aircraftBytesClusteredSent, aircraftBytesClusteredReceived, aircraftSendingClusteredTime, aircraftReceivingClusteredTime, aircraftQOfClusteredMSGSent, aircraftQOfClusteredMSGReceived
+	global nm, timeline
 	##################################################################################################################################################
 
 	##################################################################################################################################################
 	### Flight variables
-	global clustered, currentCluster, timestep, joined, myQOfClusters, myClusteredDuration, myOriginalFuel, myCooperatedFuel, myKd, myClusteredFlights
+	global clusterComms, clustered, currentCluster, timestep, joined, myQOfClusters, myClusteredDuration, myOriginalFuel, myCooperatedFuel, myKd, myClusteredFlights
 	global bytesClusteredSent, bytesClusteredReceived, sendingClusteredTime, receivingClusteredTime, qOfClusteredMSGSent, qOfClusteredMSGReceived
 	##################################################################################################################################################
 
@@ -693,40 +922,11 @@ def main():
 	### Initialization Simulation variables
 	logger(myLogFile,rankMsg,LOG_STD,'Setting simulation variables')
 	if rank == nmRank:
-		vehiclesPosition = {}
-		liveFlights = [i for i in range(1,size)]
-		nmQOfClusters = 0
-		qOfClusters = 0
-		clusters = {}
-		for flight in liveFlights: clusters[flight] = []
-		cruiseFlights = []
-		clusteredFlights = []
-		setClusters = False
-		aircraftNetwork = None
-		GRC_sum = 0.0
-		GRC_updates = 0
-		maxGRC = 0.0
-		minGRC = 0.0
-		totalOriginalFuel = 0.0
-		totalCooperatedFuel = 0.0
-		aircraftQOfClusters = []
-		aircraftClusteredDuration = []
-		flightsClusteredFlights = {}
-		procsBytesSent = []
-		procsBytesReceived = []
-		procsSendingTime = []
-		procsReceivingTime = []
-		procsQOfMSGSent = []
-		procsQOfMSGReceived = []
-		aircraftBytesClusteredSent = []
-		aircraftBytesClusteredReceived = []
-		aircraftSendingClusteredTime = []
-		aircraftReceivingClusteredTime = []
-		aircraftQOfClusteredMSGSent = []
-		aircraftQOfClusteredMSGReceived = []
+		nm = initNetworkManager([i for i in range(1,size)])
 	else:
 		clustered = False
 		currentCluster=[]
+		clusterComms = {}
 		timestep=0
 		joined = False
 		myQOfClusters = 0
@@ -756,294 +956,87 @@ def main():
 	if rank == nmRank:
 		##################################################################################################################################################
 		### Simulation
+		timeline = gatherTimeline()
 		logger(myLogFile,rankMsg,LOG_STD,'Starting simulation')
-		while currTime <= endTime:
+		for currTime, qOfSteps in getActiveTimes(timeline, initTime, endTime):
 			##################################################################################################################################################
 			### Sending current time to live flights
-			logger(myLogFile,rankMsg,LOG_STD,'-------------------------------------------------------')
-			logger(myLogFile,rankMsg,LOG_STD,'Current time = '+str(currTime))
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'-------------------------------------------------------')
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Current time = '+str(currTime))
 			##################################################################################################################################################
 
 			##################################################################################################################################################
-			### Get status of all flights -- MPI communication
-			logger(myLogFile,rankMsg,LOG_STD,'Receiving flights current status')
-			statuses={}
-			for flight in liveFlights:
-				msg=receiveMPIMsg(flight,STATUS_TAG)
-				flight=msg['sender']
-				flightStatus=msg['data']
-				statuses[flight]=flightStatus
-				logger(myLogFile,rankMsg,LOG_STD,'Flight: '+str(flight)+' -- '+str(flightStatus))
+			### Get status of all flights and telemetry from cruise flights -- MPI communication
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Receiving flights current status')
+			statuses, vehiclesPosition = gatherFlightsState()
+			if DEBUG_LOG:
+				for flight in nm['liveFlights']: logger(myLogFile,rankMsg,LOG_DBG,'Flight: '+str(flight)+' -- '+str(statuses[flight]))
 			##################################################################################################################################################
 
 			##################################################################################################################################################
 			### Updating centralized image of the aircraft network
-			logger(myLogFile,rankMsg,LOG_STD,'Updating centralized image of the aircraft network')
-			for flight in liveFlights:
-				if statuses[flight] == 'CRUISE':
-					if flight not in cruiseFlights: cruiseFlights.append(flight)
-				elif statuses[flight] == 'DESCENT':
-					if flight in cruiseFlights: del(cruiseFlights[cruiseFlights.index(flight)])
-					if flight in clusteredFlights:
-						del(clusteredFlights[clusteredFlights.index(flight)])
-						clusters[flight]=[]
-						for f in clusters:
-							if flight in clusters[f]: del(clusters[f][clusters[f].index(flight)])
-			qOfCruiseFlights = len(cruiseFlights)
-			if qOfCruiseFlights > 0: aircraftNetwork = setNetwork(cruiseFlights)
-			logger(myLogFile,rankMsg,LOG_STD,'Number of cruise flights are '+str(qOfCruiseFlights))
-			logger(myLogFile,rankMsg,LOG_STD,'Cruise flights are '+str(cruiseFlights))
+			updateAircraftNetworkImage(nm, statuses, myLogFile, rankMsg)
 			##################################################################################################################################################
 
 			##################################################################################################################################################
-			### Get telemetry from cruise flights -- MPI communication
-			if qOfCruiseFlights > 0: logger(myLogFile,rankMsg,LOG_STD,'Receiving telemetry from cruised flights')
-			for flight in cruiseFlights:
-				dataDict=receiveMPIMsg(flight,TELEMETRY_TAG)
-				vehiclesPosition[dataDict['sender']]=dataDict['data']
+			### Telemetry from cruise flights
+			if DEBUG_LOG and nm['qOfCruiseFlights'] > 0: logger(myLogFile,rankMsg,LOG_DBG,'Updating telemetry from cruised flights')
+			for flight in nm['cruiseFlights']: nm['vehiclesPosition'][flight]=vehiclesPosition[flight]
 			##################################################################################################################################################
 
 			##################################################################################################################################################
 			### Calculating NM clusters and updating possible (NM) quantity of clusters
-			if qOfCruiseFlights >= 2:
-				logger(myLogFile,rankMsg,LOG_STD,'Computing clusters using clustering = '+str(grouping)+' model')
-				previousNMClusters = dict(clusters)
-				if grouping == 'fifo': clusters, clusteredFlights, setClusters = fifo(clusters, vehiclesPosition ,cruiseFlights, radius, currTime)
-				logger(myLogFile,rankMsg,LOG_STD,'Set clusters = '+str(setClusters))
-				if setClusters:
-					checkedFlights = []
-					### Updating quantity of clusters calculated by NM
-					for flight in clusters:
-						if len(previousNMClusters[flight]) == 0 and len(clusters[flight]) > 0 and flight not in checkedFlights:
-							nmQOfClusters+=1
-							for f in clusters[flight]: checkedFlights.append(f)
-					nmClusters = dict(clusters)
-					nmClustersLine=''
-					for flight in sorted(nmClusters): nmClustersLine+=str(flight)+':'+str(nmClusters[flight])+' '
-					logger(myLogFile,rankMsg,LOG_STD,'Clusters calculated by Network Manager: '+nmClustersLine)
-					logger(myLogFile,rankMsg,LOG_STD,'Current quantity of clusters calculated by network manager are '+str(nmQOfClusters))
-			else: logger(myLogFile,rankMsg,LOG_STD,'Not enough cruise flights to run clustering = '+str(grouping)+' model')
-			qOfClusteredFlights=len(clusteredFlights)
-			logger(myLogFile,rankMsg,LOG_STD,'Number of clustered flights are '+str(qOfClusteredFlights))
-			logger(myLogFile,rankMsg,LOG_STD,'Clustered flights are: '+str(clusteredFlights))
+			computeNMClusters(nm, grouping, radius, currTime, myLogFile, rankMsg, myEventsFile)
 			##################################################################################################################################################
 
 			##################################################################################################################################################
 			### Sending NM clusters to cruise flights -- MPI communication
-			for i in cruiseFlights: sendMPIMsg(i,clusters[i],NM_CLUSTERS_TAG)
+			scatterClusters(dict((flight, nm['clusters'][flight]) for flight in nm['cruiseFlights']))
 			##################################################################################################################################################
 
 			##################################################################################################################################################
 			### Updating clusters and aircrat network with aircraft responses -- MPI communication
-			unClusteredFlights = []
-			for flight in clusteredFlights:
-				dataDict=receiveMPIMsg(flight,AC_SLAVES_TAG)
-				if not dataDict['data']: unClusteredFlights.append(dataDict['sender'])
-			for flight in unClusteredFlights:
-				del(clusteredFlights[clusteredFlights.index(flight)])
-				clusters[flight]=[]
-				for f in clusters:
-					if flight in clusters[f]: del(clusters[f][clusters[f].index(flight)])
+			responses = gatherResponses(flights=nm['cruiseFlights'])
+			removeUnclusteredFlights(nm, [flight for flight in nm['clusteredFlights'] if not responses[flight]])
 			##################################################################################################################################################
 
 			##################################################################################################################################################
 			### Calculating accepted clusters by flights
-			if setClusters:
-				if clusters == nmClusters: logger(myLogFile,rankMsg,LOG_STD,'All flights accepted its assigned NM clusters')
-				else:
-					clustersLine=''
-					for flight in sorted(clusters): clustersLine+=str(flight)+':'+str(clusters[flight])+' '
-					logger(myLogFile,rankMsg,LOG_STD,'Accepted clusters: '+clustersLine)
-				checkedFlights = []
-				for flight in clusters:
-					if len(previousNMClusters[flight]) == 0 and len(clusters[flight]) > 0 and flight not in checkedFlights:
-						qOfClusters+=1
-						for f in clusters[flight]: checkedFlights.append(f)
+			countAcceptedClusters(nm, myLogFile, rankMsg, qOfSteps)
 			##################################################################################################################################################
 
 			##################################################################################################################################################
 			### Calculating GRC and storing results
-			if qOfCruiseFlights > 1:
-				aircraftNetwork=addEdges(aircraftNetwork,clusters)
-				GRC = calculateGRC(calculateLRC(aircraftNetwork))
-				if GRC > maxGRC: maxGRC = GRC
-				if GRC < minGRC: minGRC = GRC
-				GRC_sum += GRC
-				GRC_updates+=1
-				writeResultsFile(resultsFile, currTime, qOfCruiseFlights, nmQOfClusters, qOfClusters, GRC, False)
-			##################################################################################################################################################
-
-			##################################################################################################################################################
-			### Next time step updating
-			currTime+=TIME_STEP
+			storeStepResults(nm, resultsFile, currTime)
 			##################################################################################################################################################
 		########################################################################################
 
 		########################################################################################
 		### Reading simulation summary for all flights and NM
 		logger(myLogFile,rankMsg,LOG_STD,'Receiving flight simulation summaries')
-		flightsWithFuelProfit = []
-		flightsWithoutFuelProfit = []
-		for flight in liveFlights:
+		flightsSummaries = {}
+		for flight in nm['liveFlights']:
 			msg=receiveMPIMsg(flight,SIM_SUMARY_TAG)
-			flightSummary=msg['data']
-			flightOriginalFuel = flightSummary[0]
-			flightCooperatedFuel = flightSummary[1]
-			flightQOfClusters = flightSummary[2]
-			flightClusteredDuration = flightSummary[3]
-			flightClusteredFlights = flightSummary[4]
-			flightBytesSent = flightSummary[5]
-			flightBytesReceived = flightSummary[6]
-			flightSendingTime = flightSummary[7]
-			flightReceivingTime = flightSummary[8]
-			flightQOfMSGSent = flightSummary[9]
-			flightQOfMSGReceived = flightSummary[10]
-			flightBytesClusteredSent = flightSummary[11]
-			flightBytesClusteredReceived = flightSummary[12]
-			flightSendingClusteredTime = flightSummary[13]
-			flightReceivingClusteredTime = flightSummary[14]
-			flightQOfClusteredMSGSent = flightSummary[15]
-			flightQOfClusteredMSGReceived = flightSummary[16]
-			if float(flightOriginalFuel) > float(flightCooperatedFuel): flightsWithFuelProfit.append(flight)
-			elif float(flightOriginalFuel) < float(flightCooperatedFuel): flightsWithoutFuelProfit.append(flight)
-			totalOriginalFuel += flightOriginalFuel
-			totalCooperatedFuel += flightCooperatedFuel
-			if flightQOfClusters > 0:
-				aircraftQOfClusters.append(flightQOfClusters)
-				aircraftClusteredDuration.append(flightClusteredDuration)
-			flightsClusteredFlights[flight] = flightClusteredFlights
-			procsBytesSent.append(flightBytesSent)
-			procsBytesReceived.append(flightBytesReceived)
-			procsSendingTime.append(flightSendingTime)
-			procsReceivingTime.append(flightReceivingTime)
-			procsQOfMSGSent.append(flightQOfMSGSent)
-			procsQOfMSGReceived.append(flightQOfMSGReceived)
-			if flightQOfClusters > 0:
-				aircraftBytesClusteredSent.append(flightBytesClusteredSent)
-				aircraftBytesClusteredReceived.append(flightBytesClusteredReceived)
-				aircraftSendingClusteredTime.append(flightSendingClusteredTime)
-				aircraftReceivingClusteredTime.append(flightReceivingClusteredTime)
-				aircraftQOfClusteredMSGSent.append(flightQOfClusteredMSGSent)
-				aircraftQOfClusteredMSGReceived.append(flightQOfClusteredMSGReceived)
-		procsBytesSent.append(bytesSent)
-		procsBytesReceived.append(bytesReceived)
-		procsSendingTime.append(sendingTime)
-		procsReceivingTime.append(receivingTime)
-		procsQOfMSGSent.append(qOfMSGSent)
-		procsQOfMSGReceived.append(qOfMSGReceived)
+			flightsSummaries[flight]=msg['data']
 		########################################################################################
 
 		########################################################################################
 		### Computing and writing simulation summary
 		logger(myLogFile,rankMsg,LOG_STD,'Computing and writing simulation summary')
-		acceptanceRatio = float(qOfClusters * 100) / nmQOfClusters if nmQOfClusters >= 1 else 0
-		averageQOfClusters = float(sum(aircraftQOfClusters)) / len(aircraftQOfClusters) if len(aircraftQOfClusters) > 0 else 0
-		maxQOfClusters = max(aircraftQOfClusters) if len(aircraftQOfClusters) > 0 else 0
-		minQOfClusters = min(aircraftQOfClusters) if len(aircraftQOfClusters) > 0 else 0
-		averageClusteredDuration = float(sum(aircraftClusteredDuration)) / len(aircraftClusteredDuration) if len(aircraftClusteredDuration) > 0 else 0
-		maxClusteredDuration = max(aircraftClusteredDuration) if len(aircraftClusteredDuration) > 0 else 0
-		minClusteredDuration = min(aircraftClusteredDuration) if len(aircraftClusteredDuration) > 0 else 0
-		averageBytesClusteredSent = float(sum(aircraftBytesClusteredSent)) / len(aircraftBytesClusteredSent) if len(aircraftBytesClusteredSent) > 0 else 0
-		maxBytesClusteredSent = max(aircraftBytesClusteredSent) if len(aircraftBytesClusteredSent) > 0 else 0
-		minBytesClusteredSent = min(aircraftBytesClusteredSent) if len(aircraftBytesClusteredSent) > 0 else 0
-		averageBytesClusteredReceived = float(sum(aircraftBytesClusteredReceived)) / len(aircraftBytesClusteredReceived) if len(aircraftBytesClusteredReceived) > 0 else 0
-		maxBytesClusteredReceived = max(aircraftBytesClusteredReceived) if len(aircraftBytesClusteredReceived) > 0 else 0
-		minBytesClusteredReceived = min(aircraftBytesClusteredReceived) if len(aircraftBytesClusteredReceived) > 0 else 0
-		averageSendingClusteredTime = float(sum(aircraftSendingClusteredTime)) / len(aircraftSendingClusteredTime) if len(aircraftSendingClusteredTime) > 0 else 0
-		maxSendingClusteredTime = max(aircraftSendingClusteredTime) if len(aircraftSendingClusteredTime) > 0 else 0
-		minSendingClusteredTime = min(aircraftSendingClusteredTime) if len(aircraftSendingClusteredTime) > 0 else 0
-		averageReceivingClusteredTime = float(sum(aircraftReceivingClusteredTime)) / len(aircraftReceivingClusteredTime) if len(aircraftReceivingClusteredTime) > 0 else 0
-		maxReceivingClusteredTime = max(aircraftReceivingClusteredTime) if len(aircraftReceivingClusteredTime) > 0 else 0
-		minReceivingClusteredTime = min(aircraftReceivingClusteredTime) if len(aircraftReceivingClusteredTime) > 0 else 0
-		averageQOfClusteredMSGSent = float(sum(aircraftQOfClusteredMSGSent)) / len(aircraftQOfClusteredMSGSent) if len(aircraftQOfClusteredMSGSent) > 0 else 0
-		maxQOfClusteredMSGSent = max(aircraftQOfClusteredMSGSent) if len(aircraftQOfClusteredMSGSent) > 0 else 0
-		minQOfClusteredMSGSent = min(aircraftQOfClusteredMSGSent) if len(aircraftQOfClusteredMSGSent) > 0 else 0
-
-		averageQOfClusteredMSGReceived = float(sum(aircraftQOfClusteredMSGReceived)) / len(aircraftQOfClusteredMSGReceived) if len(aircraftQOfClusteredMSGReceived) > 0 else 0
-		maxQOfClusteredMSGReceived = max(aircraftQOfClusteredMSGReceived) if len(aircraftQOfClusteredMSGReceived) > 0 else 0
-		minQOfClusteredMSGReceived = min(aircraftQOfClusteredMSGReceived) if len(aircraftQOfClusteredMSGReceived) > 0 else 0
-
-		summaryResults = [tcID,
-						  scenario,
-						  size-1,
-						  size,
-						  qOfMachines,
-						  machines,
-						  model,
-						  grouping,
-						  radius,
-						  alonefuelparameter,
-						  coopfuelparameter,
-						  approachedDistance,
-						  qOfClusters,
-						  nmQOfClusters,
-						  acceptanceRatio,
-						  GRC_sum / GRC_updates,
-						  maxGRC,
-						  minGRC,
-						  GRC_updates,
-						  totalOriginalFuel,
-						  totalCooperatedFuel,
-						  totalOriginalFuel-totalCooperatedFuel,
-						  len(flightsWithFuelProfit),
-						  flightsWithFuelProfit,
-						  len(flightsWithoutFuelProfit),
-						  flightsWithoutFuelProfit,
-						  averageQOfClusters,
-						  maxQOfClusters,
-						  minQOfClusters,
-						  averageClusteredDuration,
-						  maxClusteredDuration,
-						  minClusteredDuration,
-						  sum(procsBytesSent),
-						  float(sum(procsBytesSent)) / len(procsBytesSent),
-						  max(procsBytesSent),
-						  min(procsBytesSent),
-						  sum(procsBytesReceived),
-						  float(sum(procsBytesReceived)) / len(procsBytesReceived),
-						  max(procsBytesReceived),
-						  min(procsBytesReceived),
-				  		  sum(procsSendingTime),
-						  float(sum(procsSendingTime)) / len(procsSendingTime),
-						  max(procsSendingTime),
-						  min(procsSendingTime),
-						  sum(procsReceivingTime),
-						  float(sum(procsReceivingTime)) / len(procsReceivingTime),
-						  max(procsReceivingTime),
-						  min(procsReceivingTime),
-						  sum(procsQOfMSGSent),
-						  float(sum(procsQOfMSGSent)) / len(procsQOfMSGSent),
-						  max(procsQOfMSGSent),
-						  min(procsQOfMSGSent),
-						  sum(procsQOfMSGReceived),
-						  float(sum(procsQOfMSGReceived)) / len(procsQOfMSGReceived),
-						  max(procsQOfMSGReceived),
-						  min(procsQOfMSGReceived),
-						  sum(aircraftBytesClusteredSent),
-						  averageBytesClusteredSent,
-						  maxBytesClusteredSent,
-						  minBytesClusteredSent,
-					   	  sum(aircraftBytesClusteredReceived),
-						  averageBytesClusteredReceived,
-						  maxBytesClusteredReceived,
-						  minBytesClusteredReceived,
-						  sum(aircraftSendingClusteredTime),
-						  averageSendingClusteredTime,
-						  maxSendingClusteredTime,
-						  minSendingClusteredTime,
-						  sum(aircraftReceivingClusteredTime),
-						  averageReceivingClusteredTime,
-						  maxReceivingClusteredTime,
-						  minReceivingClusteredTime,
-						  sum(aircraftQOfClusteredMSGSent),
-						  averageQOfClusteredMSGSent,
-						  maxQOfClusteredMSGSent,
-						  minQOfClusteredMSGSent,
-						  sum(aircraftQOfClusteredMSGReceived),
-						  averageQOfClusteredMSGReceived,
-						  maxQOfClusteredMSGReceived,
-						  minQOfClusteredMSGReceived]
-		summaryResults=map(str, summaryResults)
+		testCaseResults = [tcID,
+						   scenario,
+						   size-1,
+						   size,
+						   qOfMachines,
+						   machines,
+						   model,
+						   grouping,
+						   radius,
+						   alonefuelparameter,
+						   coopfuelparameter,
+						   approachedDistance]
+		nmSummary = [bytesSent, bytesReceived, sendingTime, receivingTime, qOfMSGSent, qOfMSGReceived]
+		summaryResults, flightsClusteredFlights = computeSimulationSummary(nm, testCaseResults, flightsSummaries, [nmSummary])
 		writeSummaryFile(summaryFile,summaryResults)
 		########################################################################################
 
@@ -1056,69 +1049,67 @@ def main():
 	else:
 
 		########################################################################################
-		### Setting original trajectory
-		settingOriginalTrajectory()
+		### Original trajectory was set when starting clock
 		myOriginalFuel = computeFuel(originalTrajectory)
 		logger(myLogFile,rankMsg,LOG_STD,'Original fuel = '+str(myOriginalFuel))
-		slavesComm.Barrier()
 		########################################################################################
 
 		########################################################################################
 		### Calculating cruise time
 		cruiseLine = calculateCruise()
-		slavesComm.Barrier()
 		########################################################################################
 
 		########################################################################################
 		### Calculating descent time
 		descentLine = calculateDescent()
-		slavesComm.Barrier()
 		########################################################################################
 
 		########################################################################################
 		### Computing Kd -- Constant for cooperative fuel calculation
 		myKd = computeKd(myLogFile,rankMsg,originalTrajectory,cruiseLine,descentLine)
+		emitEvent(myEventsFile,'timeline',myInitTime,rank,{'initTime': myInitTime, 'cruiseTime': cruiseTime, 'descentTime': descentTime, 'endTime': myEndTime})
 		########################################################################################
 
 		########################################################################################
 		timestep=0
 		flightStatus='NOT_STARTED'
+		timeline = gatherTimeline()
 		########################################################################################
 
 		### Simulation
+		### No barriers, message ordering with the network manager and cluster members keeps flights in step
+		### Only active times are simulated, flights keep their phase in between (lib/engine.getActiveTimes)
 		logger(myLogFile,rankMsg,LOG_STD,'Starting simulation')
-		slavesComm.Barrier()
-		while currTime <= endTime:
+		for currTime, qOfSteps in getActiveTimes(timeline, initTime, endTime):
 
 			########################################################################################
 			### Checking my flight status (CLIMB, DESCENT, CRUISE)
 			flightStatus = checkMyStatus(currTime)
-			sendMPIMsg(nmRank,flightStatus,STATUS_TAG)
-			slavesComm.Barrier()
+			gatherFlightsState(flightStatus, getSegment(hpcTrajectory, timestep) if flightStatus == 'CRUISE' else None)
 			########################################################################################
 
 			########################################################################################
 			### Sending telemetry to Network Manager and receiving currentCluster
 			previousCluster = currentCluster[:]
+			myCluster = scatterClusters(cruising=flightStatus == 'CRUISE')
+			response = None
 			if flightStatus == 'CRUISE':
-				sendMPIMsg(nmRank,hpcTrajectory[timestep],TELEMETRY_TAG)
-				dataDict=receiveMPIMsg(0,NM_CLUSTERS_TAG)
-				currentCluster=dataDict['data']
-				logger(myLogFile,rankMsg,LOG_STD,' NM Current cluster is '+str(currentCluster))
+				currentCluster=myCluster
+				if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,' NM Current cluster is '+str(currentCluster))
+				freeClusterComms(currentCluster)
 				if len(currentCluster) != 0:
 					### Executing HPC flying model and sending acceptance of cluster
 					hprcFly(currentCluster)
-					sendMPIMsg(0,clustered,AC_SLAVES_TAG)
+					response = clustered
 					if clustered and currentCluster != previousCluster: myQOfClusters+=1
-					logger(myLogFile,rankMsg,LOG_STD,' Informing NM about my clustered decision -- clustered: '+str(clustered)+', joined: '+str(joined))
-			slavesComm.Barrier()
+					if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,' Informing NM about my clustered decision -- clustered: '+str(clustered)+', joined: '+str(joined))
+			else: freeClusterComms()
+			gatherResponses(response, flightStatus == 'CRUISE')
 			########################################################################################
 
 			########################################################################################
 			### timestep updating
-			if flightStatus not in ['NOT_STARTED','FINISHED']: timestep+=1
-			currTime+=TIME_STEP
-			slavesComm.Barrier()
+			if flightStatus not in ['NOT_STARTED','FINISHED']: timestep+=qOfSteps
 			########################################################################################
 		########################################################################################
 
@@ -1128,7 +1119,7 @@ def main():
 		myCooperatedFuel = computeFuel(hpcTrajectory)
 		logger(myLogFile,rankMsg,LOG_STD,'Cooperated fuel = '+str(myCooperatedFuel))
 		logger(myLogFile,rankMsg,LOG_STD,'Difference in fuel = '+str(myOriginalFuel - myCooperatedFuel))
-		slavesComm.Barrier()
+		emitEvent(myEventsFile,'fuel',myEndTime,rank,{'originalFuel': myOriginalFuel, 'cooperatedFuel': myCooperatedFuel})
 		########################################################################################
 
 		########################################################################################
@@ -1152,7 +1143,6 @@ def main():
 							 qOfClusteredMSGSent,
 							 qOfClusteredMSGReceived]
 		sendMPIMsg(0,simulationSummary,SIM_SUMARY_TAG)
-		slavesComm.Barrier()
 		########################################################################################
 
 		########################################################################################
@@ -1166,10 +1156,13 @@ def main():
 	logger(myLogFile,rankMsg,LOG_STD,'Finishing simulation')
 	finishClock()
 	finishSim()
+	closeEvents()
 	comm.Barrier() ## Check for the flights to finish
 	if rank == 0:
 		logger(myLogFile,rankMsg,LOG_STD,'Computing performance file')
 		wrapIT(rankMsg,outputFolder, size)
+		logger(myLogFile,rankMsg,LOG_STD,'Merging events files')
+		mergeEvents(outputFolder, size)
 	logger(myLogFile,rankMsg,LOG_STD,'I am done :)')
 	##################################################################################################################################################
 
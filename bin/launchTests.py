@@ -14,17 +14,20 @@
 
 ### imports ##########################
 import os
+import stat
 import sys
 import xml.etree.ElementTree as ET
+from multiprocessing import Pool
 
 ######################################
 
 ### Imports from software modules
 from cofl.etc.info import COFL_SW, TC_TEMPLATE, LAUNCHER_SCRIPT, TEST_CASE_PREFIX, DATA_ROOT_FOLDER, TRAJ_FOLDER
-from cofl.etc.info import HPC_TRAJ_FOLDER, OUTPUT_FOLDER, LOGS_FOLDER, LINES_TC_TEMPLATE, INIT_LINES_LAUNCHER
+from cofl.etc.info import HPC_TRAJ_FOLDER, OUTPUT_FOLDER, LOGS_FOLDER, INIT_LINES_LAUNCHER
+from cofl.etc.configuration import PREPARATION_PROCESSES
 from cofl.lib.folders import createFolders
-from cofl.lib.split import splitESO6File, selectiveSplitESO6File
-from cofl.lib.ioFiles import modifyFile
+from cofl.lib.split import indexedSplitESO6File
+from cofl.lib.eSO6Index import readESO6Index
 ######################################
 
 ###############################################################################################################################
@@ -34,6 +37,7 @@ def createTCDataSpace(nm,fl):
 
 	"""
 	Create testcase data space
+	The original trajectories folder links to the split flight set shared by every NM
 	"""
 	print(rankMsg+' Creating data space for testcase NM = '+str(nm)+', Flights = '+str(fl))
 	tcID = date+'_'+hour+'_'+str(nm)+'NM_'+str(fl)+'FL'
@@ -42,33 +46,84 @@ def createTCDataSpace(nm,fl):
 	hpcTrajectoriesFolder=tcFolder+'/'+HPC_TRAJ_FOLDER
 	outputFolder=tcFolder+'/'+OUTPUT_FOLDER
 	logsFolder=tcFolder+'/'+LOGS_FOLDER
-	folders=[tcFolder, trajectoriesFolder, hpcTrajectoriesFolder, outputFolder, logsFolder]
+	folders=[tcFolder, hpcTrajectoriesFolder, outputFolder, logsFolder]
 	createFolders(folders)
+	if not os.path.lexists(trajectoriesFolder): os.symlink(getFlightSetFolder(fl), trajectoriesFolder)
 	return trajectoriesFolder
 
 def editTemplate(tcFile,tcLog,nm,fl):
 
 	"""
 	Editing template
+	The template is parsed, filled and written once, its declaration and comments are kept
 	"""
-	os.popen('cp '+TC_TEMPLATE+' '+tcFile)
 	print(rankMsg+' Editting template for testcase NM = '+str(nm)+', Flights = '+str(fl))
+	values = {
+		'id': date+'_'+hour+'_'+str(nm)+'NM_'+str(fl)+'FL',
+		'flights': str(fl),
+		'scenario': scenario,
+		'model': model,
+		'grouping': grouping,
+		'radius': str(nm),
+		'alonefuelparameter': alonefuelparameter,
+		'coopfuelparameter': coopfuelparameter,
+		'approachedDistance': approachedDistance,
+		'infrastructureFile': infrastructureFile,
+		'log': tcLog
+	}
+	with open(TC_TEMPLATE,'rb') as templateFile: template=templateFile.read()
+	root=ET.fromstring(template, ET.XMLParser(target=_getCommentsTreeBuilder()))
+	for element in root:
+		if element.tag in values: element.text = values[element.tag]
+	with open(tcFile,'wb') as tcXML:
+		tcXML.write(template[:template.index(b'<'+root.tag.encode())]) ## XML declaration and comments before the test case
+		tcXML.write(ET.tostring(root, encoding='utf-8')+b'\n')
 	print(rankMsg+' Template saved at '+tcFile)
-	replaceLines = [
-		'<id>'+date+'_'+hour+'_'+str(nm)+'NM_'+str(fl)+'FL'+'</id>',
-		'<flights>'+str(fl)+'</flights>',
-		'<scenario>'+scenario+'</scenario>',
-		'<model>'+model+'</model>',
-		'<grouping>'+grouping+'</grouping>',
-		'<radius>'+str(nm)+'</radius>',
-		'<alonefuelparameter>'+alonefuelparameter+'</alonefuelparameter>',
-		'<coopfuelparameter>'+coopfuelparameter+'</coopfuelparameter>',
-		'<approachedDistance>'+approachedDistance+'</approachedDistance>',
-		'<infrastructureFile>'+infrastructureFile+'</infrastructureFile>',
-		'<log>'+tcLog+'</log>'
-	]
-
-	for searchLine, replaceLine in zip(LINES_TC_TEMPLATE, replaceLines): modifyFile(tcFile,searchLine,replaceLine)
+
+def getFlightSetFolder(fl):
+
+	"""
+	Returns the folder of the first fl flights of the sweep, shared by the test cases of every NM
+	"""
+	return testsFolder+'/'+TRAJ_FOLDER+'/'+date+'_'+hour+'_'+airport+'_'+str(fl)+'FL'
+
+def getTestCases():
+
+	"""
+	Returns the (NM, flights, template file, log file) test cases of the sweep
+	"""
+	tCPrefix=TEST_CASE_PREFIX+airport+'_' if airport != 'NA' else TEST_CASE_PREFIX
+	testCases = []
+	for nm in range(minNM, maxNM+1, intervalSizeNM):
+		i = 0
+		for fl in range(minFlights, maxFlights+1):
+			fltc=minFlights*pow(2,i)
+			tcFile = testsFolder+'/templates/'+tCPrefix+str(nm)+'_'+str(fltc)+'.xml'
+			tcLog = testsFolder+'/logs/'+tCPrefix+str(nm)+'_'+str(fltc)+'.log'
+			testCases.append((nm,fltc,tcFile,tcLog))
+			if fltc == maxFlights: break
+			i+=1
+	return testCases
+
+def prepareFlightSet(fl):
+
+	"""
+	Splitting the original trajectories of a flight set
+	"""
+	trajectoriesFolder = getFlightSetFolder(fl)
+	createFolders([trajectoriesFolder])
+	setOriginalTrajectories(trajectoriesFolder,fl)
+	return trajectoriesFolder
+
+def prepareTestCase(testCase):
+
+	"""
+	Preparing data space and template of a test case
+	"""
+	nm, fl, tcFile, tcLog = testCase
+	createTCDataSpace(nm,fl)
+	editTemplate(tcFile,tcLog,nm,fl)
+	return testCase
 
 def readXML():
 
@@ -128,19 +183,28 @@ def readXML():
 		####################################################################################
 	except Exception, e: raise
 
-def setOriginalTrajectories(trajectoriesFolder,nm,fl):
+def setOriginalTrajectories(trajectoriesFolder,fl):
 
 	"""
 	Setting original trajectories
 	"""
-	print(rankMsg+' Setting original trajectories for testcase NM = '+str(nm)+', Flights = '+str(fl))
+	print(rankMsg+' Setting original trajectories for Flights = '+str(fl))
 	sys.stdout = open(os.devnull, "w")
-	if airport == 'NA': splitESO6File(rankMsg, eso6, str(fl), trajectoriesFolder)
-	else: selectiveSplitESO6File(rankMsg, airport, departure, eso6, str(fl), trajectoriesFolder)
+	indexedSplitESO6File(rankMsg, eso6, str(fl), trajectoriesFolder, airport, departure) ## Flights are read through the eSO6 sidecar index, built once
 	sys.stdout = sys.__stdout__
 	trajectoriesFiles = os.listdir(trajectoriesFolder)
 	print(rankMsg+' Quantity of trajectory files is '+str(len(trajectoriesFiles)))
 
+def startPreparation(xmlFile):
+
+	"""
+	Reading input XML file in every preparation process
+	"""
+	global testsXML, rankMsg
+	testsXML = xmlFile
+	rankMsg = '[Rank 0 msg]:'
+	readXML()
+
 def updateLauncherScript(tcFile,tcLog,fl):
 
 	"""
@@ -150,12 +214,29 @@ def updateLauncherScript(tcFile,tcLog,fl):
 	launcher = open(launchScript,'a')
 	line = 'mpirun -np '+str(fl+1)+' --hostfile '+infrastructureFile+' python '+COFL_SW+' '+tcFile+' &> '+tcLog
 	launcher.write(line+'\n')
-	launcher.write('sleep 20'+'\n')
 	launcher.close()
 
 ###############################################################################################################################
 ###############################################################################################################################
 
+def _getCommentsTreeBuilder():
+
+	"""
+	Returns an ElementTree builder keeping the comments inside the root element
+	"""
+	try: return ET.TreeBuilder(insert_comments=True)
+	except TypeError: ## Python < 3.8, the parser calls comment of its target
+		builder = ET.TreeBuilder()
+		def comment(text):
+			builder.start(ET.Comment, {})
+			builder.data(text)
+			return builder.end(ET.Comment)
+		builder.comment = comment
+		return builder
+
+###############################################################################################################################
+###############################################################################################################################
+
 def main():
 
 
@@ -165,9 +246,9 @@ def main():
 	if len(sys.argv) != 2: print('Only XML template required'); sys.exit(0)
 	testsXML=sys.argv[1]
 	readXML()
-	templatesFolder = testsFolder+'/templates'
+	templatesFolder = testsFolder+'/templates' ## Same folders as getTestCases
 	runninglogsFolder = testsFolder+'/logs'
-	os.popen('mkdir -p '+templatesFolder+' '+runninglogsFolder)
+	createFolders([templatesFolder, runninglogsFolder])
 	launchScript = testsFolder+'/'+LAUNCHER_SCRIPT
 	launcher = open(launchScript,'a')
 	for line in INIT_LINES_LAUNCHER: launcher.write(line+'\n')
@@ -175,23 +256,19 @@ def main():
 
 	try:
 
-		tCPrefix=TEST_CASE_PREFIX+airport+'_' if airport != 'NA' else TEST_CASE_PREFIX
-		for nm in range(minNM, maxNM+1, intervalSizeNM):
-			i = 0
-			for fl in range(minFlights, maxFlights+1):
-				print('-----------------------------------------------------------------------------------')
-				fltc=minFlights*pow(2,i)
-				tcFile = templatesFolder+'/'+tCPrefix+str(nm)+'_'+str(fltc)+'.xml'
-				tcLog =  runninglogsFolder+'/'+tCPrefix+str(nm)+'_'+str(fltc)+'.log'
-				trajectoriesFolder = createTCDataSpace(nm,fltc)
-				setOriginalTrajectories(trajectoriesFolder,nm,fltc)
-				editTemplate(tcFile,tcLog,nm,fltc)
-				updateLauncherScript(tcFile,tcLog,fltc)
-				print('-----------------------------------------------------------------------------------')
-				if fltc == maxFlights: break
-				i+=1
-
-		os.popen('chmod +x '+launchScript)
+		testCases = getTestCases()
+		flightSets = sorted(set(fltc for nm, fltc, tcFile, tcLog in testCases))
+		print(rankMsg+' Preparing '+str(len(testCases))+' test cases from '+str(len(flightSets))+' flight sets')
+		readESO6Index(eso6) ## Built once before the preparation processes read it
+		pool = Pool(PREPARATION_PROCESSES if PREPARATION_PROCESSES > 0 else None, startPreparation, (testsXML,))
+		try:
+			pool.map(prepareFlightSet, flightSets)
+			for nm, fltc, tcFile, tcLog in pool.map(prepareTestCase, testCases): updateLauncherScript(tcFile,tcLog,fltc)
+		finally:
+			pool.close()
+			pool.join()
+
+		os.chmod(launchScript, os.stat(launchScript).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
 
 	except Exception, e: raise
 
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+import os
+import sys
+import subprocess
+from time import sleep
+
+# sys.path.insert(0,'') Uncomment and insert COFL root directory if necessary
+
+######################################
+
+### Imports from software modules
+from cofl.etc.info import COFL_SW, RUNNER_STATE_FILE, RUNNER_HOSTS_FOLDER
+from cofl.etc.configuration import RUNNER_POLL
+from cofl.lib.folders import createFolders
+from cofl.lib.ioFiles import readInfrastructureCores
+from cofl.bin import launchTests
+######################################
+
+###############################################################################################################################
+###############################################################################################################################
+
+def allocateCores(processes):
+
+	"""
+	Allocating cores of the infrastructure to the MPI processes of a test case, filling the freest machines first
+	A test case larger than the infrastructure gets every core once all machines are idle
+	Returns {machine: cores}, None if the free cores are not enough
+	"""
+	if processes > sum(cores.values()):
+		if freeCores != cores: return None
+		return dict(cores)
+	if processes > sum(freeCores.values()): return None
+	slots = {}
+	for machine in sorted(machines, key=lambda machine: -freeCores[machine]):
+		if processes == 0: break
+		slots[machine] = min(freeCores[machine], processes)
+		processes -= slots[machine]
+	return dict((machine, slots[machine]) for machine in slots if slots[machine] > 0)
+
+def launchTestCase(testCase, slots):
+
+	"""
+	Launching a test case on its allocated cores
+	"""
+	nm, fl, tcFile, tcLog = testCase
+	tcName = os.path.basename(tcFile)[:-len('.xml')]
+	if fl+1 > sum(cores.values()): hostFile = infrastructureFile
+	else:
+		hostFile = hostsFolder+'/'+tcName+'.hosts'
+		hosts = open(hostFile,'w')
+		for machine in machines:
+			if machine in slots: hosts.write(machine+' slots='+str(slots[machine])+'\n')
+		hosts.close()
+	for machine in slots: freeCores[machine] -= slots[machine]
+	print(rankMsg+' Launching '+tcName+' on '+', '.join(machine+' ('+str(slots[machine])+')' for machine in machines if machine in slots))
+	log = open(tcLog,'w')
+	process = subprocess.Popen(['mpirun','-np',str(fl+1),'--hostfile',hostFile,'python',COFL_SW,tcFile], stdout=log, stderr=subprocess.STDOUT)
+	log.close()
+	running[tcName] = (process, slots)
+
+def readState():
+
+	"""
+	Reading exit status of the finished test cases of the sweep
+	Returns {test case name: exit status}, the last status of a test case prevails
+	"""
+	state = {}
+	if os.path.isfile(stateFile):
+		for line in open(stateFile):
+			fields = line.split()
+			if len(fields) == 2: state[fields[0]] = int(fields[1])
+	return state
+
+def updateRunning():
+
+	"""
+	Recording exit status and releasing cores of finished test cases
+	Returns quantity of failed test cases
+	"""
+	failed = 0
+	for tcName in sorted(running):
+		process, slots = running[tcName]
+		exitcode = process.poll()
+		if exitcode is None: continue
+		state = open(stateFile,'a')
+		state.write(tcName+' '+str(exitcode)+'\n')
+		state.close()
+		for machine in slots: freeCores[machine] += slots[machine]
+		del running[tcName]
+		if exitcode == 0: print(rankMsg+' '+tcName+' done')
+		else: print(rankMsg+' '+tcName+' failed with exit status '+str(exitcode)); failed += 1
+	return failed
+
+###############################################################################################################################
+###############################################################################################################################
+
+def main():
+
+	"""
+	Running the test cases of a sweep prepared by launchTests.py
+	Test cases run concurrently while the cores of the infrastructure file allow, test cases finished
+	with exit status 0 in a previous run of the sweep are skipped
+	"""
+	global rankMsg, infrastructureFile, machines, cores, freeCores, running, stateFile, hostsFolder
+
+	rankMsg = '[Rank 0 msg]:'
+	if len(sys.argv) != 2: print('Only XML template required'); sys.exit(0)
+	launchTests.startPreparation(sys.argv[1])
+	infrastructureFile = launchTests.infrastructureFile
+	machines, cores = readInfrastructureCores(infrastructureFile)
+	freeCores = dict(cores)
+	running = {}
+	stateFile = launchTests.testsFolder+'/'+RUNNER_STATE_FILE
+	hostsFolder = launchTests.testsFolder+'/'+RUNNER_HOSTS_FOLDER
+	createFolders([hostsFolder])
+
+	try:
+
+		state = readState()
+		pending = [testCase for testCase in launchTests.getTestCases() if state.get(os.path.basename(testCase[2])[:-len('.xml')]) != 0]
+		print(rankMsg+' '+str(len(pending))+' test cases to run on '+str(sum(cores.values()))+' cores of '+str(len(machines))+' machines')
+		failed = 0
+		while len(pending) > 0 or len(running) > 0:
+			for testCase in list(pending):
+				slots = allocateCores(testCase[1]+1)
+				if slots is None:
+					if testCase[1]+1 > sum(cores.values()): break ## Waiting for every core, no test case overtakes it
+					continue
+				launchTestCase(testCase, slots)
+				pending.remove(testCase)
+			sleep(RUNNER_POLL)
+			failed += updateRunning()
+		print(rankMsg+' Sweep finished, '+str(failed)+' failed test cases')
+
+	except KeyboardInterrupt:
+		for tcName in running: running[tcName][0].terminate()
+		raise
+
+	except Exception, e: raise
+
+if __name__ == "__main__":
+
+	"""
+	Local job runner of test case sweeps
+	"""
+	main()
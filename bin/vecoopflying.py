@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import sys
+
+# sys.path.insert(0,'') Uncomment and insert COFL root directory if necessary
+
+######################################
+
+### Imports from software modules
+from cofl.etc.info import DATA_ROOT_FOLDER, TRAJ_FOLDER, HPC_TRAJ_FOLDER, OUTPUT_FOLDER, LOGS_FOLDER, LOG_DBG, LOG_STD
+from cofl.lib.engine import exchangeClusters, getActiveTimes, getEvents, getFlightsSummaries, getStatuses, getTelemetry, loadFleet, updatePhases, updateTimesteps, writeTrajectoryFiles
+from cofl.lib.events import closeEvents, emitEvents, getRankEventsFile, mergeEvents
+from cofl.lib.folders import createFolders
+from cofl.lib.info import usage
+from cofl.lib.ioFiles import readInfrastructureFile, readXMLInput, writeCooperativeFlightsFile, writePerformanceFile, writeResultsFile, writeSummaryFile
+from cofl.lib.logging import DEBUG_LOG, logger
+from cofl.lib.networkManager import computeNMClusters, computeSimulationSummary, countAcceptedClusters, initNetworkManager
+from cofl.lib.networkManager import removeUnclusteredFlights, storeStepResults, updateAircraftNetworkImage
+from cofl.lib.pctime import getComputingTime, getDateAndTime, returnSecondsFromEpoch
+######################################
+
+######################################################################################################################################################
+######################################################################################################################################################
+
+def main():
+
+	"""
+	Cooperative flights in a single process
+	All flights of the test case are stepped together by the vectorized engine (lib/engine)
+	Same test case input and results, summary, HPC trajectory and events files as bin/hpccoopflying.py
+	Events of the network manager are written as rank 0 and events of flights as the only worker rank 1
+	"""
+	rankMsg = '[Engine msg]: '
+	if len(sys.argv) != 2: usage('vecoopflying.py'); sys.exit(0)
+	testCaseFile=sys.argv[1]
+
+	##################################################################################################################################################
+	### Reading parameters and setting working space
+	tcID, flightsQ, scenario, model, grouping, radius, alonefuelparameter, coopfuelparameter, approachedDistance, infrastructureFile, log = readXMLInput(rankMsg,testCaseFile)
+	machines, qOfMachines = readInfrastructureFile(infrastructureFile)
+	parameters = {'model':model, 'alonefuelparameter':alonefuelparameter, 'coopfuelparameter':coopfuelparameter, 'approachedDistance':approachedDistance}
+	tcFolder=DATA_ROOT_FOLDER+'/'+scenario+'/'+tcID
+	trajectoriesFolder=tcFolder+'/'+TRAJ_FOLDER
+	hpcTrajectoriesFolder=tcFolder+'/'+HPC_TRAJ_FOLDER
+	outputFolder=tcFolder+'/'+OUTPUT_FOLDER
+	logsFolder=tcFolder+'/'+LOGS_FOLDER
+	createFolders([tcFolder, trajectoriesFolder, hpcTrajectoriesFolder, outputFolder, logsFolder])
+	myLogFile=logsFolder+'/0.log'
+	resultsFile = outputFolder+'/results.txt'
+	summaryFile = outputFolder+'/summary.txt'
+	cooperativeFlightsFile = outputFolder+'/cooperativeFlights.txt'
+	performanceFile = outputFolder+'/performance.txt'
+	nmEventsFile = getRankEventsFile(outputFolder, 0)
+	flightsEventsFile = getRankEventsFile(outputFolder, 1)
+	##################################################################################################################################################
+
+	##################################################################################################################################################
+	### Starting clock and reading trajectories
+	myClockInitTime, myCompInitTime, myInitDateTime = returnSecondsFromEpoch(), getComputingTime(), getDateAndTime()
+	writePerformanceFile(performanceFile, 0, tcID, int(flightsQ)+1, qOfMachines, myInitDateTime)
+	writeResultsFile(resultsFile)
+	writeCooperativeFlightsFile(cooperativeFlightsFile)
+	logger(myLogFile,rankMsg,LOG_STD,'Reading original trajectories')
+	fleet = loadFleet(trajectoriesFolder, flightsQ)
+	initTime = int(fleet['initTime'].min())
+	endTime = int(fleet['endTime'].max())
+	logger(myLogFile,rankMsg,LOG_STD,'Init time: '+str(initTime)+' , End time = '+str(endTime))
+	nm = initNetworkManager([i for i in range(1,fleet['qOfFlights']+1)])
+	##################################################################################################################################################
+
+	##################################################################################################################################################
+	### Simulation
+	logger(myLogFile,rankMsg,LOG_STD,'Starting simulation')
+	for currTime, qOfSteps in getActiveTimes(fleet, initTime, endTime):
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'-------------------------------------------------------')
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Current time = '+str(currTime))
+		phases = updatePhases(fleet, currTime)
+		updateAircraftNetworkImage(nm, getStatuses(fleet, phases), myLogFile, rankMsg)
+		if nm['qOfCruiseFlights'] > 0: nm['vehiclesPosition'].update(getTelemetry(fleet, nm['cruiseFlights']))
+		computeNMClusters(nm, grouping, radius, currTime, myLogFile, rankMsg, nmEventsFile)
+		responses = exchangeClusters(fleet, dict((flight, nm['clusters'][flight]) for flight in nm['cruiseFlights']), currTime, parameters, myLogFile, rankMsg)
+		removeUnclusteredFlights(nm, [flight for flight in nm['clusteredFlights'] if not responses[flight]])
+		countAcceptedClusters(nm, myLogFile, rankMsg, qOfSteps)
+		storeStepResults(nm, resultsFile, currTime)
+		emitEvents(flightsEventsFile, getEvents(fleet, currTime))
+		updateTimesteps(fleet, qOfSteps)
+	emitEvents(flightsEventsFile, getEvents(fleet, endTime))
+	##################################################################################################################################################
+
+	##################################################################################################################################################
+	### Computing and writing simulation summary
+	logger(myLogFile,rankMsg,LOG_STD,'Computing and writing simulation summary')
+	flightsSummaries = getFlightsSummaries(fleet)
+	testCaseResults = [tcID,
+					   scenario,
+					   fleet['qOfFlights'],
+					   1,
+					   qOfMachines,
+					   machines,
+					   model,
+					   grouping,
+					   radius,
+					   alonefuelparameter,
+					   coopfuelparameter,
+					   approachedDistance]
+	summaryResults, flightsClusteredFlights = computeSimulationSummary(nm, testCaseResults, flightsSummaries, [[0, 0, 0, 0, 0, 0]]) ## No MPI messages in a single process
+	writeSummaryFile(summaryFile,summaryResults)
+	writeCooperativeFlightsFile(cooperativeFlightsFile,flightsClusteredFlights,False)
+	logger(myLogFile,rankMsg,LOG_STD,'Writing cooperative trajectories')
+	writeTrajectoryFiles(fleet, hpcTrajectoriesFolder)
+	##################################################################################################################################################
+
+	##################################################################################################################################################
+	### Finishing
+	myClockEndTime, myCompEndTime, myEndDateTime = returnSecondsFromEpoch(), getComputingTime(), getDateAndTime()
+	writePerformanceFile(performanceFile, 0, tcID, int(flightsQ)+1, qOfMachines, myEndDateTime, False, [myClockInitTime, myClockEndTime], [myCompInitTime, myCompEndTime])
+	closeEvents()
+	logger(myLogFile,rankMsg,LOG_STD,'Merging events files')
+	mergeEvents(outputFolder, 2)
+	logger(myLogFile,rankMsg,LOG_STD,'I am done :)')
+	##################################################################################################################################################
+
+if __name__ == "__main__":
+
+	"""
+	Cooperative flights in a single process
+	"""
+	main()
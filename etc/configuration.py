@@ -17,4 +17,30 @@ KT_TO_M=0.514444
 M_TO_NM = 0.000539957
 NM_TO_M = 1852
 TRACKS_DIFFERENCE=15
+M_PER_DEG_LAT = 110574 ## Shortest WGS84 latitude degree (equator)
+M_PER_DEG_LON = 111319 ## WGS84 longitude degree at the equator
+SPATIAL_INDEX_MARGIN = 1.1 ## Clustering grid cells are this factor wider than the radius
+MAX_INDEX_LATITUDE = 89
+GEODESIC_MODE = 'exact' ## exact (geographiclib), fast (vectorized ellipsoidal/spherical approximation)
+WGS84_A = 6378137.0 ## [m]
+WGS84_F = 1/298.257223563
+EARTH_MEAN_RADIUS = 6371008.8 ## [m]
+CLUSTER_COMMS = True ## True: intra-cluster exchanges in per-cluster MPI sub-communicators, False: non-blocking point to point
+CLUSTER_MSG_BUFFER = 4096 ## Receive buffer of every intra-cluster message [bytes]
+NM_EXCHANGE = 'cruise' ## cruise: only cruise flights exchange messages with the network manager, collective: gather/scatter of all flights every timestep
+NM_BUFFERS = True ## Collective exchange, True: flights status and telemetry gathered in binary TELEMETRY_DTYPE records, False: pickled objects
+DECOMPOSITION = 'roundrobin' ## Flights per worker rank in bin/hpcblockflying.py: roundrobin, region
+SPLIT_BUFFER = 1048576 ## Read and write buffer of the eSO6 splitter (lib/split) [bytes]
+PREPARATION_PROCESSES = 0 ## Processes preparing the test cases of a sweep in bin/launchTests.py, 0: one per core
+MACHINE_CORES = 0 ## Cores of infrastructure machines without slots=N in bin/runTests.py, 0: cores of this machine
+RUNNER_POLL = 5 ## Interval between checks of running test cases in bin/runTests.py [s]
+LOG_LEVEL = 'STD' ## Lowest level of logged lines: DBG (per timestep lines), STD, ERR
+LOG_BUFFER = 65536 ## Write buffer of every log file [bytes]
+LOG_FLUSH_INTERVAL = 2 ## Interval between flushes of log files by the logging thread [s]
+LOG_STDOUT = False ## Logged lines are also printed, error lines are always printed
+NEIGHBOURS_MARGIN = 1.0 ## Neighbour sets of fifo keep pairs within radius*(1+NEIGHBOURS_MARGIN), 0: built again whenever a flight moves
+FAST_DISTANCE_ERROR = 0.001 ## Relative error bound of fast distances (lib/physics) against WGS84 geodesics
+FAST_DISTANCE_MAX_ANGLE = 179.0 ## Central angle [degrees] above which fast distances fall back to WGS84 geodesics, Lambert's formula is singular at antipodal points
+TRACK_SECTORS = True ## Cells of the spatial index split in track sectors at least TRACKS_DIFFERENCE wide, only flights in the same or neighbouring sectors are compared
+NETWORK_ARRAY_MIN_NODES = 1024 ## Nodes from which LRC of networks that are not unions of cliques runs the array breadth first searches (lib/network), fewer: one search per flight
 ############################################
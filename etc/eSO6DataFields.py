@@ -41,3 +41,4 @@ SEGMENT_FUEL=23 # [Kg]
 SEGMENT_CI=24 # [Kg/min]
 SEGMENT_ROUTE_CHARGES=25 # [Eur]
 SEGMENT_TRAJ_TYPE=26
+QOF_ESO6_FIELDS=27
@@ -21,9 +21,13 @@ COFL_SW = COFL_HOME+'/bin/hpccoopflying.py'
 ### Data space variables
 DATA_ROOT_FOLDER='' ## Fill in to where you wish to store data
 TRAJ_FOLDER='original'
+TRAJ_STORE_FOLDER='store' ## Columnar trajectory store inside the trajectories folder, see lib/trajectoryStore
+ESO6_INDEX_SUFFIX='.idx.npz' ## Sidecar flight index next to eSO6 files, see lib/eSO6Index
 HPC_TRAJ_FOLDER='hpc'
 OUTPUT_FOLDER='output'
 LOGS_FOLDER='logs'
+EVENTS_FILE='events.jsonl' ## Structured simulation events in the output folder, see lib/events
+RANK_EVENTS_SUFFIX='_events.jsonl'
 ##################################################################################################################################################
 
 ##################################################################################################################################################
@@ -31,6 +35,8 @@ LOGS_FOLDER='logs'
 TC_TEMPLATE = COFL_HOME+'/templates/tctemplate.xml'
 TEST_CASE_PREFIX='tc_'
 LAUNCHER_SCRIPT='launchHPC_COFL.sh'
+RUNNER_STATE_FILE='runTests.state' ## Exit status of every finished test case of a sweep, see bin/runTests.py
+RUNNER_HOSTS_FOLDER='hosts' ## Hostfiles of the test cases launched by bin/runTests.py
 RESULTS_FILE_BANNER='Current_time qOfCruiseFlights nmQOfClusters qOfClusters GRC'
 COOPERATIVE_FLIGHTS_FILE_BANNER='Flight Cooperative_flights'
 INIT_LINES=[
@@ -42,18 +48,6 @@ INIT_LINES=[
  	'2018',
  	'---------------------------------------------------------------------------',
  	'---------------------------------------------------------------------------']
-LINES_TC_TEMPLATE=[
-	'<id></id>',
-	'<flights></flights>',
-	'<scenario></scenario>',
-	'<model></model>',
-	'<grouping></grouping>',
-	'<radius></radius>',
-	'<alonefuelparameter></alonefuelparameter>',
-	'<coopfuelparameter></coopfuelparameter>',
-	'<approachedDistance></approachedDistance>',
-	'<infrastructureFile></infrastructureFile>',
-	'<log></log>']
 INIT_LINES_LAUNCHER=[
 	'#!/bin/bash',
 	'# --------------------------------------------------------',
@@ -153,6 +147,7 @@ TIME_ZONE='UTC'  ## Replace accordingly
 
 ##################################################################################################################################################
 ### Logging variables
+LOG_DBG='[DBG]'
 LOG_STD='[STD]'
 LOG_ERR='[ERR]'
 ##################################################################################################################################################
@@ -167,4 +162,15 @@ CLUSTERED_TAG = 5
 APPROACHING_TAG = 6
 VICSEK_TAG = 7
 SIM_SUMARY_TAG = 8
+CLUSTER_COMM_TAG = 9
+##################################################################################################################################################
+
+##################################################################################################################################################
+### Flight phases -- Vectorized engine phase codes
+NOT_STARTED = 0
+CLIMB = 1
+CRUISE = 2
+DESCENT = 3
+FINISHED = 4
+FLIGHT_PHASES = ['NOT_STARTED','CLIMB','CRUISE','DESCENT','FINISHED']
 ##################################################################################################################################################
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+######################################
+
+### Imports from software modules
+######################################
+
+###############################################################################################################################
+###############################################################################################################################
+
+"""
+Cluster sets
+Disjoint sets of flights kept by the network manager across timesteps
+{'node': {flight: node}, 'parent': [parent node], 'members': {root node: set(flights)}, 'clustered': set(clustered flights)}
+A flight leaving its cluster gets a new node, its previous node stays in the forest without being a member
+A clustered flight whose cluster mates left remains clustered alone until it leaves too
+"""
+
+def findCluster(clusterSets, flight):
+
+	"""
+	Returns the root node of the cluster of a flight, halving the path to it
+	"""
+	parent = clusterSets['parent']
+	node = clusterSets['node'][flight]
+	while parent[node] != node:
+		parent[node] = parent[parent[node]]
+		node = parent[node]
+	return node
+
+def getCluster(clusterSets, flight):
+
+	"""
+	Returns the cluster of a flight in ascending order, [] if the flight is not clustered
+	"""
+	if flight not in clusterSets['clustered']: return []
+	return sorted(clusterSets['members'][findCluster(clusterSets, flight)])
+
+def initClusterSets(flights):
+
+	"""
+	Cluster sets of unclustered flights
+	"""
+	clusterSets = {'node': {}, 'parent': [], 'members': {}, 'clustered': set()}
+	for flight in flights: _addNode(clusterSets, flight)
+	return clusterSets
+
+def joinClusters(clusterSets, flight, otherFlight):
+
+	"""
+	Joining the clusters of two flights, the smaller cluster joins the larger one
+	Both flights are clustered afterwards
+	"""
+	root = findCluster(clusterSets, flight)
+	otherRoot = findCluster(clusterSets, otherFlight)
+	clusterSets['clustered'].add(flight)
+	clusterSets['clustered'].add(otherFlight)
+	if root == otherRoot: return
+	members = clusterSets['members']
+	if len(members[root]) < len(members[otherRoot]): root, otherRoot = otherRoot, root
+	clusterSets['parent'][otherRoot] = root
+	members[root] |= members.pop(otherRoot)
+
+def leaveCluster(clusterSets, flight):
+
+	"""
+	Removing a flight from its cluster
+	Returns the flights remaining in the cluster
+	"""
+	root = findCluster(clusterSets, flight)
+	members = clusterSets['members'][root]
+	members.discard(flight)
+	clusterSets['clustered'].discard(flight)
+	if len(members) == 0: del(clusterSets['members'][root])
+	_addNode(clusterSets, flight)
+	return members
+
+###############################################################################################################################
+###############################################################################################################################
+
+def _addNode(clusterSets, flight):
+
+	"""
+	Adding a new node of a flight, alone in its cluster
+	"""
+	node = len(clusterSets['parent'])
+	clusterSets['node'][flight] = node
+	clusterSets['parent'].append(node)
+	clusterSets['members'][node] = set([flight])
+
+###############################################################################################################################
+###############################################################################################################################
@@ -14,80 +14,49 @@
 
 ### imports ##########################
 
-import itertools
-
 ######################################
 
 ### Imports from software modules
-from cofl.etc.configuration import NM_TO_M
-from cofl.etc.eSO6DataFields import SEGMENT_LAT_INIT, SEGMENT_LON_INIT, SEGMENT_LAT_END, SEGMENT_LON_END, SEGMENT_TRACK
-from cofl.lib.physics import convertMinuteDecimalToDregrees, calculateDistanceBetweenPoints, checkTracks
+from cofl.etc.configuration import NM_TO_M, NEIGHBOURS_MARGIN
+from cofl.lib.clusterSets import getCluster, joinClusters
+from cofl.lib.neighbourSets import getMatchedNeighbours, updateNeighbourSets
+from cofl.lib.spatialIndex import buildGridIndex
 ######################################
 
 ###############################################################################################################################
 ###############################################################################################################################
 
-def fifo(clusters, vehiclesPosition ,cruiseFlights, radius, currTime):
+def fifo(clusters, vehiclesPosition ,cruiseFlights, radius, currTime, clusterSets, neighbourSets):
 
 	"""
 	This function computes clusters at a specific timestep
 	The FIFO approach clusters the flights according to the first analyzed flight
 	Flights already clustered are not considered
+	Only flights in the neighbour sets are compared, tracks are checked before distances and only pairs whose separation
+	could have crossed radius are measured again
+	clusterSets: cluster sets of the network manager (lib/clusterSets), clusters found are joined in them
+	neighbourSets: neighbour sets of the network manager (lib/neighbourSets) from the previous timestep
 	"""
 
-	setClusters=False
-	clusteredFlights=[]
 	radius = float(radius)*NM_TO_M
+	clustered = clusterSets['clustered']
+
+	### Indexing cruise flights in a spatial and track sector grid of the outer radius of the neighbour sets
+	index=buildGridIndex(vehiclesPosition, cruiseFlights, radius*(1+NEIGHBOURS_MARGIN))
+	updateNeighbourSets(neighbourSets, index, radius)
 
 	### Checking for clusterizable flights
 	for flight in cruiseFlights:
 
-		if len(clusters[flight])==0: ## Checking for non-clustered flight
-			if flight not in clusteredFlights:
-				lat1I, lon1I, lat1E, lon1E=convertMinuteDecimalToDregrees(
-						[
-						vehiclesPosition[flight][SEGMENT_LAT_INIT],
-						vehiclesPosition[flight][SEGMENT_LON_INIT],
-						vehiclesPosition[flight][SEGMENT_LAT_END],
-						vehiclesPosition[flight][SEGMENT_LON_END]
-						])
-				track1= float(vehiclesPosition[flight][SEGMENT_TRACK])
-				for otherFlight in filter(lambda otherFlight: otherFlight!=flight, cruiseFlights):
-					lat2I, lon2I, lat2E, lon2E = convertMinuteDecimalToDregrees(
-							[
-							vehiclesPosition[otherFlight][SEGMENT_LAT_INIT],
-							vehiclesPosition[otherFlight][SEGMENT_LON_INIT],
-							vehiclesPosition[otherFlight][SEGMENT_LAT_END],
-							vehiclesPosition[otherFlight][SEGMENT_LON_END]
-							])
-					track2=float(vehiclesPosition[otherFlight][SEGMENT_TRACK])
-					dF1F2=calculateDistanceBetweenPoints(lat1I,lon1I,lat2I,lon2I) ## Calculating if the flights are within a specified radius
-					matchedTracks=checkTracks(track1,track2) ## Checking if the flights are in the same direction relatively
-					if  dF1F2 <= radius and matchedTracks: ## Conditions for clustering
-						if len(clusters[flight]) == 0: clusters[flight].append(flight)
-						clusteredFlights.append(flight)
-						clusters[flight].append(otherFlight)
-						if len(clusters[otherFlight]) > 1:
-							for f in clusters[otherFlight]:
-								if f not in clusters[flight]: clusters[flight].append(f)
-						clusteredFlights.append(otherFlight)
-		else: clusteredFlights.append(flight)
-
-	### Matching the clusters of all flights in the MASTER flight
-	for flight in clusters:
-		for otherFlight in filter(lambda otherFlight: otherFlight!=flight, clusters[flight]): clusters[otherFlight]=clusters[flight]
-	for flight in clusters:
-		if len(clusters[flight])>0: setClusters=True; break
-	for flight in clusters: clusters[flight] = list(set(clusters[flight]))
-	clusteredFlights=list(set(clusteredFlights))
-
-	# checkedFlights = []
-	# qOfClusters = 0
-	# for flight in clusters:
-	# 	if len(clusters[flight]) > 0 and flight not in checkedFlights:
-	# 		qOfClusters+=1
-	# 		for otherFlight in clusters[flight]: checkedFlights.append(otherFlight)
+		if flight not in clustered: ## Checking for non-clustered flight
+			for otherFlight in getMatchedNeighbours(neighbourSets, index, flight): ## Flights in the same direction relatively and within a specified radius
+				joinClusters(clusterSets, flight, otherFlight) ## Conditions for clustering
 
+	### Clusters of all flights
+	clusters = dict((flight, []) for flight in clusters)
+	for flight in clustered: clusters[flight] = getCluster(clusterSets, flight)
+	setClusters = len(clustered) > 0
+	clusteredFlights = sorted(clustered)
 
 	return clusters, clusteredFlights, setClusters
 
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+from math import cos, radians
+
+######################################
+
+### Imports from software modules
+from cofl.etc.eSO6DataFields import SEGMENT_LAT_INIT, SEGMENT_LON_INIT
+from cofl.lib.physics import convertMinuteDecimalToDregrees
+######################################
+
+###############################################################################################################################
+###############################################################################################################################
+
+def getDeparturePositions(trajectoriesFolder, flightsQ):
+
+	"""
+	Reading first position of every flight [degrees]
+	Returns {flight: (lat, lon)}
+	"""
+	flightsQ = int(flightsQ)
+	positions = {}
+	for flight in range(1,flightsQ+1):
+		trajectoryFile = trajectoriesFolder+'/'+str(flight).zfill(len(str(flightsQ)))+'.eSo6'
+		trajectory = open(trajectoryFile)
+		segment = trajectory.readline().split()
+		trajectory.close()
+		positions[flight] = tuple(convertMinuteDecimalToDregrees([segment[SEGMENT_LAT_INIT], segment[SEGMENT_LON_INIT]]))
+	return positions
+
+def regionDecomposition(positions, qOfBlocks):
+
+	"""
+	Splitting flights in qOfBlocks geographic regions of similar quantity of flights
+	Recursive coordinate bisection over departure positions, so flights departing close
+	to each other, which are likely to cluster, are kept in the same block
+	Returns [flights of block 0, flights of block 1, ...]
+	"""
+	return _bisect(sorted(positions), positions, qOfBlocks)
+
+def roundRobinDecomposition(flights, qOfBlocks):
+
+	"""
+	Dealing flights to qOfBlocks blocks in turns
+	Returns [flights of block 0, flights of block 1, ...]
+	"""
+	flights = sorted(flights)
+	return [flights[block::qOfBlocks] for block in range(qOfBlocks)]
+
+###############################################################################################################################
+###############################################################################################################################
+
+def _bisect(flights, positions, qOfBlocks):
+
+	"""
+	Bisecting flights along the widest coordinate
+	"""
+	if qOfBlocks == 1: return [sorted(flights)]
+	if len(flights) == 0: return [[] for block in range(qOfBlocks)]
+	lats = [positions[flight][0] for flight in flights]
+	lons = [positions[flight][1] for flight in flights]
+	lonScale = cos(radians(sum(lats)/len(lats)))
+	axis = 0 if max(lats)-min(lats) >= (max(lons)-min(lons))*lonScale else 1
+	flights = sorted(flights, key=lambda flight: (positions[flight][axis], flight))
+	lowBlocks = qOfBlocks//2
+	cut = int(round(float(len(flights))*lowBlocks/qOfBlocks))
+	return _bisect(flights[:cut], positions, lowBlocks) + _bisect(flights[cut:], positions, qOfBlocks-lowBlocks)
+
+###############################################################################################################################
+###############################################################################################################################
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import os
+import numpy as np
+
+######################################
+
+### Imports from software modules
+from cofl.etc.configuration import SPLIT_BUFFER
+from cofl.etc.info import ESO6_INDEX_SUFFIX
+from cofl.etc.eSO6DataFields import ARRIVAL, DEPARTURE, FLIGHT_ID, SEGMENT_DATE_END, SEGMENT_DATE_INIT, SEGMENT_TIME_END, SEGMENT_TIME_INIT
+from cofl.lib.pctime import calculateSecsFromEpoch
+######################################
+
+###############################################################################################################################
+###############################################################################################################################
+
+"""
+Sidecar flight index of eSO6 files
+One record per flight (run of lines with the same flight ID) with its byte offset and length in the
+eSO6 file, flight ID, departure and arrival airports and init and end times [s]. The index is saved
+next to the eSO6 file and rebuilt when the size or modification time of the file changes
+"""
+
+INDEX_DTYPE = np.dtype([('offset', np.int64), ('length', np.int64), ('flight', 'U32'), ('departure', 'U8'), ('arrival', 'U8'),
+						('initTime', np.int64), ('endTime', np.int64)])
+
+def buildESO6Index(eso6File):
+
+	"""
+	Indexing flights of an eSO6 file in one streaming pass
+	Returns INDEX_DTYPE records
+	"""
+	records = []
+	offset = 0
+	first = None; last = None; flightOffset = 0
+	source = open(eso6File,'rb',SPLIT_BUFFER)
+	try:
+		for line in source:
+			segment = [_text(token) for token in line.split(None,FLIGHT_ID+1)]
+			if first is None or segment[FLIGHT_ID] != first[FLIGHT_ID]:
+				if first is not None: records.append(_indexRecord(first, last, flightOffset, offset-flightOffset))
+				first = segment; flightOffset = offset
+			last = segment
+			offset += len(line)
+	finally: source.close()
+	if first is not None: records.append(_indexRecord(first, last, flightOffset, offset-flightOffset))
+	index = np.zeros(len(records), dtype=INDEX_DTYPE)
+	if len(records) == 0: return index
+	columns = list(zip(*records))
+	for i, field in enumerate(['offset', 'length', 'flight', 'departure', 'arrival']): index[field] = columns[i]
+	index['initTime'] = calculateSecsFromEpoch(columns[5], columns[6])
+	index['endTime'] = calculateSecsFromEpoch(columns[7], columns[8])
+	return index
+
+def copyIndexedFlights(eso6File, flights, qOfFlights, trajectoriesFolder):
+
+	"""
+	Copying indexed flights in rank flight files 1..len(flights), seeking to every flight in the eSO6 file
+	"""
+	source = open(eso6File,'rb')
+	try:
+		for rank, record in enumerate(flights):
+			source.seek(int(record['offset']))
+			rankFile = open(trajectoriesFolder+'/'+str(rank+1).zfill(len(str(qOfFlights)))+'.eSo6','wb')
+			rankFile.write(source.read(int(record['length'])))
+			rankFile.close()
+	finally: source.close()
+
+def readESO6Index(eso6File):
+
+	"""
+	Reading the sidecar index of an eSO6 file, the index is built and saved if missing or outdated
+	Returns INDEX_DTYPE records
+	"""
+	indexFile = eso6File+ESO6_INDEX_SUFFIX
+	source = np.array([os.path.getsize(eso6File), int(os.path.getmtime(eso6File))], dtype=np.int64)
+	if os.path.isfile(indexFile):
+		saved = np.load(indexFile)
+		if np.array_equal(saved['source'], source): return saved['flights']
+	flights = buildESO6Index(eso6File)
+	try:
+		np.savez(indexFile+'.tmp.npz', flights=flights, source=source)
+		os.rename(indexFile+'.tmp.npz', indexFile)
+	except (IOError, OSError): pass ## Read-only eSO6 folder, index is kept in memory only
+	return flights
+
+def selectIndexedFlights(index, qOfFlights, airport='NA', departure=True):
+
+	"""
+	Returns the first qOfFlights records of index, departing from (arriving to) airport unless airport is NA
+	"""
+	if airport != 'NA':
+		airports = index['departure'] if departure else index['arrival']
+		index = index[np.array([airport in flightAirport for flightAirport in airports.tolist()], dtype=bool)]
+	return index[:int(qOfFlights)]
+
+###############################################################################################################################
+###############################################################################################################################
+
+def _indexRecord(first, last, offset, length):
+
+	"""
+	Index record of a flight from its first and last segments
+	Init and end dates and hours are kept as text, buildESO6Index converts them for all flights at once
+	"""
+	return (offset, length, first[FLIGHT_ID], first[DEPARTURE], first[ARRIVAL],
+			first[SEGMENT_DATE_INIT], first[SEGMENT_TIME_INIT], last[SEGMENT_DATE_END], last[SEGMENT_TIME_END])
+
+def _text(token):
+
+	"""
+	Native string of a token read in binary mode
+	"""
+	return token if isinstance(token, str) else token.decode('ascii')
+
+###############################################################################################################################
+###############################################################################################################################
@@ -0,0 +1,544 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import numpy as np
+from collections import deque
+from copy import deepcopy
+from math import cos, sin, radians, sqrt, pow
+
+######################################
+
+### Imports from software modules
+from cofl.etc.configuration import TIME_STEP
+from cofl.etc.info import LOG_STD, CLUSTERED_TAG, APPROACHING_TAG, VICSEK_TAG
+from cofl.etc.info import NOT_STARTED, CLIMB, CRUISE, DESCENT, FINISHED, FLIGHT_PHASES
+from cofl.etc.eSO6DataFields import *
+from cofl.lib.logging import logger
+from cofl.lib.physics import calculateDistancesBetweenPoints, getPoint, roundUP, convertMtoNM, convertNMtoM
+from cofl.lib.trajectoryStore import getLevelledSegments, readTrajectory, readTrajectoryStore, writeHPCTrajectory
+######################################
+
+###############################################################################################################################
+###############################################################################################################################
+
+"""
+Vectorized flights engine
+Flights are kept in struct-of-arrays NumPy state (fleet):
+	flights: flight of every slot k, index: slot of every flight
+	columns: numeric eSO6 fields of all segments of all flights, slot k owns [offsets[k], offsets[k+1])
+	per flight arrays: times, phases, timesteps, fuel constants and cooperation counters
+Phases, telemetry and timesteps are computed for all flights at once. The intra-cluster
+protocol of the MPI simulator (informNodes) is replayed in-process with per flight
+mailboxes, so clustered flights take the same decisions as in bin/hpccoopflying.py
+A fleet may hold any block of flights of a test case, messages to flights of other
+blocks are routed by a transport (see bin/hpcblockflying.py)
+"""
+
+NUMERIC_FIELDS = [SEGMENT_LEVEL_INIT, SEGMENT_LEVEL_END, SEGMENT_LAT_INIT, SEGMENT_LON_INIT, SEGMENT_LAT_END, SEGMENT_LON_END,
+				  SEGMENT_LENGTH, SEGMENT_GROUND_SPEED, SEGMENT_TRACK, SEGMENT_FUEL]
+
+def computeCooperatedFuel(fleet):
+
+	"""
+	Computing cooperated fuel of every flight [Kg]
+	"""
+	fuel = fleet['columns'][SEGMENT_FUEL]
+	offsets = fleet['offsets']
+	return [sum(fuel[offsets[k]:offsets[k+1]].tolist(), 0.0) for k in range(fleet['qOfFlights'])]
+
+def exchangeClusters(fleet, clusters, currTime, parameters, logFile, rankMsg, transport=None):
+
+	"""
+	Executing HPC flying model of all cruise flights with an assigned cluster
+	clusters: {flight: cluster assigned by the network manager}
+	transport: routes messages to flights of other fleets, see _runTasks
+	Returns {flight: clustered}
+	"""
+	tasks = {}
+	for flight in clusters:
+		k = fleet['index'][flight]
+		fleet['previousCluster'][k] = fleet['currentCluster'][k][:]
+		fleet['currentCluster'][k] = list(clusters[flight])
+		if len(fleet['currentCluster'][k]) != 0: tasks[flight] = [_hprcFly(fleet, k, fleet['currentCluster'][k], currTime, parameters, logFile, rankMsg)]
+	results = _runTasks(tasks, fleet['mailbox'], fleet['index'], transport)
+	for flight in results:
+		k = fleet['index'][flight]
+		if results[flight] and fleet['currentCluster'][k] != fleet['previousCluster'][k]: fleet['qOfClusters'][k]+=1
+	return results
+
+def getActiveTimes(fleet, initTime, endTime):
+
+	"""
+	Event-driven time advance
+	Timesteps from initTime to endTime where a flight changes its phase or at least two flights are cruising
+	In between, phases do not change and nothing can cluster, so those timesteps are skipped
+	Returns [(currTime, quantity of timesteps until the next active time)]
+	"""
+	times = np.arange(initTime, endTime+1, TIME_STEP, dtype=np.int64)
+	crossed = np.zeros(len(times), dtype=np.int64)
+	for key in ['initTime', 'cruiseTime', 'descentTime', 'endTime']: crossed += np.searchsorted(np.sort(fleet[key]), times, side='right')
+	changed = np.ones(len(times), dtype=bool)
+	changed[1:] = crossed[1:] != crossed[:-1]
+	cruiseStart = np.maximum(fleet['initTime'], fleet['cruiseTime'])
+	cruiseEnd = np.minimum(fleet['endTime'], fleet['descentTime'])
+	cruising = cruiseStart < cruiseEnd
+	qOfCruiseFlights = np.searchsorted(np.sort(cruiseStart[cruising]), times, side='right') - np.searchsorted(np.sort(cruiseEnd[cruising]), times, side='right')
+	activeTimes = times[changed | (qOfCruiseFlights >= 2)]
+	qOfSteps = np.diff(np.append(activeTimes, times[-1]+TIME_STEP if len(times) > 0 else initTime)) // TIME_STEP
+	return list(zip(activeTimes.tolist(), qOfSteps.tolist()))
+
+def getEvents(fleet, currTime):
+
+	"""
+	Returns events of the fleet flights since the previous call up to currTime as (event, t, flight, fields)
+	sorted by time and flight, the timeline, phase, fuelDecision and fuel events of bin/hpccoopflying.py
+	Phase changes at the same time emit the first phase only, as checkMyStatus in bin/hpccoopflying.py
+	"""
+	previousTime = fleet['eventsTime']
+	keys = ['initTime', 'cruiseTime', 'descentTime', 'endTime']
+	reached = dict((key, (fleet[key] <= currTime) if previousTime is None else (previousTime < fleet[key]) & (fleet[key] <= currTime)) for key in keys)
+	events = []
+	for k in np.nonzero(reached['initTime'] | reached['cruiseTime'] | reached['descentTime'] | reached['endTime'])[0].tolist():
+		flight = fleet['flights'][k]
+		times = [int(fleet[key][k]) for key in keys]
+		if reached['initTime'][k]: events.append(('timeline', times[0], flight, dict(zip(keys, times))))
+		for i, phase in enumerate(['CLIMB', 'CRUISE', 'DESCENT', 'FINISHED']):
+			if reached[keys[i]][k] and times[i] not in times[:i]: events.append(('phase', times[i], flight, {'phase': phase}))
+		if reached['endTime'][k]:
+			cooperatedFuel = sum(fleet['columns'][SEGMENT_FUEL][fleet['offsets'][k]:fleet['offsets'][k+1]].tolist(), 0.0)
+			events.append(('fuel', times[3], flight, {'originalFuel': float(fleet['originalFuel'][k]), 'cooperatedFuel': cooperatedFuel}))
+	events.extend(fleet['events'])
+	events.sort(key=lambda event: (event[1], event[2]))
+	fleet['events'] = []
+	fleet['eventsTime'] = currTime
+	return events
+
+def getFlightsSummaries(fleet):
+
+	"""
+	Simulation summary of every flight
+	Original and cooperated fuel, quantity of clusters, clustered time and clustered flights
+	"""
+	cooperatedFuel = computeCooperatedFuel(fleet)
+	flightsSummaries = {}
+	for k in range(fleet['qOfFlights']):
+		flightsSummaries[fleet['flights'][k]] = [float(fleet['originalFuel'][k]),
+												 cooperatedFuel[k],
+												 int(fleet['qOfClusters'][k]),
+												 int(fleet['clusteredDuration'][k])*TIME_STEP,
+												 sorted(fleet['clusteredFlights'][k])]
+	return flightsSummaries
+
+def getStatuses(fleet, phases):
+
+	"""
+	Status of flights changing the network manager image i.e. CRUISE and DESCENT
+	"""
+	statuses = {}
+	for k in np.nonzero((phases == CRUISE) | (phases == DESCENT))[0].tolist(): statuses[fleet['flights'][k]] = FLIGHT_PHASES[phases[k]]
+	return statuses
+
+def getTelemetry(fleet, flights):
+
+	"""
+	Returns current segment of flights as rows indexed by eSO6 fields
+	"""
+	k = np.array([fleet['index'][flight] for flight in flights], dtype=int)
+	segments = fleet['offsets'][k]+fleet['timestep'][k]
+	telemetry = np.full((len(flights), QOF_ESO6_FIELDS), np.nan)
+	for field in NUMERIC_FIELDS: telemetry[:,field] = fleet['columns'][field][segments]
+	vehiclesPosition = {}
+	for i, flight in enumerate(flights): vehiclesPosition[flight] = telemetry[i]
+	return vehiclesPosition
+
+def loadFleet(trajectoriesFolder, flightsQ, flights=None):
+
+	"""
+	Reading eSO6 trajectories of flights in struct-of-arrays state
+	flights: flights of the fleet, all flights of the test case by default
+	Computes init, end, cruise and descent times, top of descent, Kd and original fuel
+	"""
+	if flights is None: flights = range(1,int(flightsQ)+1)
+	flights = list(flights)
+	store = readTrajectoryStore(trajectoriesFolder)
+	names = []
+	files = []
+	offsets = [0]
+	values = dict((field, []) for field in NUMERIC_FIELDS)
+	levelled = []
+	initTime = []
+	endTime = []
+	for flight in flights:
+		names.append(str(flight).zfill(len(str(flightsQ)))+'.eSo6')
+		files.append(trajectoriesFolder+'/'+names[-1])
+		trajectory, flightInitTime, flightEndTime = readTrajectory(trajectoriesFolder, flightsQ, flight, store)
+		for field in NUMERIC_FIELDS: values[field].append(trajectory[field])
+		levelled.append(getLevelledSegments(trajectory))
+		initTime.append(flightInitTime)
+		endTime.append(flightEndTime)
+		offsets.append(offsets[-1]+len(trajectory[SEGMENT_FUEL]))
+
+	flightsQ = len(flights)
+	fleet = {}
+	fleet['qOfFlights'] = flightsQ
+	fleet['flights'] = flights
+	fleet['index'] = dict((flight, k) for k, flight in enumerate(flights))
+	fleet['names'] = names
+	fleet['files'] = files
+	fleet['offsets'] = np.array(offsets, dtype=np.int64)
+	fleet['columns'] = dict((field, np.concatenate(values[field]+[np.zeros(0)]).astype(float)) for field in NUMERIC_FIELDS)
+	fleet['levelled'] = np.concatenate(levelled+[np.zeros(0, dtype=bool)])
+	fleet['initTime'] = np.array(initTime, dtype=np.int64)
+	fleet['endTime'] = np.array(endTime, dtype=np.int64)
+	_computePhaseTimes(fleet)
+	fleet['timestep'] = np.zeros(flightsQ, dtype=np.int64)
+	fleet['phase'] = np.full(flightsQ, NOT_STARTED, dtype=np.int8)
+	fleet['overrides'] = [{} for k in range(flightsQ)]
+	fleet['currentCluster'] = [[] for k in range(flightsQ)]
+	fleet['previousCluster'] = [[] for k in range(flightsQ)]
+	fleet['joined'] = [False]*flightsQ
+	fleet['qOfClusters'] = np.zeros(flightsQ, dtype=np.int64)
+	fleet['clusteredDuration'] = np.zeros(flightsQ, dtype=np.int64)
+	fleet['clusteredFlights'] = [[] for k in range(flightsQ)]
+	fleet['mailbox'] = {}
+	fleet['events'] = [] ## fuelDecision events since the previous getEvents
+	fleet['eventsTime'] = None
+	return fleet
+
+def updatePhases(fleet, currTime):
+
+	"""
+	Computing phase of all flights at currTime
+	"""
+	flying = (fleet['initTime'] <= currTime) & (currTime < fleet['endTime'])
+	phases = np.where(fleet['initTime'] > currTime, NOT_STARTED, FINISHED)
+	phases = np.where(flying & (currTime < fleet['cruiseTime']), CLIMB, phases)
+	phases = np.where(flying & (currTime >= fleet['cruiseTime']) & (currTime < fleet['descentTime']), CRUISE, phases)
+	phases = np.where(flying & (currTime >= fleet['cruiseTime']) & (currTime >= fleet['descentTime']), DESCENT, phases)
+	fleet['phase'] = phases.astype(np.int8)
+	return fleet['phase']
+
+def updateTimesteps(fleet, qOfSteps=1):
+
+	"""
+	Moving flying flights qOfSteps segments forward
+	"""
+	fleet['timestep'] += qOfSteps*((fleet['phase'] != NOT_STARTED) & (fleet['phase'] != FINISHED))
+
+def writeTrajectoryFiles(fleet, hpcTrajectoriesFolder):
+
+	"""
+	Writing HPC trajectory files
+	Unmodified trajectories are copied, modified ones are rewritten with the engine changes
+	"""
+	for k in range(fleet['qOfFlights']): writeHPCTrajectory(fleet['files'][k], hpcTrajectoriesFolder+'/'+fleet['names'][k], fleet['overrides'][k])
+
+###############################################################################################################################
+###############################################################################################################################
+
+def _approachCluster(fleet, k, nextPositionHPC, currentCluster, parameters, logFile, rankMsg):
+
+	"""
+	Initial approaching to cluster neighbours
+	"""
+	inPosition = False
+	joined = False
+	clusterSize = len(currentCluster)
+	flight = fleet['flights'][k]
+	response = yield ('call', _informNodes(flight, nextPositionHPC, currentCluster, APPROACHING_TAG))
+	maxSeparation = 0.0
+	if len(response) > 0:
+		fLats = [response[otherFlight]['LAT'] for otherFlight in response]
+		fLons = [response[otherFlight]['LON'] for otherFlight in response]
+		maxSeparation = max(0.0, float(calculateDistancesBetweenPoints(nextPositionHPC['LAT'],nextPositionHPC['LON'],fLats,fLons).max()))
+	if maxSeparation <= clusterSize*float(parameters['approachedDistance']): inPosition = True
+	response = yield ('call', _informNodes(flight, inPosition, currentCluster, APPROACHING_TAG))
+	if all(flightReady for flightReady in response.values()) and inPosition: joined = True
+	logger(logFile,rankMsg,LOG_STD,'Flight '+str(flight)+' JOINED - '+str(joined).upper())
+	yield ('return', joined)
+
+def _checkFuelCost(fleet, k, nextPositionHPC, parameters, currTime):
+
+	"""
+	Checking if the Fuel cost to stay in cluster
+	is larger that the cost to separate
+	"""
+	segment = fleet['offsets'][k]+fleet['timestep'][k]
+	latTOD = fleet['todLat'][k]/60
+	lonTOD = fleet['todLon'][k]/60
+	latCurrent = fleet['columns'][SEGMENT_LAT_INIT][segment]/60
+	lonCurrent = fleet['columns'][SEGMENT_LON_INIT][segment]/60
+	latHPC = nextPositionHPC['LAT']
+	lonHPC = nextPositionHPC['LON']
+	dist1, dist2, dist3 = calculateDistancesBetweenPoints(
+			[latCurrent,latCurrent,latHPC],
+			[lonCurrent,lonCurrent,lonHPC],
+			[latTOD,latHPC,latTOD],
+			[lonTOD,lonHPC,lonTOD])
+	myKd = float(fleet['kd'][k])
+	nominalFuel = myKd*convertMtoNM(float(dist1))*float(parameters['alonefuelparameter'])
+	hpcFuel = myKd*convertMtoNM(float(dist2))*float(parameters['coopfuelparameter']) + myKd*convertMtoNM(float(dist3))*float(parameters['alonefuelparameter'])
+	clustered = bool(not nominalFuel < hpcFuel)
+	fleet['events'].append(('fuelDecision', currTime, fleet['flights'][k], {'nominalFuel': nominalFuel, 'hpcFuel': hpcFuel, 'clustered': clustered}))
+	return clustered
+
+def _computePhaseTimes(fleet):
+
+	"""
+	Calculating cruise and descent times, top of descent, Kd and original fuel of every flight
+	Same rules as calculateCruise, calculateDescent and computeKd in bin/hpccoopflying.py
+	"""
+	flightsQ = fleet['qOfFlights']
+	offsets = fleet['offsets']
+	columns = fleet['columns']
+	cruiseTime = np.zeros(flightsQ, dtype=np.int64)
+	descentTime = np.zeros(flightsQ, dtype=np.int64)
+	todLat = np.zeros(flightsQ)
+	todLon = np.zeros(flightsQ)
+	kd = np.zeros(flightsQ)
+	originalFuel = np.zeros(flightsQ)
+	for k in range(flightsQ):
+		levelled = fleet['levelled'][offsets[k]:offsets[k+1]]
+		qOfSegments = len(levelled)
+		### Cruise starts at the first levelled segment followed by 3 levelled segments
+		window = levelled[:qOfSegments-3] & levelled[1:qOfSegments-2] & levelled[2:qOfSegments-1] & levelled[3:]
+		found = np.nonzero(window)[0]
+		cruiseLine = int(found[0]) if len(found) > 0 else qOfSegments
+		cruiseTime[k] = fleet['initTime'][k] + TIME_STEP*(int(np.count_nonzero(~levelled[:cruiseLine]))+1)
+		### Descent starts after the last levelled segment preceded by 2 levelled segments
+		window = levelled[2:] & levelled[1:qOfSegments-1] & levelled[:qOfSegments-2]
+		found = np.nonzero(window)[0]
+		lastLevelled = int(found[-1])+2 if len(found) > 0 else -1
+		descentLine = lastLevelled+1
+		descentTime[k] = fleet['endTime'][k] - TIME_STEP*int(np.count_nonzero(~levelled[descentLine:]))
+		todLat[k] = columns[SEGMENT_LAT_INIT][offsets[k]+descentLine]
+		todLon[k] = columns[SEGMENT_LON_INIT][offsets[k]+descentLine]
+		### Kd and original fuel
+		fuelCruise = sum(columns[SEGMENT_FUEL][offsets[k]+cruiseLine:offsets[k]+descentLine+1].tolist(), 0.0)
+		distanceCruise = sum(columns[SEGMENT_LENGTH][offsets[k]+cruiseLine:offsets[k]+descentLine+1].tolist(), 0.0)
+		kd[k] = fuelCruise / distanceCruise
+		originalFuel[k] = sum(columns[SEGMENT_FUEL][offsets[k]:offsets[k+1]].tolist(), 0.0)
+	fleet['cruiseTime'] = cruiseTime
+	fleet['descentTime'] = descentTime
+	fleet['todLat'] = todLat
+	fleet['todLon'] = todLon
+	fleet['kd'] = kd
+	fleet['originalFuel'] = originalFuel
+
+def _hprcFly(fleet, k, currentCluster, currTime, parameters, logFile, rankMsg):
+
+	"""
+	Flying cooperatively if a suitable cluster exists
+	Same decisions as hprcFly in bin/hpccoopflying.py
+	"""
+	flight = fleet['flights'][k]
+	columns = fleet['columns']
+	segment = fleet['offsets'][k]+fleet['timestep'][k]
+	timestep = int(fleet['timestep'][k])
+	overrides = fleet['overrides'][k]
+	model = parameters['model']
+	clustered = True; nextPositionHPC = {}
+	if len(currentCluster)>1:
+
+		### First check -- DESCENT
+		clustered = bool(currTime+TIME_STEP != fleet['descentTime'][k])
+		response = yield ('call', _informNodes(flight, clustered, currentCluster, CLUSTERED_TAG))
+		currentCluster = _updateCluster(response, currentCluster)
+
+		### Second check -- ALONE
+		if clustered: clustered = len(currentCluster) != 1
+
+		### Third check -- Flying until proximity
+		if clustered:
+			nextPositionHPC, myNewFL = yield ('call', FLYING_MODELS[model](fleet, k, currentCluster))
+			fleet['joined'][k] = yield ('call', _approachCluster(fleet, k, nextPositionHPC, currentCluster, parameters, logFile, rankMsg))
+
+		### Fourth check -- VICSEK + DISTANCE COST
+		if fleet['joined'][k] == True:
+			while True:
+				testCluster = currentCluster[:]
+				nextPositionHPC, myNewFL = yield ('call', FLYING_MODELS[model](fleet, k, currentCluster))
+				clustered = _checkFuelCost(fleet, k, nextPositionHPC, parameters, currTime)
+				response = yield ('call', _informNodes(flight, clustered, currentCluster, CLUSTERED_TAG))
+				currentCluster = _updateCluster(response, currentCluster)
+				if clustered == False: break
+				clustered = len(currentCluster) != 1
+				if clustered == False: break
+				if currentCluster == testCluster: break
+
+		### Updating next trajectory position
+		if clustered == True:
+			nextPositionHPC.update((x, round(y*60,6)) for x, y in nextPositionHPC.items())
+			nextPositionHPC['ALT']=myNewFL
+			nextPositionHPC.update((x,str(y)) for x,y in nextPositionHPC.items())
+			fleet['clusteredDuration'][k]+=1
+			for otherFlight in currentCluster:
+				if otherFlight not in fleet['clusteredFlights'][k] and otherFlight != flight: fleet['clusteredFlights'][k].append(otherFlight)
+		else:
+			fleet['joined'][k] = False
+			nextPositionHPC['LAT'] = (timestep+1, SEGMENT_LAT_INIT)
+			nextPositionHPC['LON'] = (timestep+1, SEGMENT_LON_INIT)
+			nextPositionHPC['ALT'] = (timestep+1, SEGMENT_LEVEL_INIT)
+		for key, endField, initField in [('LAT',SEGMENT_LAT_END,SEGMENT_LAT_INIT), ('LON',SEGMENT_LON_END,SEGMENT_LON_INIT), ('ALT',SEGMENT_LEVEL_END,SEGMENT_LEVEL_INIT)]:
+			value = nextPositionHPC[key]
+			numericValue = columns[initField][segment+1] if isinstance(value, tuple) else float(value)
+			overrides[(timestep, endField)] = value
+			overrides[(timestep+1, initField)] = value
+			columns[endField][segment] = numericValue
+			columns[initField][segment+1] = numericValue
+
+		### Updating segment fuel
+		latInit = columns[SEGMENT_LAT_INIT][segment]/60
+		lonInit = columns[SEGMENT_LON_INIT][segment]/60
+		latEnd = columns[SEGMENT_LAT_END][segment]/60
+		lonEnd = columns[SEGMENT_LON_END][segment]/60
+		segmentDistanceNM = convertMtoNM(float(calculateDistancesBetweenPoints(latInit,lonInit,latEnd,lonEnd)))
+		fuelFactor = float(parameters['coopfuelparameter']) if clustered else float(parameters['alonefuelparameter'])
+		fuelSegment = float(fleet['kd'][k])*segmentDistanceNM*fuelFactor
+		overrides[(timestep, SEGMENT_FUEL)] = str(fuelSegment)
+		columns[SEGMENT_FUEL][segment] = float(str(fuelSegment))
+	else: clustered = False
+	yield ('return', clustered)
+
+def _informNodes(flight, info, currentCluster, tag):
+
+	"""
+	Informing nodes in my cluster about my decision to
+	remain in the cluster
+	"""
+	for otherFlight in currentCluster:
+		if otherFlight != flight: yield ('send', otherFlight, info, tag)
+	response={}
+	for otherFlight in currentCluster:
+		if otherFlight != flight: response[otherFlight] = yield ('recv', otherFlight, tag)
+	yield ('return', response)
+
+def _runTasks(tasks, mailbox, local=None, transport=None):
+
+	"""
+	Running flights cooperative tasks until all of them finish
+	Tasks are stacks of generators yielding:
+		('call', generator), ('return', value), ('send', flight, data, tag), ('recv', flight, tag)
+	Messages are matched by sender, receiver and tag in sending order as MPI does
+	local: flights owned by this fleet, messages to other flights are handed to transport
+	transport(outbox, qOfPending, progress): exchanges [(sender, receiver, tag, data)] messages
+	with the other fleets, returns received messages and pending tasks and progress of all fleets
+	"""
+	results = {}
+	waiting = {}
+	pending = list(tasks)
+	while True:
+		outbox = []
+		progress = False
+		while len(pending) > 0:
+			pending, sweepProgress = _sweepTasks(tasks, pending, waiting, mailbox, results, local, outbox)
+			if not sweepProgress: break
+			progress = True
+		if transport is None:
+			if len(pending) > 0: raise RuntimeError('Cooperative flights deadlock: '+str(pending))
+			break
+		inbox, qOfPending, qOfProgress = transport(outbox, len(pending), progress)
+		for sender, receiver, tag, data in inbox: mailbox.setdefault((sender, receiver, tag), deque()).append(data)
+		if qOfPending == 0: break
+		if qOfProgress == 0: raise RuntimeError('Cooperative flights deadlock: '+str(pending))
+	return results
+
+def _sweepTasks(tasks, pending, waiting, mailbox, results, local, outbox):
+
+	"""
+	Running every pending task until it finishes or blocks on a receive
+	Returns blocked tasks and whether any task made progress
+	"""
+	blocked = []
+	progress = False
+	for flight in pending:
+		stack = tasks[flight]
+		value = None
+		if flight in waiting: ## Blocked receive
+			op = waiting[flight]
+			queue = mailbox.get((op[1], flight, op[2]))
+			if not queue: blocked.append(flight); continue
+			value = queue.popleft(); del(waiting[flight]); progress = True
+		while True:
+			try: op = stack[-1].send(value)
+			except StopIteration: op = ('return', None)
+			value = None
+			if op[0] == 'call': stack.append(op[1])
+			elif op[0] == 'return':
+				stack.pop()
+				value = op[1]
+				if len(stack) == 0: results[flight] = value; progress = True; break
+			elif op[0] == 'send':
+				if local is None or op[1] in local: mailbox.setdefault((flight, op[1], op[3]), deque()).append(deepcopy(op[2]))
+				else: outbox.append((flight, op[1], op[3], deepcopy(op[2])))
+				progress = True
+			else:
+				queue = mailbox.get((op[1], flight, op[2]))
+				if queue: value = queue.popleft(); progress = True
+				else: waiting[flight] = op; blocked.append(flight); break
+	return blocked, progress
+
+def _updateCluster(response, currentCluster):
+
+	"""
+	Updating cluster
+	"""
+	for flight in response:
+		if response[flight] == False:
+			if flight in currentCluster: del(currentCluster[currentCluster.index(flight)])
+	return currentCluster
+
+def _vicsek(fleet, k, currentCluster):
+
+	"""
+	Flying in Vicsek model mode
+	Noise excluded
+	Returns the next position according to Vicsek model
+	"""
+	flight = fleet['flights'][k]
+	columns = fleet['columns']
+	segment = fleet['offsets'][k]+fleet['timestep'][k]
+	clusterSize=len(currentCluster)
+	track=float(columns[SEGMENT_TRACK][segment])
+	flightLevel=int(columns[SEGMENT_LEVEL_INIT][segment])
+	groundSpeed=float(columns[SEGMENT_GROUND_SPEED][segment])
+	info = [track,flightLevel,groundSpeed]
+	response = yield ('call', _informNodes(flight, info, currentCluster, VICSEK_TAG))
+	myNewTrack=0.0
+	myNewFL=flightLevel
+	myNewGS=groundSpeed
+	for otherFlight in response:
+		if otherFlight != flight:
+			myNewTrack+=response[otherFlight][0]
+			myNewFL+=response[otherFlight][1]
+			myNewGS+=response[otherFlight][2]
+	myNewTrack = myNewTrack/(clusterSize-1)
+	myNewFL = roundUP(myNewFL/clusterSize)
+	myNewGS = myNewGS/clusterSize
+	deltaT = float(TIME_STEP)/3600
+	dx=myNewGS*deltaT*cos(radians(myNewTrack))
+	dy=myNewGS*deltaT*sin(radians(myNewTrack))
+	dist=sqrt(pow(dx,2)+pow(dy,2))
+	dist = convertNMtoM(dist)
+	latCurrent=float(columns[SEGMENT_LAT_INIT][segment])/60
+	lonCurrent=float(columns[SEGMENT_LON_INIT][segment])/60
+	nextPositionHPC=getPoint(latCurrent,lonCurrent,myNewTrack,dist)
+	yield ('return', (nextPositionHPC, myNewFL))
+
+FLYING_MODELS = {'vicsek': _vicsek}
+
+###############################################################################################################################
+###############################################################################################################################
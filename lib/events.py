@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import os
+import json
+from heapq import merge
+
+######################################
+
+### Imports from software modules
+from cofl.etc.configuration import LOG_BUFFER
+from cofl.etc.info import EVENTS_FILE, RANK_EVENTS_SUFFIX
+######################################
+
+###############################################################################################################################
+###############################################################################################################################
+
+"""
+Structured simulation events
+One JSON object per line with the event name, simulation time t [s], the rank emitting it and the event fields:
+timeline (flight init, cruise, descent and end times), phase (CLIMB, CRUISE, DESCENT, FINISHED),
+fuelDecision (fuel cost check), fuel (original and cooperated fuel), clusters (network manager clusters),
+clusterFormed and clusterDissolved. Every rank appends its events in time order to <rank>_events.jsonl,
+the files are merged in time order in events.jsonl at the end of the simulation. Flights of the engine
+drivers (lib/engine) emit their events with the flight as rank, in the events file of their worker rank
+"""
+
+def closeEvents():
+
+	"""
+	Flushing and closing every open events file
+	"""
+	for eventsFile in list(_eventsFiles): _eventsFiles.pop(eventsFile).close()
+
+def emitEvent(eventsFile, event, currTime, rank, fields=None):
+
+	"""
+	Appending an event to the events file of a rank
+	"""
+	if eventsFile not in _eventsFiles: _eventsFiles[eventsFile]=open(eventsFile,'a',LOG_BUFFER)
+	record = dict(fields) if fields is not None else {}
+	record['event'] = event
+	record['t'] = int(currTime)
+	record['rank'] = rank
+	_eventsFiles[eventsFile].write(json.dumps(record, sort_keys=True, separators=(',',':'))+'\n')
+
+def emitEvents(eventsFile, events):
+
+	"""
+	Appending (event, t, rank, fields) events, in time order, to the events file of a rank
+	"""
+	for event, currTime, rank, fields in events: emitEvent(eventsFile, event, currTime, rank, fields)
+
+def getRankEventsFile(outputFolder, rank):
+
+	"""
+	Returns the events file of a rank
+	"""
+	return outputFolder+'/'+str(rank)+RANK_EVENTS_SUFFIX
+
+def mergeEvents(outputFolder, size):
+
+	"""
+	Merging the events files of all ranks in time order, ranks break ties
+	Returns the merged events file
+	"""
+	eventsFile = outputFolder+'/'+EVENTS_FILE
+	rankEventsFiles = [getRankEventsFile(outputFolder, rank) for rank in range(size)]
+	rankEventsFiles = [rankEventsFile for rankEventsFile in rankEventsFiles if os.path.isfile(rankEventsFile)]
+	merged = open(eventsFile,'w',LOG_BUFFER)
+	for t, rank, k, line in merge(*[_readTimedLines(rankEventsFile) for rankEventsFile in rankEventsFiles]): merged.write(line)
+	merged.close()
+	for rankEventsFile in rankEventsFiles: os.remove(rankEventsFile)
+	return eventsFile
+
+def readEvents(eventsFile, events=None):
+
+	"""
+	Reading events of an events file, only those named in events unless events is None
+	Returns generator of {field: value}
+	"""
+	for line in open(eventsFile):
+		record = json.loads(line)
+		if events is None or record['event'] in events: yield record
+
+###############################################################################################################################
+###############################################################################################################################
+
+_eventsFiles = {} ## {events file: open file}
+
+def _readTimedLines(rankEventsFile):
+
+	"""
+	Returns generator of (t, rank, line number, line) of a rank events file
+	"""
+	for k, line in enumerate(open(rankEventsFile)):
+		record = json.loads(line)
+		yield record['t'], record['rank'], k, line
+
+###############################################################################################################################
+###############################################################################################################################
@@ -29,7 +29,10 @@ def createFolders(folders):
 	"""
 	Create folders
 	"""
-	for folder in folders: os.popen('mkdir -p '+folder)
+	for folder in folders:
+		try: os.makedirs(folder)
+		except OSError:
+			if not os.path.isdir(folder): raise
 
 ###############################################################################################################################
 ###############################################################################################################################
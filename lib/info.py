@@ -22,10 +22,10 @@
 ###############################################################################################################################
 ###############################################################################################################################
 
-def usage():
+def usage(software='hpccoop.py', options=''):
 
 	print('### USAGE ###')
-	print('hpccoop.py testcase.xml ')
+	print(software+' testcase.xml '+options)
 
 ###############################################################################################################################
 ###############################################################################################################################
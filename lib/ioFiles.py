@@ -20,12 +20,16 @@ import xml.etree.ElementTree as ET
 from calendar import timegm
 from datetime import datetime
 import fileinput
+from glob import glob
+from multiprocessing import cpu_count
+from socket import gethostname
 from time import gmtime
 from timeit import default_timer
 
 ######################################
 
 ### Imports from software modules
+from cofl.etc.configuration import MACHINE_CORES
 from cofl.etc.info import RESULTS_FILE_BANNER, INIT_LINES, COOPERATIVE_FLIGHTS_FILE_BANNER, DEFAULT_SUMMARY_LINES
 from cofl.etc.eSO6DataFields import SEGMENT_DATE_INIT, SEGMENT_DATE_END, SEGMENT_TIME_INIT, SEGMENT_TIME_END
 from cofl.lib.pctime import calculateSecFromEpoch
@@ -60,6 +64,23 @@ def readInfrastructureFile(infrastructureFile):
 	for line in open(infrastructureFile): machines.append(line.split()[0])
 	return machines, len(machines)
 
+def readInfrastructureCores(infrastructureFile):
+
+	"""
+	Reading cores of every machine of the infrastructure file
+	Cores are taken from slots=N (hostfile syntax) or MACHINE_CORES, repeated machines are ignored
+	Returns machines, {machine: cores}
+	"""
+	machines=[]
+	cores={}
+	for line in open(infrastructureFile):
+		fields = line.split()
+		if len(fields) == 0 or fields[0] in cores: continue
+		slots = [int(field.split('=')[1]) for field in fields[1:] if field.startswith('slots=')]
+		machines.append(fields[0])
+		cores[fields[0]] = slots[0] if len(slots) > 0 else (MACHINE_CORES if MACHINE_CORES > 0 else cpu_count())
+	return machines, cores
+
 def readESO6Trajectory(trajectoryFile): ### DONE
 
 	"""
@@ -71,8 +92,8 @@ def readESO6Trajectory(trajectoryFile): ### DONE
 
 	trajectory=[]
 	for line in open(trajectoryFile): trajectory.append(line.split())
-	firstLine=os.popen('head -1 '+trajectoryFile).read().split()
-	endLine=os.popen('tail -1 '+trajectoryFile).read().split()
+	firstLine=trajectory[0]
+	endLine=trajectory[-1]
 	initTime=calculateSecFromEpoch(firstLine[SEGMENT_DATE_INIT],firstLine[SEGMENT_TIME_INIT])
 	endTime=calculateSecFromEpoch(endLine[SEGMENT_DATE_END],endLine[SEGMENT_TIME_END])
 	return trajectory, initTime, endTime
@@ -153,8 +174,8 @@ def wrapIT(rankMsg,outputFolder, size):
 	pFile.write('---------------------------------------------------------------------------'+'\n')
 	pFile.write('---------------------------------------------------------------------------'+'\n')
 	pFile.close()
-	os.popen('mv '+performanceFile+' '+outputFolder+'/performance.txt')
-	os.popen('rm '+outputFolder+'/*_perf.txt')
+	os.rename(performanceFile,outputFolder+'/performance.txt')
+	for rankPerformanceFile in glob(outputFolder+'/*_perf.txt'): os.remove(rankPerformanceFile)
 
 def writeCooperativeFlightsFile(cooperativeFlightsFile,flightsClusteredFlights=None,init=True):
 
@@ -199,7 +220,7 @@ def writePerformanceFile(performanceFile, rank, tcID, size, qOfMachines, dateTim
 			pFile.write('Quantity of parallel processes: '+str(size+1)+'\n')
 		pFile.write('---------------------------------------------------------------------------'+'\n')
 		pFile.write('Rank: '+str(rank)+'\n')
-		pFile.write('Hostname: '+os.popen('hostname').read()[0:-1]+'\n')
+		pFile.write('Hostname: '+gethostname()+'\n')
 		pFile.write('Simulation init time: '+str(dateTime)+'\n')
 	else:
 		pFile.write('Simulation end time: '+str(dateTime)+'\n')
@@ -29,9 +29,10 @@ def computeFuel(trajectory):
 
 	"""
 	Computing eSo6 Trajectory fuel [Kg]
+	trajectory: {eSO6 field: array}, see lib/trajectoryStore
 	"""
 	fuel = 0.0
-	for segment in trajectory: fuel+=float(segment[SEGMENT_FUEL])
+	for segmentFuel in trajectory[SEGMENT_FUEL].tolist(): fuel+=segmentFuel
 	return fuel
 
 def computeKd(myLogFile,rankMsg,trajectory,cruiseLine,descentLine):
@@ -39,8 +40,8 @@ def computeKd(myLogFile,rankMsg,trajectory,cruiseLine,descentLine):
 	fuelCruise = 0.0
 	distanceCruise = 0.0
 	for i in range(cruiseLine,descentLine+1):
-		fuelCruise+=float(trajectory[i][SEGMENT_FUEL])
-		distanceCruise+=float(trajectory[i][SEGMENT_LENGTH])
+		fuelCruise+=float(trajectory[SEGMENT_FUEL][i])
+		distanceCruise+=float(trajectory[SEGMENT_LENGTH][i])
 	Kd = fuelCruise / distanceCruise
 	logger(myLogFile,rankMsg,LOG_STD,'Cruise fuel [Kg]: '+str(fuelCruise))
 	logger(myLogFile,rankMsg,LOG_STD,'Cruise distance [NM]: '+str(distanceCruise))
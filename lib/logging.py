@@ -14,23 +14,88 @@
 
 ### imports ##########################
 
+import atexit
+import threading
+from time import sleep
+
 ######################################
 
 ### Imports from software modules
-
+from cofl.etc.configuration import LOG_LEVEL, LOG_BUFFER, LOG_FLUSH_INTERVAL, LOG_STDOUT
+from cofl.etc.info import LOG_DBG, LOG_STD, LOG_ERR
 ######################################
 
 ###############################################################################################################################
 ###############################################################################################################################
 
+"""
+Buffered logging
+Log files are kept open with a LOG_BUFFER write buffer, flushed every LOG_FLUSH_INTERVAL seconds by a daemon
+thread, at every error line and at exit. Lines below LOG_LEVEL are dropped, per timestep lines are written
+as LOG_DBG behind DEBUG_LOG so that their text is not even built out of debugging. Lines are also printed
+with LOG_STDOUT, error lines always are
+"""
+
+LOG_LEVELS = {LOG_DBG: 0, LOG_STD: 1, LOG_ERR: 2}
+DEBUG_LOG = LOG_LEVEL == 'DBG'
+
+def closeLogs():
+
+	"""
+	Flushing and closing every open log file
+	"""
+	with _lock:
+		for logFile in list(_logFiles): _logFiles.pop(logFile).close()
+
+def flushLogs():
+
+	"""
+	Flushing every open log file
+	"""
+	with _lock:
+		for logFile in _logFiles: _logFiles[logFile].flush()
+
 def logger(logFile,rankMsg,linetype,line):
 	"""
 	Logging messages
 	"""
-	log=open(logFile,'a')
-	log.write(linetype+' '+line+'\n')
-	log.close()
-	print(rankMsg+line)
+	if LOG_LEVELS[linetype] < _minLevel: return
+	with _lock:
+		if logFile not in _logFiles: _openLog(logFile)
+		log=_logFiles[logFile]
+		log.write(linetype+' '+line+'\n')
+		if linetype == LOG_ERR: log.flush()
+	if LOG_STDOUT or linetype == LOG_ERR: print(rankMsg+line)
+
+###############################################################################################################################
+###############################################################################################################################
+
+_logFiles = {} ## {log file: open file}
+_lock = threading.Lock()
+_minLevel = LOG_LEVELS['['+LOG_LEVEL+']']
+_flusher = [] ## Flushing thread, started with the first log file
+
+def _flushPeriodically():
+
+	"""
+	Flushing log files every LOG_FLUSH_INTERVAL seconds
+	"""
+	while True:
+		sleep(LOG_FLUSH_INTERVAL)
+		flushLogs()
+
+def _openLog(logFile):
+
+	"""
+	Opening a log file in append mode, must hold _lock
+	"""
+	_logFiles[logFile]=open(logFile,'a',LOG_BUFFER)
+	if len(_flusher) == 0:
+		_flusher.append(threading.Thread(target=_flushPeriodically))
+		_flusher[0].daemon = True
+		_flusher[0].start()
+
+atexit.register(closeLogs)
 
 ###############################################################################################################################
 ###############################################################################################################################
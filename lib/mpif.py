@@ -14,16 +14,101 @@
 
 ### imports ##########################
 
+import numpy as np
+from datetime import datetime
 from mpi4py import MPI
+try: import cPickle as pickle
+except ImportError: import pickle
 
 ######################################
 
 ### Imports from software modules
+from cofl.etc.configuration import CLUSTER_MSG_BUFFER
+from cofl.etc.info import CRUISE, FLIGHT_PHASES
+from cofl.etc.eSO6DataFields import SEGMENT_LAT_INIT, SEGMENT_LON_INIT, SEGMENT_TRACK, QOF_ESO6_FIELDS
+from cofl.lib.pctime import returnSeconds
 ######################################
 
 ###############################################################################################################################
 ###############################################################################################################################
 
+"""
+Telemetry record of a flight: status (phase code) and the eSO6 fields the network manager reads
+"""
+TELEMETRY_DTYPE = np.dtype([('flight', np.int32), ('phase', np.int8), ('lat', np.float64), ('lon', np.float64), ('track', np.float64)])
+
+def allgatherPickledMsg(comm, data):
+
+	"""
+	All-gathering data pickled once in a byte buffer
+	Returns [data of every rank], size of the sent message and [size of the message of every rank] [bytes]
+	"""
+	payloads = comm.allgather(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+	return [pickle.loads(payload) for payload in payloads], len(payloads[comm.Get_rank()]), [len(payload) for payload in payloads]
+
+def exchangeWithNodes(comm, info, nodes, tag):
+
+	"""
+	Sending info to every node and receiving info of every node in one non-blocking round
+	All sends and receives are posted before waiting, so no node blocks another one
+	Returns {node: info}, bytes of the sent message, {node: bytes received}, sending and receiving times [s]
+	"""
+	payload = pickle.dumps(info, pickle.HIGHEST_PROTOCOL)
+	initT = datetime.now()
+	sendRequests = [comm.Isend([payload, MPI.BYTE], dest=node, tag=tag) for node in nodes]
+	receiveRequests = [comm.irecv(bytearray(CLUSTER_MSG_BUFFER), source=node, tag=tag) for node in nodes]
+	postedT = datetime.now()
+	statuses = [MPI.Status() for node in nodes]
+	received = MPI.Request.waitall(receiveRequests, statuses)
+	MPI.Request.Waitall(sendRequests)
+	endT = datetime.now()
+	response = {}
+	receivedBytes = {}
+	for node, data, status in zip(nodes, received, statuses):
+		response[node] = data
+		receivedBytes[node] = status.Get_count(MPI.BYTE)
+	return response, len(payload), receivedBytes, returnSeconds(initT,postedT), returnSeconds(postedT,endT)
+
+def gatherPickledMsg(comm, data, root):
+
+	"""
+	Gathering data of every rank pickled once in byte buffers at root
+	Returns [data of every rank], size of the sent message and [size of the message of every rank] [bytes],
+	data and sizes of every rank are None out of root
+	"""
+	payload = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+	payloads = comm.gather(payload, root=root)
+	if payloads is None: return None, len(payload), None
+	return [pickle.loads(payload) for payload in payloads], len(payload), [len(payload) for payload in payloads]
+
+def packTelemetry(phases, vehiclesPosition):
+
+	"""
+	Packing status and telemetry of flights in TELEMETRY_DTYPE records
+	phases: {flight: phase code}
+	vehiclesPosition: {flight: current segment indexed by eSO6 fields} of cruise flights
+	"""
+	flights = list(phases)
+	records = np.zeros(len(flights), dtype=TELEMETRY_DTYPE)
+	records['flight'] = flights
+	records['phase'] = [phases[flight] for flight in flights]
+	for field, eSO6Field in [('lat',SEGMENT_LAT_INIT), ('lon',SEGMENT_LON_INIT), ('track',SEGMENT_TRACK)]:
+		records[field] = [float(vehiclesPosition[flight][eSO6Field]) if flight in vehiclesPosition else np.nan for flight in flights]
+	return records
+
+def receivePickledMsg(comm, src=MPI.ANY_SOURCE, t=MPI.ANY_TAG):
+
+	"""
+	Receiving a message sent by sendPickledMsg
+	Returns data, sender and size of the message [bytes]
+	"""
+	status = MPI.Status()
+	comm.Probe(source=src, tag=t, status=status)
+	sender = status.Get_source()
+	payload = bytearray(status.Get_count(MPI.BYTE))
+	comm.Recv([payload, MPI.BYTE], source=sender, tag=status.Get_tag())
+	return pickle.loads(bytes(payload)), sender, len(payload)
+
 def receiveMPIMsg(comm,src=MPI.ANY_SOURCE,t=MPI.ANY_TAG): ### DONE
 
 	"""
@@ -36,6 +121,70 @@ def receiveMPIMsg(comm,src=MPI.ANY_SOURCE,t=MPI.ANY_TAG): ### DONE
 	dataDict['sender']=int(status.Get_source())
 	return dataDict
 
+def routeClusterMessages(comm, owners, stats, outbox, qOfPending, progress):
+
+	"""
+	Routing cooperative messages between flights of different ranks
+	One alltoall round per call, plus the count of pending tasks and progress of all ranks
+	owners: {flight: rank in comm owning the flight}
+	stats: MPI statistics of this rank, updated in place
+	outbox: [(sender, receiver, tag, data)]
+	Returns received messages, quantity of pending tasks and quantity of ranks with progress
+	Messages to every rank are pickled once in a byte buffer, None when there are no messages
+	"""
+	outgoing = [[] for rank in range(comm.Get_size())]
+	for message in outbox: outgoing[owners[message[1]]].append(message)
+	outgoing = [pickle.dumps(messages, pickle.HIGHEST_PROTOCOL) if len(messages) > 0 else None for messages in outgoing]
+	initT = datetime.now()
+	incoming = comm.alltoall(outgoing)
+	counters = np.array([qOfPending, int(progress)], dtype=np.int64)
+	comm.Allreduce(MPI.IN_PLACE, counters, op=MPI.SUM)
+	endT = datetime.now()
+	inbox = []
+	for payload in incoming:
+		if payload is None: continue
+		inbox.extend(pickle.loads(payload))
+		stats['qOfMSGReceived']+=1
+		stats['bytesReceived']+=len(payload)
+	for payload in outgoing:
+		if payload is None: continue
+		stats['qOfMSGSent']+=1
+		stats['bytesSent']+=len(payload)
+	stats['receivingTime']+=returnSeconds(initT,endT)
+	return inbox, int(counters[0]), int(counters[1])
+
+def sendPickledMsg(comm, destination, data, t=0):
+
+	"""
+	Sending data pickled once in a byte buffer
+	Returns size of the message [bytes]
+	"""
+	payload = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+	comm.Send([payload, MPI.BYTE], dest=destination, tag=t)
+	return len(payload)
+
+def sendPickledMsgs(comm, messages, t=0):
+
+	"""
+	Sending {destination: data} messages pickled in byte buffers with non-blocking sends
+	Returns {destination: size of the message [bytes]}
+	"""
+	payloads = {}
+	for destination in messages: payloads[destination] = pickle.dumps(messages[destination], pickle.HIGHEST_PROTOCOL)
+	requests = [comm.Isend([payloads[destination], MPI.BYTE], dest=destination, tag=t) for destination in payloads]
+	MPI.Request.Waitall(requests)
+	return dict((destination, len(payloads[destination])) for destination in payloads)
+
+def scatterPickledMsgs(comm, messages, root):
+
+	"""
+	Scattering [data for every rank] pickled once in byte buffers from root
+	Returns my data, size of my message and [size of the message of every rank] [bytes], None out of root
+	"""
+	payloads = None if messages is None else [pickle.dumps(data, pickle.HIGHEST_PROTOCOL) for data in messages]
+	payload = comm.scatter(payloads, root=root)
+	return pickle.loads(payload), len(payload), None if payloads is None else [len(payload) for payload in payloads]
+
 def sendMPIMsg(comm,destination,data): ### DONE
 
 	"""
@@ -43,5 +192,22 @@ def sendMPIMsg(comm,destination,data): ### DONE
 	"""
 	comm.send(data, dest=destination)
 
+def unpackTelemetry(records):
+
+	"""
+	Unpacking TELEMETRY_DTYPE records
+	Returns {flight: status}, {flight: current segment indexed by eSO6 fields} of cruise flights
+	"""
+	statuses = {}
+	for flight, phase in zip(records['flight'].tolist(), records['phase'].tolist()): statuses[flight] = FLIGHT_PHASES[phase]
+	cruise = records[records['phase'] == CRUISE]
+	segments = np.full((len(cruise), QOF_ESO6_FIELDS), np.nan)
+	segments[:,SEGMENT_LAT_INIT] = cruise['lat']
+	segments[:,SEGMENT_LON_INIT] = cruise['lon']
+	segments[:,SEGMENT_TRACK] = cruise['track']
+	vehiclesPosition = {}
+	for i, flight in enumerate(cruise['flight'].tolist()): vehiclesPosition[flight] = segments[i]
+	return statuses, vehiclesPosition
+
 ###############################################################################################################################
 ###############################################################################################################################
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+######################################
+
+### Imports from software modules
+from cofl.etc.configuration import NEIGHBOURS_MARGIN, FAST_DISTANCE_ERROR
+from cofl.lib.physics import calculateDistancesBetweenPoints, checkTracks
+from cofl.lib.spatialIndex import getNeighbourCandidates
+######################################
+
+###############################################################################################################################
+###############################################################################################################################
+
+"""
+Neighbour sets
+Pairs of cruise flights closer than the outer radius, radius*(1+NEIGHBOURS_MARGIN), kept by the network manager across timesteps
+{'pairs': {flight: {otherFlight: [distance [m], travelled [m]]}}, 'travelled': {flight: distance travelled since it was measured
+against the other flights [m]}, 'coordinates': {flight: (lat, lon)}, 'sectors': {flight: track sector}, 'radius': radius [m]}
+The separation of a pair changes at most the distance travelled by both flights since it was measured: a pair is measured again
+only when its separation could have crossed the radius, and the neighbour sets are built again when a pair left out could be
+within radius. Distances travelled and pairs within the outer radius are measured with the vectorized fast distance, whose
+error is bounded by FAST_DISTANCE_ERROR, pairs which could be within radius are measured in GEODESIC_MODE when looked up
+Pairs are only kept for flights in the same or in neighbouring track sectors of the spatial index, a flight changing
+of track sector is paired again as a flight starting cruise
+"""
+
+def getMatchedNeighbours(neighbourSets, index, flight):
+
+	"""
+	Returns flights within radius of flight whose tracks match, in the order in which flights were indexed
+	Tracks are checked first, only pairs whose separation could have crossed the radius are measured
+	"""
+	radius = neighbourSets['radius']
+	travelled = neighbourSets['travelled']
+	track = index['tracks'][flight]
+	pairs = neighbourSets['pairs'][flight]
+	matched = [otherFlight for otherFlight in pairs if checkTracks(track, index['tracks'][otherFlight])]
+	measured = [otherFlight for otherFlight in matched if abs(pairs[otherFlight][0]-radius) <= travelled[flight]+travelled[otherFlight]-pairs[otherFlight][1]]
+	if len(measured) > 0:
+		lat, lon = index['coordinates'][flight]
+		distances = calculateDistancesBetweenPoints(lat,lon,[index['coordinates'][otherFlight][0] for otherFlight in measured],[index['coordinates'][otherFlight][1] for otherFlight in measured])
+		for otherFlight, distance in zip(measured, distances):
+			pairs[otherFlight][0] = distance
+			pairs[otherFlight][1] = travelled[flight]+travelled[otherFlight]
+	neighbours = [otherFlight for otherFlight in matched if pairs[otherFlight][0] <= radius]
+	neighbours.sort(key=index['order'].get)
+	return neighbours
+
+def initNeighbourSets():
+
+	"""
+	Neighbour sets before the first timestep
+	"""
+	return {'pairs': None, 'travelled': {}, 'coordinates': {}, 'sectors': {}, 'radius': None}
+
+def updateNeighbourSets(neighbourSets, index, radius):
+
+	"""
+	Updating neighbour sets to the cruise flights of index (lib/spatialIndex), whose cells are at least the outer radius
+	Flights leaving cruise or changing of track sector are deleted, the distance travelled by flights which moved is added
+	and flights starting cruise or changing of track sector are inserted. Neighbour sets are built again when the two
+	longest distances travelled add up to the margin
+	"""
+	pairs = neighbourSets['pairs']
+	if pairs is None or radius != neighbourSets['radius']:
+		_buildNeighbourSets(neighbourSets, index, radius)
+		return neighbourSets
+	travelled = neighbourSets['travelled']
+	coordinates = neighbourSets['coordinates']
+	sectors = neighbourSets['sectors']
+	sectorOf = index['sectorOf']
+	for flight in [flight for flight in pairs if sectors[flight] != sectorOf.get(flight)]:
+		for otherFlight in pairs.pop(flight): del(pairs[otherFlight][flight])
+		del(travelled[flight])
+		del(coordinates[flight])
+		del(sectors[flight])
+	moved = [flight for flight in index['flights'] if flight in coordinates and coordinates[flight] != index['coordinates'][flight]]
+	if len(moved) > 0:
+		distances = calculateDistancesBetweenPoints([coordinates[flight][0] for flight in moved],[coordinates[flight][1] for flight in moved],
+							    [index['coordinates'][flight][0] for flight in moved],[index['coordinates'][flight][1] for flight in moved],'fast')
+		for flight, distance in zip(moved, distances):
+			travelled[flight] += distance*(1+FAST_DISTANCE_ERROR)
+			coordinates[flight] = index['coordinates'][flight]
+		if sum(sorted(travelled.values())[-2:]) >= radius*NEIGHBOURS_MARGIN:
+			_buildNeighbourSets(neighbourSets, index, radius)
+			return neighbourSets
+	inserted = [flight for flight in index['flights'] if flight not in pairs]
+	for flight in inserted:
+		pairs[flight] = {}
+		travelled[flight] = 0.0
+		coordinates[flight] = index['coordinates'][flight]
+		sectors[flight] = sectorOf[flight]
+	_addPairs(neighbourSets, index, inserted, set(inserted))
+	return neighbourSets
+
+###############################################################################################################################
+###############################################################################################################################
+
+def _addPairs(neighbourSets, index, flights, pairedFlights):
+
+	"""
+	Adding the pairs within the outer radius of flights and their candidates in the spatial index
+	Pairs of two flights in pairedFlights are added once, both flights of a pair share its [distance, travelled]
+	The error of the fast distance is subtracted from the distance travelled, as if flights had travelled it since
+	"""
+	order = index['order']
+	flightPairs = [(flight, otherFlight) for flight in flights for otherFlight in getNeighbourCandidates(index, flight)
+		       if otherFlight not in pairedFlights or order[otherFlight] > order[flight]]
+	if len(flightPairs) == 0: return
+	pairs = neighbourSets['pairs']
+	outerRadius = neighbourSets['radius']*(1+NEIGHBOURS_MARGIN)*(1+FAST_DISTANCE_ERROR)
+	distances = calculateDistancesBetweenPoints([index['coordinates'][flight][0] for flight, otherFlight in flightPairs],[index['coordinates'][flight][1] for flight, otherFlight in flightPairs],
+						    [index['coordinates'][otherFlight][0] for flight, otherFlight in flightPairs],[index['coordinates'][otherFlight][1] for flight, otherFlight in flightPairs],'fast')
+	for (flight, otherFlight), distance in zip(flightPairs, distances):
+		if distance <= outerRadius:
+			pair = [distance, neighbourSets['travelled'][flight]+neighbourSets['travelled'][otherFlight]-distance*FAST_DISTANCE_ERROR]
+			pairs[flight][otherFlight] = pair
+			pairs[otherFlight][flight] = pair
+
+def _buildNeighbourSets(neighbourSets, index, radius):
+
+	"""
+	Building the neighbour sets of every cruise flight from the neighbouring cells and track sectors of the spatial index
+	"""
+	neighbourSets['pairs'] = dict((flight, {}) for flight in index['flights'])
+	neighbourSets['travelled'] = dict((flight, 0.0) for flight in index['flights'])
+	neighbourSets['coordinates'] = dict((flight, index['coordinates'][flight]) for flight in index['flights'])
+	neighbourSets['sectors'] = dict((flight, index['sectorOf'][flight]) for flight in index['flights'])
+	neighbourSets['radius'] = radius
+	_addPairs(neighbourSets, index, index['flights'], set(index['flights']))
+
+###############################################################################################################################
+###############################################################################################################################
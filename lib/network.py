@@ -14,34 +14,53 @@
 
 ### imports ##########################
 
-from networkx import DiGraph, shortest_path_length
+import numpy as np
+from itertools import chain
 
 ######################################
 
 ### Imports from software modules
+from cofl.etc.configuration import NETWORK_ARRAY_MIN_NODES
 ######################################
 
 ###############################################################################################################################
 ###############################################################################################################################
 
+"""
+Aircraft network
+{'nodes': cruise flights, 'edges': {flight: flights it is clustered with}, 'LRC': LRC of the current network or None}
+Only the nodes and edges joining or leaving between timesteps are applied, LRC is recalculated only when any of them changed
+LRC is calculated over a CSR adjacency (indptr, indices) whose rows are flight slots, the slot of a flight is the flight
+Networks that are not unions of cliques and have fewer than NETWORK_ARRAY_MIN_NODES nodes are searched from every flight
+over the edges instead. Up to 32 nodes the array searches are slower than networkx (0.5x at 16 overlapping flights) and up
+to 1024 slower than the per flight searches, at 2048 and above both take the same time
+"""
+
 def addEdges(aircraftNetwork,clusters):
 
 	"""
 	Addings edges from clusters
+	Only the edges of flights whose cluster changed are updated
 	"""
+	edges = aircraftNetwork['edges']
 	for flight in clusters:
-		for otherFlight in filter(lambda otherFlight: otherFlight!=flight, clusters[flight]): aircraftNetwork.add_edge(flight,otherFlight)
+		otherFlights = set(clusters[flight])
+		otherFlights.discard(flight)
+		if otherFlights != edges.get(flight, _noEdges):
+			if len(otherFlights) > 0: edges[flight] = otherFlights
+			else: del(edges[flight])
+			aircraftNetwork['LRC'] = None
 	return aircraftNetwork
 
 def calculateGRC(LRC):
 
 	"""
 	Calculate GRC (Global Reaching Centrality)
+	Differences to the maximum LRC are summed in node order
 	"""
 	nodes=len(LRC)
 	max_LRC = max(LRC)
-	GRC = 0.0
-	for lrc in LRC: GRC+=(max_LRC-lrc)
+	GRC = sum((max_LRC-np.asarray(LRC, dtype=float)).tolist(), 0.0)
 	GRC = GRC / (nodes -1)
 	return GRC
 
@@ -49,24 +68,113 @@ def calculateLRC(aircraftNetwork):
 
 	"""
 	Calculate LRC (Local Reaching Centrality)
-	Nodes are the network manager (0) and live flights
+	Nodes are cruise flights and clustered flights, in ascending order
+	The LRC of a node is the fraction of the other nodes it reaches, the size of its cluster when clusters are cliques
+	Returns array of LRC
 	"""
-	nodes = list(sorted(aircraftNetwork.nodes()))
-	qOfAircraft = aircraftNetwork.number_of_nodes() -1
-	LRC = []
-	for node in nodes:
-		shortestPathsFromNode = shortest_path_length(aircraftNetwork, source=node)
-		LRC.append(float(len(shortestPathsFromNode)-1)/float(qOfAircraft))
-	return LRC
+	if aircraftNetwork['LRC'] is None:
+		indptr, indices = _getCSRAdjacency(aircraftNetwork['edges'], aircraftNetwork['nodes'])
+		nodesMask = np.diff(indptr) > 0
+		nodesMask[list(aircraftNetwork['nodes'])] = True
+		nodesMask[indices] = True
+		nodes = np.flatnonzero(nodesMask)
+		reachedNodes = _calculateCliquesReachedNodes(indptr, indices)
+		if reachedNodes is None and len(nodes) < NETWORK_ARRAY_MIN_NODES: reachedNodes = _searchReachedNodes(aircraftNetwork['edges'], len(indptr)-1)
+		elif reachedNodes is None: reachedNodes = _calculateReachedNodes(indptr, indices)
+		aircraftNetwork['LRC'] = reachedNodes[nodes].astype(float) / float(len(nodes) -1)
+	return aircraftNetwork['LRC']
 
-def setNetwork(flights):
+def setNetwork(flights, aircraftNetwork=None):
 
 	"""
 	Setting network and hierarchy
+	aircraftNetwork: network of the previous timestep, only flights joining or leaving it are applied
 	"""
-	aircraftNetwork = DiGraph()
-	aircraftNetwork.add_nodes_from(flights)
+	if aircraftNetwork is None: aircraftNetwork = {'nodes': set(), 'edges': {}, 'LRC': None}
+	nodes = aircraftNetwork['nodes']
+	if len(nodes) != len(flights) or not nodes.issuperset(flights):
+		aircraftNetwork['nodes'] = set(flights)
+		aircraftNetwork['LRC'] = None
 	return aircraftNetwork
 
 ###############################################################################################################################
 ###############################################################################################################################
+
+_noEdges = frozenset()
+
+def _calculateCliquesReachedNodes(indptr, indices):
+
+	"""
+	Quantity of nodes reached from every slot when the network is a union of cliques, every node of a clique
+	reaches the other nodes of it. The network is a union of cliques when it is symmetric, the smallest slot of the
+	closed neighbourhood is the same for both ends of every edge and every node is adjacent to every node sharing it
+	Returns array of reached nodes by slot, None if the network is not a union of cliques
+	"""
+	slots = len(indptr)-1
+	degrees = np.diff(indptr)
+	sources = np.repeat(np.arange(slots), degrees)
+	if not np.array_equal(np.sort(sources*slots+indices), np.sort(indices*slots+sources)): return None
+	labels = np.arange(slots)
+	np.minimum.at(labels, sources, indices)
+	if np.any(labels[sources] != labels[indices]): return None
+	if np.any(np.bincount(labels, minlength=slots)[labels] != degrees+1): return None
+	return degrees
+
+def _calculateReachedNodes(indptr, indices):
+
+	"""
+	Quantity of nodes reached from every slot of a directed network
+	The breadth first searches from every slot run at once over (source slot, reached slot) pairs, encoded as
+	source*slots+reached, each frontier is expanded along the CSR rows of its reached slots
+	Returns array of reached nodes by slot
+	"""
+	slots = len(indptr)-1
+	degrees = np.diff(indptr)
+	frontier = np.unique(np.repeat(np.arange(slots), degrees)*slots+indices)
+	reached = frontier
+	while len(frontier) > 0:
+		sources, nodes = np.divmod(frontier, slots)
+		nodesDegrees = degrees[nodes]
+		edges = np.repeat(indptr[nodes]-np.cumsum(nodesDegrees)+nodesDegrees, nodesDegrees)+np.arange(nodesDegrees.sum())
+		frontier = np.unique(np.repeat(sources, nodesDegrees)*slots+indices[edges])
+		frontier = frontier[np.isin(frontier, reached, assume_unique=True, invert=True)]
+		reached = np.union1d(reached, frontier)
+	sources, nodes = np.divmod(reached, slots)
+	return np.bincount(sources[sources != nodes], minlength=slots)
+
+def _getCSRAdjacency(edges, flights):
+
+	"""
+	Returns CSR adjacency (indptr, indices) of the edges, rows are slots 0 to the largest flight or clustered flight
+	"""
+	edgesFlights = sorted(edges)
+	indices = np.fromiter(chain.from_iterable(sorted(edges[flight]) for flight in edgesFlights), dtype=np.int64, count=sum(len(edges[flight]) for flight in edgesFlights))
+	slots = max([int(indices.max(initial=-1))]+edgesFlights[-1:]+list(flights))+1
+	degrees = np.zeros(slots, dtype=np.int64)
+	degrees[edgesFlights] = [len(edges[flight]) for flight in edgesFlights]
+	indptr = np.concatenate(([0], np.cumsum(degrees)))
+	return indptr, indices
+
+def _searchReachedNodes(edges, slots):
+
+	"""
+	Quantity of nodes reached from every slot of a directed network, one breadth first search per flight with edges
+	Returns array of reached nodes by slot
+	"""
+	reachedNodes = np.zeros(slots, dtype=np.int64)
+	for flight in edges:
+		reached = set([flight])
+		frontier = [flight]
+		while len(frontier) > 0:
+			nextFrontier = []
+			for node in frontier:
+				for otherFlight in edges.get(node, _noEdges):
+					if otherFlight not in reached:
+						reached.add(otherFlight)
+						nextFrontier.append(otherFlight)
+			frontier = nextFrontier
+		reachedNodes[flight] = len(reached)-1
+	return reachedNodes
+
+###############################################################################################################################
+###############################################################################################################################
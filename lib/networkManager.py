@@ -0,0 +1,370 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+######################################
+
+### Imports from software modules
+from cofl.etc.info import LOG_DBG, LOG_STD
+from cofl.lib.clusterSets import getCluster, initClusterSets, leaveCluster
+from cofl.lib.clustering import fifo
+from cofl.lib.events import emitEvent
+from cofl.lib.ioFiles import writeResultsFile
+from cofl.lib.logging import DEBUG_LOG, logger
+from cofl.lib.neighbourSets import initNeighbourSets
+from cofl.lib.network import addEdges, calculateGRC, calculateLRC, setNetwork
+######################################
+
+###############################################################################################################################
+###############################################################################################################################
+
+def computeNMClusters(nm, grouping, radius, currTime, myLogFile, rankMsg, eventsFile=None):
+
+	"""
+	Calculating NM clusters and updating possible (NM) quantity of clusters
+	eventsFile: clusters, clusterFormed and clusterDissolved events of the network manager (rank 0) are emitted if given
+	"""
+	clusters = nm['clusters']
+	if nm['qOfCruiseFlights'] >= 2:
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Computing clusters using clustering = '+str(grouping)+' model')
+		nm['previousNMClusters'] = dict(clusters)
+		if grouping == 'fifo': clusters, nm['clusteredFlights'], nm['setClusters'] = fifo(clusters, nm['vehiclesPosition'], nm['cruiseFlights'], radius, currTime, nm['clusterSets'], nm['neighbourSets'])
+		nm['clusters'] = clusters
+		if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Set clusters = '+str(nm['setClusters']))
+		if nm['setClusters']:
+			nm['nmQOfClusters']+=_countNewClusters(nm, clusters) ### Updating quantity of clusters calculated by NM
+			nm['nmClusters'] = dict(clusters)
+			nmClustersLine=''
+			for flight in sorted(nm['nmClusters']): nmClustersLine+=str(flight)+':'+str(nm['nmClusters'][flight])+' '
+			logger(myLogFile,rankMsg,LOG_STD,'Clusters calculated by Network Manager: '+nmClustersLine)
+			if eventsFile is not None: _emitClustersEvents(nm, currTime, eventsFile)
+			if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Current quantity of clusters calculated by network manager are '+str(nm['nmQOfClusters']))
+	elif DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Not enough cruise flights to run clustering = '+str(grouping)+' model')
+	qOfClusteredFlights=len(nm['clusteredFlights'])
+	if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Number of clustered flights are '+str(qOfClusteredFlights))
+	if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Clustered flights are: '+str(nm['clusteredFlights']))
+
+def computeSimulationSummary(nm, testCaseResults, flightsSummaries, procsSummaries):
+
+	"""
+	Computing simulation summary
+	testCaseResults: test case parameters heading the summary
+	flightsSummaries: {flight: simulation summary sent by the flight}, MPI statistics
+	are included only when the flight is a process of its own
+	procsSummaries: MPI statistics of the other processes e.g. network manager
+	Returns summary results and cooperative flights of every flight
+	"""
+	totalOriginalFuel = 0.0
+	totalCooperatedFuel = 0.0
+	aircraftQOfClusters = []
+	aircraftClusteredDuration = []
+	flightsClusteredFlights = {}
+	procsBytesSent = []
+	procsBytesReceived = []
+	procsSendingTime = []
+	procsReceivingTime = []
+	procsQOfMSGSent = []
+	procsQOfMSGReceived = []
+	aircraftBytesClusteredSent = []
+	aircraftBytesClusteredReceived = []
+	aircraftSendingClusteredTime = []
+	aircraftReceivingClusteredTime = []
+	aircraftQOfClusteredMSGSent = []
+	aircraftQOfClusteredMSGReceived = []
+	flightsWithFuelProfit = []
+	flightsWithoutFuelProfit = []
+	for flight in flightsSummaries:
+		flightSummary=flightsSummaries[flight]
+		flightOriginalFuel = flightSummary[0]
+		flightCooperatedFuel = flightSummary[1]
+		flightQOfClusters = flightSummary[2]
+		flightClusteredDuration = flightSummary[3]
+		flightClusteredFlights = flightSummary[4]
+		if float(flightOriginalFuel) > float(flightCooperatedFuel): flightsWithFuelProfit.append(flight)
+		elif float(flightOriginalFuel) < float(flightCooperatedFuel): flightsWithoutFuelProfit.append(flight)
+		totalOriginalFuel += flightOriginalFuel
+		totalCooperatedFuel += flightCooperatedFuel
+		if flightQOfClusters > 0:
+			aircraftQOfClusters.append(flightQOfClusters)
+			aircraftClusteredDuration.append(flightClusteredDuration)
+		flightsClusteredFlights[flight] = flightClusteredFlights
+		if len(flightSummary) == 5: continue ## Flight is not a process of its own
+		flightBytesSent = flightSummary[5]
+		flightBytesReceived = flightSummary[6]
+		flightSendingTime = flightSummary[7]
+		flightReceivingTime = flightSummary[8]
+		flightQOfMSGSent = flightSummary[9]
+		flightQOfMSGReceived = flightSummary[10]
+		flightBytesClusteredSent = flightSummary[11]
+		flightBytesClusteredReceived = flightSummary[12]
+		flightSendingClusteredTime = flightSummary[13]
+		flightReceivingClusteredTime = flightSummary[14]
+		flightQOfClusteredMSGSent = flightSummary[15]
+		flightQOfClusteredMSGReceived = flightSummary[16]
+		procsBytesSent.append(flightBytesSent)
+		procsBytesReceived.append(flightBytesReceived)
+		procsSendingTime.append(flightSendingTime)
+		procsReceivingTime.append(flightReceivingTime)
+		procsQOfMSGSent.append(flightQOfMSGSent)
+		procsQOfMSGReceived.append(flightQOfMSGReceived)
+		if flightQOfClusters > 0:
+			aircraftBytesClusteredSent.append(flightBytesClusteredSent)
+			aircraftBytesClusteredReceived.append(flightBytesClusteredReceived)
+			aircraftSendingClusteredTime.append(flightSendingClusteredTime)
+			aircraftReceivingClusteredTime.append(flightReceivingClusteredTime)
+			aircraftQOfClusteredMSGSent.append(flightQOfClusteredMSGSent)
+			aircraftQOfClusteredMSGReceived.append(flightQOfClusteredMSGReceived)
+	for bytesSent, bytesReceived, sendingTime, receivingTime, qOfMSGSent, qOfMSGReceived in procsSummaries:
+		procsBytesSent.append(bytesSent)
+		procsBytesReceived.append(bytesReceived)
+		procsSendingTime.append(sendingTime)
+		procsReceivingTime.append(receivingTime)
+		procsQOfMSGSent.append(qOfMSGSent)
+		procsQOfMSGReceived.append(qOfMSGReceived)
+
+	qOfClusters = nm['qOfClusters']
+	nmQOfClusters = nm['nmQOfClusters']
+	acceptanceRatio = float(qOfClusters * 100) / nmQOfClusters if nmQOfClusters >= 1 else 0
+	averageQOfClusters = float(sum(aircraftQOfClusters)) / len(aircraftQOfClusters) if len(aircraftQOfClusters) > 0 else 0
+	maxQOfClusters = max(aircraftQOfClusters) if len(aircraftQOfClusters) > 0 else 0
+	minQOfClusters = min(aircraftQOfClusters) if len(aircraftQOfClusters) > 0 else 0
+	averageClusteredDuration = float(sum(aircraftClusteredDuration)) / len(aircraftClusteredDuration) if len(aircraftClusteredDuration) > 0 else 0
+	maxClusteredDuration = max(aircraftClusteredDuration) if len(aircraftClusteredDuration) > 0 else 0
+	minClusteredDuration = min(aircraftClusteredDuration) if len(aircraftClusteredDuration) > 0 else 0
+	averageBytesClusteredSent = float(sum(aircraftBytesClusteredSent)) / len(aircraftBytesClusteredSent) if len(aircraftBytesClusteredSent) > 0 else 0
+	maxBytesClusteredSent = max(aircraftBytesClusteredSent) if len(aircraftBytesClusteredSent) > 0 else 0
+	minBytesClusteredSent = min(aircraftBytesClusteredSent) if len(aircraftBytesClusteredSent) > 0 else 0
+	averageBytesClusteredReceived = float(sum(aircraftBytesClusteredReceived)) / len(aircraftBytesClusteredReceived) if len(aircraftBytesClusteredReceived) > 0 else 0
+	maxBytesClusteredReceived = max(aircraftBytesClusteredReceived) if len(aircraftBytesClusteredReceived) > 0 else 0
+	minBytesClusteredReceived = min(aircraftBytesClusteredReceived) if len(aircraftBytesClusteredReceived) > 0 else 0
+	averageSendingClusteredTime = float(sum(aircraftSendingClusteredTime)) / len(aircraftSendingClusteredTime) if len(aircraftSendingClusteredTime) > 0 else 0
+	maxSendingClusteredTime = max(aircraftSendingClusteredTime) if len(aircraftSendingClusteredTime) > 0 else 0
+	minSendingClusteredTime = min(aircraftSendingClusteredTime) if len(aircraftSendingClusteredTime) > 0 else 0
+	averageReceivingClusteredTime = float(sum(aircraftReceivingClusteredTime)) / len(aircraftReceivingClusteredTime) if len(aircraftReceivingClusteredTime) > 0 else 0
+	maxReceivingClusteredTime = max(aircraftReceivingClusteredTime) if len(aircraftReceivingClusteredTime) > 0 else 0
+	minReceivingClusteredTime = min(aircraftReceivingClusteredTime) if len(aircraftReceivingClusteredTime) > 0 else 0
+	averageQOfClusteredMSGSent = float(sum(aircraftQOfClusteredMSGSent)) / len(aircraftQOfClusteredMSGSent) if len(aircraftQOfClusteredMSGSent) > 0 else 0
+	maxQOfClusteredMSGSent = max(aircraftQOfClusteredMSGSent) if len(aircraftQOfClusteredMSGSent) > 0 else 0
+	minQOfClusteredMSGSent = min(aircraftQOfClusteredMSGSent) if len(aircraftQOfClusteredMSGSent) > 0 else 0
+
+	averageQOfClusteredMSGReceived = float(sum(aircraftQOfClusteredMSGReceived)) / len(aircraftQOfClusteredMSGReceived) if len(aircraftQOfClusteredMSGReceived) > 0 else 0
+	maxQOfClusteredMSGReceived = max(aircraftQOfClusteredMSGReceived) if len(aircraftQOfClusteredMSGReceived) > 0 else 0
+	minQOfClusteredMSGReceived = min(aircraftQOfClusteredMSGReceived) if len(aircraftQOfClusteredMSGReceived) > 0 else 0
+
+	summaryResults = testCaseResults + [
+					  qOfClusters,
+					  nmQOfClusters,
+					  acceptanceRatio,
+					  nm['GRC_sum'] / nm['GRC_updates'],
+					  nm['maxGRC'],
+					  nm['minGRC'],
+					  nm['GRC_updates'],
+					  totalOriginalFuel,
+					  totalCooperatedFuel,
+					  totalOriginalFuel-totalCooperatedFuel,
+					  len(flightsWithFuelProfit),
+					  flightsWithFuelProfit,
+					  len(flightsWithoutFuelProfit),
+					  flightsWithoutFuelProfit,
+					  averageQOfClusters,
+					  maxQOfClusters,
+					  minQOfClusters,
+					  averageClusteredDuration,
+					  maxClusteredDuration,
+					  minClusteredDuration,
+					  sum(procsBytesSent),
+					  float(sum(procsBytesSent)) / len(procsBytesSent),
+					  max(procsBytesSent),
+					  min(procsBytesSent),
+					  sum(procsBytesReceived),
+					  float(sum(procsBytesReceived)) / len(procsBytesReceived),
+					  max(procsBytesReceived),
+					  min(procsBytesReceived),
+			  		  sum(procsSendingTime),
+					  float(sum(procsSendingTime)) / len(procsSendingTime),
+					  max(procsSendingTime),
+					  min(procsSendingTime),
+					  sum(procsReceivingTime),
+					  float(sum(procsReceivingTime)) / len(procsReceivingTime),
+					  max(procsReceivingTime),
+					  min(procsReceivingTime),
+					  sum(procsQOfMSGSent),
+					  float(sum(procsQOfMSGSent)) / len(procsQOfMSGSent),
+					  max(procsQOfMSGSent),
+					  min(procsQOfMSGSent),
+					  sum(procsQOfMSGReceived),
+					  float(sum(procsQOfMSGReceived)) / len(procsQOfMSGReceived),
+					  max(procsQOfMSGReceived),
+					  min(procsQOfMSGReceived),
+					  sum(aircraftBytesClusteredSent),
+					  averageBytesClusteredSent,
+					  maxBytesClusteredSent,
+					  minBytesClusteredSent,
+				   	  sum(aircraftBytesClusteredReceived),
+					  averageBytesClusteredReceived,
+					  maxBytesClusteredReceived,
+					  minBytesClusteredReceived,
+					  sum(aircraftSendingClusteredTime),
+					  averageSendingClusteredTime,
+					  maxSendingClusteredTime,
+					  minSendingClusteredTime,
+					  sum(aircraftReceivingClusteredTime),
+					  averageReceivingClusteredTime,
+					  maxReceivingClusteredTime,
+					  minReceivingClusteredTime,
+					  sum(aircraftQOfClusteredMSGSent),
+					  averageQOfClusteredMSGSent,
+					  maxQOfClusteredMSGSent,
+					  minQOfClusteredMSGSent,
+					  sum(aircraftQOfClusteredMSGReceived),
+					  averageQOfClusteredMSGReceived,
+					  maxQOfClusteredMSGReceived,
+					  minQOfClusteredMSGReceived]
+	summaryResults=map(str, summaryResults)
+	return summaryResults, flightsClusteredFlights
+
+def countAcceptedClusters(nm, myLogFile, rankMsg, qOfSteps=1):
+
+	"""
+	Calculating accepted clusters by flights
+	qOfSteps: timesteps stood for by the current image, see lib/engine.getActiveTimes
+	"""
+	clusters = nm['clusters']
+	if nm['setClusters']:
+		if DEBUG_LOG:
+			if clusters == nm['nmClusters']: logger(myLogFile,rankMsg,LOG_DBG,'All flights accepted its assigned NM clusters')
+			else:
+				clustersLine=''
+				for flight in sorted(clusters): clustersLine+=str(flight)+':'+str(clusters[flight])+' '
+				logger(myLogFile,rankMsg,LOG_DBG,'Accepted clusters: '+clustersLine)
+		nm['qOfClusters']+=_countNewClusters(nm, clusters)*qOfSteps
+
+def initNetworkManager(liveFlights):
+
+	"""
+	Network Manager variables
+	"""
+	nm = {}
+	nm['vehiclesPosition'] = {}
+	nm['liveFlights'] = liveFlights
+	nm['nmQOfClusters'] = 0
+	nm['qOfClusters'] = 0
+	nm['clusters'] = {}
+	for flight in liveFlights: nm['clusters'][flight] = []
+	nm['clusterSets'] = initClusterSets(liveFlights)
+	nm['neighbourSets'] = initNeighbourSets()
+	nm['cruiseFlights'] = []
+	nm['qOfCruiseFlights'] = 0
+	nm['clusteredFlights'] = []
+	nm['setClusters'] = False
+	nm['previousNMClusters'] = {}
+	nm['nmClusters'] = {}
+	nm['nmGroups'] = []
+	nm['aircraftNetwork'] = None
+	nm['GRC_sum'] = 0.0
+	nm['GRC_updates'] = 0
+	nm['maxGRC'] = 0.0
+	nm['minGRC'] = 0.0
+	return nm
+
+def removeUnclusteredFlights(nm, unClusteredFlights):
+
+	"""
+	Updating clusters and aircraft network with aircraft responses
+	"""
+	if len(unClusteredFlights) == 0: return
+	for flight in unClusteredFlights: _leaveCluster(nm, flight)
+	unClusteredFlights = set(unClusteredFlights)
+	nm['clusteredFlights'] = [flight for flight in nm['clusteredFlights'] if flight not in unClusteredFlights]
+
+def storeStepResults(nm, resultsFile, currTime):
+
+	"""
+	Calculating GRC and storing results
+	"""
+	if nm['qOfCruiseFlights'] > 1:
+		nm['aircraftNetwork']=addEdges(nm['aircraftNetwork'],nm['clusters'])
+		GRC = calculateGRC(calculateLRC(nm['aircraftNetwork']))
+		if GRC > nm['maxGRC']: nm['maxGRC'] = GRC
+		if GRC < nm['minGRC']: nm['minGRC'] = GRC
+		nm['GRC_sum'] += GRC
+		nm['GRC_updates']+=1
+		writeResultsFile(resultsFile, currTime, nm['qOfCruiseFlights'], nm['nmQOfClusters'], nm['qOfClusters'], GRC, False)
+
+def updateAircraftNetworkImage(nm, statuses, myLogFile, rankMsg):
+
+	"""
+	Updating centralized image of the aircraft network
+	statuses: {flight: status}, only CRUISE and DESCENT statuses change the image
+	"""
+	if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Updating centralized image of the aircraft network')
+	cruiseFlights = nm['cruiseFlights']
+	clusteredFlights = nm['clusteredFlights']
+	for flight in statuses:
+		if statuses[flight] == 'CRUISE':
+			if flight not in cruiseFlights: cruiseFlights.append(flight)
+		elif statuses[flight] == 'DESCENT':
+			if flight in cruiseFlights: del(cruiseFlights[cruiseFlights.index(flight)])
+			if flight in clusteredFlights:
+				del(clusteredFlights[clusteredFlights.index(flight)])
+				_leaveCluster(nm, flight)
+	nm['qOfCruiseFlights'] = len(cruiseFlights)
+	if nm['qOfCruiseFlights'] > 0: nm['aircraftNetwork'] = setNetwork(cruiseFlights, nm['aircraftNetwork'])
+	if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Number of cruise flights are '+str(nm['qOfCruiseFlights']))
+	if DEBUG_LOG: logger(myLogFile,rankMsg,LOG_DBG,'Cruise flights are '+str(cruiseFlights))
+
+###############################################################################################################################
+###############################################################################################################################
+
+def _countNewClusters(nm, clusters):
+
+	"""
+	Returns quantity of new clusters, clusters of at least two flights unclustered in the previous NM clusters
+	A flight joining an existing cluster does not make a new cluster
+	"""
+	newFlights = {}
+	for flight in clusters:
+		if len(nm['previousNMClusters'][flight]) == 0 and len(clusters[flight]) > 0:
+			cluster = clusters[flight][0] ## Clusters are in ascending order
+			newFlights[cluster] = newFlights.get(cluster, 0)+1
+	return len([cluster for cluster in newFlights if newFlights[cluster] >= 2])
+
+def _emitClustersEvents(nm, currTime, eventsFile):
+
+	"""
+	Emitting NM clusters, and the clusters formed and dissolved since the previous NM clusters
+	"""
+	groups = []
+	for flight in sorted(nm['nmClusters']):
+		group = sorted(nm['nmClusters'][flight])
+		if len(group) > 0 and group not in groups: groups.append(group)
+	for group in groups:
+		if group not in nm['nmGroups']: emitEvent(eventsFile,'clusterFormed',currTime,0,{'flights': group})
+	for group in nm['nmGroups']:
+		if group not in groups: emitEvent(eventsFile,'clusterDissolved',currTime,0,{'flights': group})
+	emitEvent(eventsFile,'clusters',currTime,0,{'clusters': groups})
+	nm['nmGroups'] = groups
+
+def _leaveCluster(nm, flight):
+
+	"""
+	Removing a flight from its NM cluster, the clusters of its cluster mates are updated
+	"""
+	clusters = nm['clusters']
+	clusters[flight] = []
+	for otherFlight in leaveCluster(nm['clusterSets'], flight): clusters[otherFlight] = getCluster(nm['clusterSets'], otherFlight)
+
+###############################################################################################################################
+###############################################################################################################################
@@ -15,21 +15,26 @@
 ### imports ##########################
 
 import os
+import numpy as np
 from datetime import datetime
 from calendar import timegm
-from time import gmtime, strptime
+from time import gmtime
 from timeit import default_timer
 
 ######################################
 
 ### Imports from software modules
-from cofl.etc.info import YEAR_PREFIX, TIME_ZONE
+from cofl.etc.info import YEAR_PREFIX
 from cofl.etc.eSO6DataFields import SEGMENT_DATE_INIT, SEGMENT_DATE_END, SEGMENT_TIME_INIT, SEGMENT_TIME_END
 ######################################
 
 ###############################################################################################################################
 ###############################################################################################################################
 
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+_datesSeconds = {} ## Memo of calculateSecFromEpoch, {YYMMDD: seconds from EPOCH at midnight}
+
 def calculateInitAndEndTime(trajectoriesFolder, size, flightsQ):
 
 	"""
@@ -39,44 +44,57 @@ def calculateInitAndEndTime(trajectoriesFolder, size, flightsQ):
 	endTimes=[]
 	for rank in range(1,size):
 		trajFile=trajectoriesFolder+'/'+str(rank).zfill(len(str(flightsQ)))+'.eSo6'
-		firstLine=os.popen('head -1 '+trajFile).read().split()
-		endLine=os.popen('tail -1 '+trajFile).read().split()
-		## Init time seconds from EPOCH
-		initTimes.append(calculateSecFromEpoch(firstLine[SEGMENT_DATE_INIT],firstLine[SEGMENT_TIME_INIT]))
-		## End time seconds from EPOCH
-		endTimes.append(calculateSecFromEpoch(endLine[SEGMENT_DATE_END],endLine[SEGMENT_TIME_END]))
+		trajInitTime, trajEndTime = calculateTrajectoryTimes(trajFile)
+		initTimes.append(trajInitTime)
+		endTimes.append(trajEndTime)
 
 	initTime=min(initTimes)
 	endTime=max(endTimes)
 	return initTime, endTime
 
+def calculateTrajectoryTimes(trajFile):
+
+	"""
+	Calculate init and end time [s] of an eSO6 trajectory file from its first and last lines
+	"""
+	firstLine, endLine = _readFirstAndLastLines(trajFile)
+	## Init time seconds from EPOCH
+	initTime=calculateSecFromEpoch(firstLine[SEGMENT_DATE_INIT],firstLine[SEGMENT_TIME_INIT])
+	## End time seconds from EPOCH
+	endTime=calculateSecFromEpoch(endLine[SEGMENT_DATE_END],endLine[SEGMENT_TIME_END])
+	return initTime, endTime
+
 def calculateSecFromEpoch(date,hour):
 
 	"""
 	Calculates seconds from EPOCH
+	date: YYMMDD, hour: HHMMSS (UTC), seconds of every date at midnight are memoized
 	"""
+	if date not in _datesSeconds: _datesSeconds[date] = _calculateDateSeconds(date)
+	if len(hour) != 6 or not hour.isdigit(): raise ValueError('Wrong eSO6 hour '+hour)
+	clock = int(hour)
+	hours, minutes, seconds = clock // 10000, clock // 100 % 100, clock % 100
+	if hours > 23 or minutes > 59 or seconds > 61: raise ValueError('Wrong eSO6 hour '+hour)
+	return _datesSeconds[date] + 3600*hours + 60*minutes + seconds
 
-	months={
-		'01':'Jan',
-		'02':'Feb',
-		'03':'Mar',
-		'04':'Apr',
-		'05':'May',
-		'06':'Jun',
-		'07':'Jul',
-		'08':'Aug',
-		'09':'Sep',
-		'10':'Oct',
-		'11':'Nov',
-		'12':'Dec'
-	}
-	year=YEAR_PREFIX+date[0:2]
-	month=months[date[2:4]]
-	day=date[4:6]
-	hourF=hour[0:2]+':'+hour[2:4]+':'+hour[4:6]
-	dateFormatted=month+' '+day+','+' '+year+' @ '+hourF+' '+TIME_ZONE
-	secs=timegm(strptime(dateFormatted, '%b %d, %Y @ %H:%M:%S '+TIME_ZONE))
-	return secs
+def calculateSecsFromEpoch(dates,hours):
+
+	"""
+	Calculates seconds from EPOCH of arrays of dates (YYMMDD) and hours (HHMMSS), e.g. trajectory columns
+	Returns np.int64 array
+	"""
+	dates = np.asarray(dates)
+	hours = np.asarray(hours)
+	if len(hours) == 0: return np.zeros(0, dtype=np.int64)
+	uniqueDates, datesIndex = np.unique(dates, return_inverse=True)
+	for date in uniqueDates.tolist():
+		if date not in _datesSeconds: _datesSeconds[date] = _calculateDateSeconds(date)
+	datesSeconds = np.array([_datesSeconds[date] for date in uniqueDates.tolist()], dtype=np.int64)
+	if not np.all((np.char.str_len(hours) == 6) & np.char.isdigit(hours)): raise ValueError('Wrong eSO6 hours')
+	clock = hours.astype(np.int64)
+	hours, minutes, seconds = clock // 10000, clock // 100 % 100, clock % 100
+	if np.any(hours > 23) or np.any(minutes > 59) or np.any(seconds > 61): raise ValueError('Wrong eSO6 hours')
+	return datesSeconds[datesIndex] + 3600*hours + 60*minutes + seconds
 
 def getComputingTime():
 
@@ -97,22 +115,8 @@ def getFormattedDate(date,hour):
 	"""
 	Get formatted date
 	"""
-	months={
-		'01':'Jan',
-		'02':'Feb',
-		'03':'Mar',
-		'04':'Apr',
-		'05':'May',
-		'06':'Jun',
-		'07':'Jul',
-		'08':'Aug',
-		'09':'Sep',
-		'10':'Oct',
-		'11':'Nov',
-		'12':'Dec'
-	}
 	year=YEAR_PREFIX+date[0:2]
-	month=months[date[2:4]]
+	month=MONTHS[int(date[2:4])-1]
 	day=date[4:6]
 	hourF=hour[0:2]+':'+hour[2:4]+':'+hour[4:6]
 	dateFormatted=month+' '+day+','+' '+year+' @ '+hourF
@@ -138,3 +142,35 @@ def returnSecondsFromEpoch():
 
 ###############################################################################################################################
 ###############################################################################################################################
+
+def _calculateDateSeconds(date):
+
+	"""
+	Seconds from EPOCH of a YYMMDD date at midnight, raises ValueError for wrong dates
+	"""
+	if len(date) != 6 or not date.isdigit(): raise ValueError('Wrong eSO6 date '+date)
+	return timegm(datetime(int(YEAR_PREFIX+date[0:2]), int(date[2:4]), int(date[4:6])).timetuple())
+
+def _readFirstAndLastLines(trajFile):
+
+	"""
+	Returns first and last lines of a file split in fields, the last line is read backwards from the end of the file
+	"""
+	tFile=open(trajFile,'rb')
+	try:
+		firstLine=tFile.readline()
+		tFile.seek(0,os.SEEK_END)
+		position=tFile.tell()
+		tail=b''
+		while position > 0:
+			step=min(4096,position)
+			position-=step
+			tFile.seek(position)
+			tail=tFile.read(step)+tail
+			if tail.rstrip(b'\r\n').count(b'\n') > 0: break
+		endLine=tail.rstrip(b'\r\n').split(b'\n')[-1]
+	finally: tFile.close()
+	return str(firstLine.decode('ascii')).split(), str(endLine.decode('ascii')).split()
+
+###############################################################################################################################
+###############################################################################################################################
@@ -15,8 +15,10 @@
 ### imports ##########################
 
 import os
-import sys
+import numpy as np
 from multiprocessing import Process
+try: import cPickle as pickle
+except ImportError: import pickle
 
 ######################################
 
@@ -108,9 +110,12 @@ def checkLatency(nodes,rankMsg,myLogFile):
 def getBytes(data):
 
 	"""
-	Returns size of data [bytes]
+	Returns size of data in an MPI message [bytes]
+	Buffer size of NumPy arrays, pickled size of other data
+	Pickled messages count the size of their payload instead, see lib/mpif
 	"""
-	return sys.getsizeof(data)
+	if isinstance(data, np.ndarray): return data.nbytes
+	return len(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
 
 def killProcess(user,server,command):
 
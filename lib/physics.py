@@ -14,13 +14,14 @@
 
 ### imports ##########################
 
+import numpy as np
 from geographiclib.geodesic import Geodesic
 from math import ceil
 
 ######################################
 
 ### Imports from software modules
-from cofl.etc.configuration import TRACKS_DIFFERENCE, M_TO_NM, NM_TO_M
+from cofl.etc.configuration import TRACKS_DIFFERENCE, M_TO_NM, NM_TO_M, GEODESIC_MODE, WGS84_A, WGS84_F, EARTH_MEAN_RADIUS, FAST_DISTANCE_MAX_ANGLE
 ######################################
 
 ###############################################################################################################################
@@ -33,6 +34,33 @@ def calculateDistanceBetweenPoints(lat1,lon1,lat2,lon2):
 	"""
 	return Geodesic.WGS84.Inverse(lat1,lon1, lat2, lon2)['s12']
 
+def calculateDistancesBetweenPoints(lat1,lon1,lat2,lon2,mode=GEODESIC_MODE):
+
+	"""
+	Calculate distances [meters] between arrays of points [degrees]
+	mode exact: WGS84 geodesic, mode fast: Lambert ellipsoidal approximation
+	Lambert's formula is singular at antipodal points, fast distances of points farther apart than
+	FAST_DISTANCE_MAX_ANGLE are exact
+	"""
+	lat1, lon1, lat2, lon2 = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (lat1,lon1,lat2,lon2)])
+	if mode == 'exact':
+		distances = np.empty(lat1.shape)
+		for i in np.ndindex(lat1.shape): distances[i] = Geodesic.WGS84.Inverse(lat1[i],lon1[i],lat2[i],lon2[i])['s12']
+		return distances
+	beta1 = np.arctan((1-WGS84_F)*np.tan(np.radians(lat1))) ## Reduced latitudes
+	beta2 = np.arctan((1-WGS84_F)*np.tan(np.radians(lat2)))
+	sigma = _centralAngle(beta1,np.radians(lon1),beta2,np.radians(lon2))
+	P = (beta1+beta2)/2
+	Q = (beta2-beta1)/2
+	with np.errstate(divide='ignore', invalid='ignore'):
+		X = (sigma-np.sin(sigma))*np.sin(P)**2*np.cos(Q)**2/np.cos(sigma/2)**2
+		Y = (sigma+np.sin(sigma))*np.cos(P)**2*np.sin(Q)**2/np.sin(sigma/2)**2
+		distances = WGS84_A*(sigma-WGS84_F/2*(X+Y))
+	distances = np.where(sigma > 0, distances, 0.0)
+	antipodal = sigma > np.radians(FAST_DISTANCE_MAX_ANGLE)
+	if np.any(antipodal): distances[antipodal] = calculateDistancesBetweenPoints(lat1[antipodal],lon1[antipodal],lat2[antipodal],lon2[antipodal],'exact')
+	return distances
+
 def calculateFFBox(qOfFlights):
 
 	"""
@@ -49,12 +77,29 @@ def calculateTrackBetweenFlights(lat1,lon1,lat2,lon2):
 	"""
 	return Geodesic.WGS84.Inverse(lat1,lon1, lat2, lon2)['azi1']
 
+def calculateTracksBetweenPoints(lat1,lon1,lat2,lon2,mode=GEODESIC_MODE):
+
+	"""
+	Calculate initial tracks [degrees] between arrays of points [degrees]
+	mode exact: WGS84 geodesic, mode fast: spherical approximation
+	"""
+	lat1, lon1, lat2, lon2 = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (lat1,lon1,lat2,lon2)])
+	if mode == 'exact':
+		tracks = np.empty(lat1.shape)
+		for i in np.ndindex(lat1.shape): tracks[i] = Geodesic.WGS84.Inverse(lat1[i],lon1[i],lat2[i],lon2[i])['azi1']
+		return tracks
+	phi1, phi2 = np.radians(lat1), np.radians(lat2)
+	dLambda = np.radians(lon2-lon1)
+	return np.degrees(np.arctan2(np.sin(dLambda)*np.cos(phi2), np.cos(phi1)*np.sin(phi2)-np.sin(phi1)*np.cos(phi2)*np.cos(dLambda)))
+
 def checkTracks(track1,track2):
 
 	"""
 	Checking if tracks match
+	Tracks wrap around 0/360 degrees
 	"""
-	matched=True if abs(track1-track2) <= TRACKS_DIFFERENCE else False
+	difference=abs(track1-track2) % 360.0
+	matched=True if min(difference, 360.0-difference) <= TRACKS_DIFFERENCE else False
 	return matched
 
 def convertMtoNM(meters):
@@ -85,6 +130,33 @@ def getPoint(lat,lon,deg,dist):
 	point['LON'] = Geodesic.WGS84.Direct(lat,lon,deg,dist)['lon2']
 	return point
 
+def getPoints(lat,lon,deg,dist,mode=GEODESIC_MODE):
+
+	"""
+	Returns the latitudes and longitudes of points at distances dist [m] with degrees deg from arrays of lat,lon
+	mode exact: WGS84 geodesic, mode fast: spherical approximation
+	"""
+	lat, lon, deg, dist = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (lat,lon,deg,dist)])
+	if mode == 'exact':
+		lats = np.empty(lat.shape); lons = np.empty(lat.shape)
+		for i in np.ndindex(lat.shape):
+			direct = Geodesic.WGS84.Direct(lat[i],lon[i],deg[i],dist[i])
+			lats[i] = direct['lat2']; lons[i] = direct['lon2']
+		return lats, lons
+	phi1, theta = np.radians(lat), np.radians(deg)
+	delta = dist/EARTH_MEAN_RADIUS
+	phi2 = np.arcsin(np.sin(phi1)*np.cos(delta)+np.cos(phi1)*np.sin(delta)*np.cos(theta))
+	lambda2 = np.radians(lon)+np.arctan2(np.sin(theta)*np.sin(delta)*np.cos(phi1), np.cos(delta)-np.sin(phi1)*np.sin(phi2))
+	return np.degrees(phi2), (np.degrees(lambda2)+540.0) % 360.0 - 180.0
+
+def _centralAngle(phi1,lambda1,phi2,lambda2):
+
+	"""
+	Central angle [radians] between arrays of points [radians] -- Haversine
+	"""
+	h = np.sin((phi2-phi1)/2)**2+np.cos(phi1)*np.cos(phi2)*np.sin((lambda2-lambda1)/2)**2
+	return 2*np.arcsin(np.sqrt(np.clip(h,0.0,1.0)))
+
 def roundUP(x):
 
 	"""
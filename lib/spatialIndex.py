@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+from math import cos, floor, radians
+
+######################################
+
+### Imports from software modules
+from cofl.etc.configuration import M_PER_DEG_LAT, M_PER_DEG_LON, SPATIAL_INDEX_MARGIN, MAX_INDEX_LATITUDE, TRACKS_DIFFERENCE, TRACK_SECTORS
+from cofl.etc.eSO6DataFields import SEGMENT_LAT_INIT, SEGMENT_LON_INIT, SEGMENT_TRACK
+from cofl.lib.physics import convertMinuteDecimalToDregrees
+######################################
+
+###############################################################################################################################
+###############################################################################################################################
+
+def buildGridIndex(vehiclesPosition, flights, radius):
+
+	"""
+	Building a lat/lon/track sector grid index of flights at a specific timestep
+	Cells are at least radius [m] wide and track sectors at least TRACKS_DIFFERENCE wide, so flights
+	within radius whose tracks match are always in the same or in a neighbouring cell
+	When cells of the highest latitude reach MAX_INDEX_LATITUDE there is a single longitude cell, near the poles
+	flights within radius can be any longitude apart
+	"""
+	index={'flights':flights, 'coordinates':{}, 'tracks':{}, 'sectorOf':{}, 'cells':{}, 'cellOf':{}, 'order':{}}
+	qOfSectors=max(1,int(360.0/TRACKS_DIFFERENCE)) if TRACK_SECTORS and TRACKS_DIFFERENCE > 0 else 1
+	index['qOfSectors']=qOfSectors
+	maxLat=0.0
+	for flight in flights:
+		lat, lon = convertMinuteDecimalToDregrees([vehiclesPosition[flight][SEGMENT_LAT_INIT], vehiclesPosition[flight][SEGMENT_LON_INIT]])
+		index['coordinates'][flight]=(lat,lon)
+		index['tracks'][flight]=float(vehiclesPosition[flight][SEGMENT_TRACK])
+		index['sectorOf'][flight]=int(floor((index['tracks'][flight] % 360.0)*qOfSectors/360.0)) % qOfSectors
+		index['order'][flight]=len(index['order'])
+		if abs(lat) > maxLat: maxLat=abs(lat)
+
+	if radius <= 0: index['cells']=None; return index ## Degenerated grid, every flight is a candidate
+
+	latCell=radius*SPATIAL_INDEX_MARGIN/M_PER_DEG_LAT
+	if maxLat+latCell >= MAX_INDEX_LATITUDE: qOfLonCells=1 ## Polar flights
+	else:
+		lonCellMin=radius*SPATIAL_INDEX_MARGIN/(M_PER_DEG_LON*cos(radians(maxLat+latCell)))
+		qOfLonCells=max(1,int(360.0/lonCellMin))
+	lonCell=360.0/qOfLonCells
+	index['latCell']=latCell
+	index['lonCell']=lonCell
+	index['qOfLonCells']=qOfLonCells
+	for flight in flights:
+		lat, lon = index['coordinates'][flight]
+		cell=(int(floor(lat/latCell)), int(floor((lon+180.0)/lonCell)) % qOfLonCells, index['sectorOf'][flight])
+		index['cellOf'][flight]=cell
+		index['cells'].setdefault(cell,[]).append(flight)
+	return index
+
+def getNeighbourCandidates(index, flight):
+
+	"""
+	Returns flights in the cell of flight and in its neighbouring cells
+	Candidates keep the order in which flights were indexed
+	Longitude cells wrap around the antimeridian, track sectors wrap around 0/360 degrees
+	"""
+	qOfSectors = index['qOfSectors']
+	sectors = set((index['sectorOf'][flight]+dSector) % qOfSectors for dSector in (-1,0,1))
+	if index['cells'] is None: return [otherFlight for otherFlight in index['flights'] if otherFlight!=flight and index['sectorOf'][otherFlight] in sectors]
+	latIdx, lonIdx, sector = index['cellOf'][flight]
+	qOfLonCells = index['qOfLonCells']
+	neighbourCells=set()
+	for dLat in (-1,0,1):
+		for dLon in (-1,0,1):
+			for sector in sectors: neighbourCells.add((latIdx+dLat, (lonIdx+dLon) % qOfLonCells, sector))
+	candidates=[]
+	for cell in neighbourCells:
+		for otherFlight in index['cells'].get(cell,[]):
+			if otherFlight!=flight: candidates.append(otherFlight)
+	candidates.sort(key=index['order'].get)
+	return candidates
+
+###############################################################################################################################
+###############################################################################################################################
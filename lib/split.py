@@ -14,42 +14,48 @@
 
 ### imports ##########################
 
-import os
-import sys
-
 ######################################
 
 ### Imports from software modules
+from cofl.etc.configuration import SPLIT_BUFFER
 from cofl.etc.eSO6DataFields import ARRIVAL, DEPARTURE, FLIGHT_ID
+from cofl.lib.eSO6Index import copyIndexedFlights, readESO6Index, selectIndexedFlights
+from cofl.lib.trajectoryStore import writeTrajectoryStore
 ######################################
 
 ###############################################################################################################################
 ###############################################################################################################################
 
+def indexedSplitESO6File(rankMsg, eso6File, qOfFlights, trajectoriesFolder, airport='NA', departure=True):
+
+	"""
+	Split eS06 Trajectories file through its sidecar flight index (lib/eSO6Index)
+	Only the first qOfFlights flights departing from (arriving to) airport, all flights if NA, are read
+	The columnar trajectory store is written when all flights were found
+	Returns quantity of rank flight files written
+	"""
+	try:
+		flights = selectIndexedFlights(readESO6Index(eso6File), qOfFlights, airport, departure)
+		for rank in range(1,len(flights)+1): print(rankMsg+' Creating rank flight file: '+str(rank).zfill(len(str(qOfFlights)))+'.eSo6')
+		copyIndexedFlights(eso6File, flights, qOfFlights, trajectoriesFolder)
+		if len(flights) == int(qOfFlights): writeTrajectoryStore(trajectoriesFolder, qOfFlights)
+	except Exception, e: raise
+	return len(flights)
+
 def splitESO6File(rankMsg, eso6File, qOfFlights, trajectoriesFolder):
 
 	"""
 	Split eS06 Trajectories file
+	The first qOfFlights flights are written in one streaming pass
+	The columnar trajectory store is written when all flights were found
 	198988435
 	"""
 	start=True
 	try:
-		rank = 1
-		files=1
-		currFlightID = os.popen('head -1 '+eso6File).read().split()[FLIGHT_ID]
-		rankTrajectoryFile=trajectoriesFolder+'/'+str(rank).zfill(len(str(qOfFlights)))+'.eSo6'
-		print(rankMsg+' Creating rank flight file: '+rankTrajectoryFile.split('/')[-1])
-		for line in open(eso6File):
-			if line.split()[FLIGHT_ID] != currFlightID:
-				rank+=1
-				rankTrajectoryFile=trajectoriesFolder+'/'+str(rank).zfill(len(str(qOfFlights)))+'.eSo6'
-				print(rankMsg+' Creating rank fight file: '+rankTrajectoryFile.split('/')[-1])
-				currFlightID=line.split()[FLIGHT_ID]
-				files+=1
-			rankFile=open(rankTrajectoryFile,'a')
-			rankFile.write(line[0:-1]+'\n')
-			rankFile.close()
-			if str(files) == qOfFlights: break
+		source=open(eso6File,'r',SPLIT_BUFFER)
+		try: rank = _splitFlights(rankMsg, source, int(qOfFlights), trajectoriesFolder)
+		finally: source.close()
+		if rank == int(qOfFlights): writeTrajectoryStore(trajectoriesFolder, qOfFlights)
 	except Exception, e: raise
 	return start, rank
 
@@ -57,33 +63,47 @@ def selectiveSplitESO6File(rankMsg, airport, departure, eso6File, qOfFlights, tr
 
 	"""
 	Split eS06 Trajectories file
+	The first qOfFlights flights departing from (arriving to) airport are written in one streaming pass
+	The columnar trajectory store is written when all flights were found
 	"""
 	try:
-		rank = 1
-		nF=True
 		airportType=DEPARTURE if departure  else ARRIVAL
 		qOfFlights = int(qOfFlights)
+		source=open(eso6File,'r',SPLIT_BUFFER)
+		try: rank = _splitFlights(rankMsg, (line for line in source if airport in line.split(None,airportType+1)[airportType]), qOfFlights, trajectoriesFolder)
+		finally: source.close()
+		if rank == qOfFlights: writeTrajectoryStore(trajectoriesFolder, qOfFlights)
 
-		flightsLines =[]
-		for line in open(eso6File):
-			if airport in line.split()[airportType]: flightsLines.append(line)
+	except Exception, e: raise
 
-		currFlightID=flightsLines[0].split()[FLIGHT_ID]
-		rankTrajectoryFile=trajectoriesFolder+'/'+str(rank).zfill(len(str(qOfFlights)))+'.eSo6'
-		print(rankMsg+' Creating rank flight file: '+rankTrajectoryFile.split('/')[-1])
+###############################################################################################################################
+###############################################################################################################################
 
-		for line in flightsLines:
-			if line.split()[FLIGHT_ID] != currFlightID:
-				currFlightID = line.split()[FLIGHT_ID]
+def _splitFlights(rankMsg, lines, qOfFlights, trajectoriesFolder):
+
+	"""
+	Writing every flight of lines in its rank flight file through a buffered writer
+	A flight is a run of lines with the same flight ID, streaming stops at flight qOfFlights+1
+	Returns quantity of rank flight files written
+	"""
+	rank = 0
+	currFlightID = None
+	rankFile = None
+	try:
+		for line in lines:
+			flightID = line.split(None,FLIGHT_ID+1)[FLIGHT_ID]
+			if flightID != currFlightID:
+				if rankFile is not None: rankFile.close(); rankFile = None
+				if rank == qOfFlights: break
 				rank+=1
-				if rank == qOfFlights+1: break
+				currFlightID = flightID
 				rankTrajectoryFile=trajectoriesFolder+'/'+str(rank).zfill(len(str(qOfFlights)))+'.eSo6'
 				print(rankMsg+' Creating rank flight file: '+rankTrajectoryFile.split('/')[-1])
-			rankFile=open(rankTrajectoryFile,'a')
-			rankFile.write(line[0:-1]+'\n')
-			rankFile.close()
-
-	except Exception, e: raise
+				rankFile=open(rankTrajectoryFile,'w',SPLIT_BUFFER)
+			rankFile.write(line.rstrip('\n')+'\n')
+	finally:
+		if rankFile is not None: rankFile.close()
+	return rank
 
 ###############################################################################################################################
 ###############################################################################################################################
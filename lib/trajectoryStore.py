@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ © Copyright, UbiHPC
+ All rights reserved
+ Developped by Leonardo Camargo Forero, UbiHPC CEO
+ email: lecf.77@gmail.com
+ 2019
+ High Performance Robotic Computing Cooperative Flying (COFL) simulator
+ This simulator is based on The ARCHADE SimPlat
+ For more information write us in https://ubihpc.com/contact-us
+"""
+
+### imports ##########################
+
+import os
+import numpy as np
+from shutil import copyfile
+
+######################################
+
+### Imports from software modules
+from cofl.etc.info import TRAJ_STORE_FOLDER
+from cofl.etc.eSO6DataFields import *
+from cofl.lib.pctime import calculateSecFromEpoch
+######################################
+
+###############################################################################################################################
+###############################################################################################################################
+
+"""
+Columnar trajectory store
+A trajectory is kept as {eSO6 field: array of all its segments}, numeric fields are typed (STORE_DTYPES)
+and parsed once, the other fields keep their text. The store of a test case holds the columns of all
+flights one after the other in .npy files, flight k owns segments [offsets[k-1], offsets[k]), and is
+memory-mapped by the simulators. Without a store, trajectories are parsed from their eSO6 files
+"""
+
+STORE_DTYPES = {SEGMENT_LEVEL_INIT: np.int32, SEGMENT_LEVEL_END: np.int32, STATUS: np.int8,
+				SEGMENT_LAT_INIT: np.float64, SEGMENT_LON_INIT: np.float64, SEGMENT_LAT_END: np.float64, SEGMENT_LON_END: np.float64,
+				SEGMENT_LENGTH: np.float64, SEGMENT_GROUND_SPEED: np.float64, SEGMENT_TRACK: np.float64, SEGMENT_ROC: np.float64,
+				SEGMENT_FUEL: np.float64, SEGMENT_CI: np.float64, SEGMENT_ROUTE_CHARGES: np.float64}
+
+def getLevelledSegments(trajectory):
+
+	"""
+	Returns True for every segment flown at constant flight level with status 2
+	"""
+	return (trajectory[SEGMENT_LEVEL_INIT] == trajectory[SEGMENT_LEVEL_END]) & (trajectory[STATUS] == 2)
+
+def getSegment(trajectory, line):
+
+	"""
+	Returns a segment of a trajectory indexed by eSO6 fields, NaN in fields without a numeric type
+	"""
+	segment = np.full(QOF_ESO6_FIELDS, np.nan)
+	for field in STORE_DTYPES: segment[field] = trajectory[field][line]
+	return segment
+
+def readTrajectory(trajectoriesFolder, flightsQ, flight, store=None):
+
+	"""
+	Reading the trajectory of a flight from the store or from its eSO6 file
+	Returns trajectory {field: array}, initTime [s], endTime [s]
+	"""
+	if store is None: store = readTrajectoryStore(trajectoriesFolder)
+	if store is None: return _parseTrajectoryFile(trajectoriesFolder+'/'+str(flight).zfill(len(str(flightsQ)))+'.eSo6')
+	begin, end = store['offsets'][flight-1], store['offsets'][flight]
+	trajectory = dict((field, np.array(store['columns'][field][begin:end])) for field in range(QOF_ESO6_FIELDS))
+	return trajectory, int(store['initTime'][flight-1]), int(store['endTime'][flight-1])
+
+def readTrajectoryStore(trajectoriesFolder):
+
+	"""
+	Memory-mapping the store of a trajectories folder
+	Returns {'offsets', 'initTime', 'endTime', 'columns': {field: array}}, None without store
+	"""
+	storeFolder = trajectoriesFolder+'/'+TRAJ_STORE_FOLDER
+	if not os.path.isfile(storeFolder+'/offsets.npy'): return None
+	store = {}
+	for key in ['offsets', 'initTime', 'endTime']: store[key] = np.load(storeFolder+'/'+key+'.npy')
+	store['columns'] = dict((field, np.load(storeFolder+'/'+str(field)+'.npy', mmap_mode='r')) for field in range(QOF_ESO6_FIELDS))
+	return store
+
+def setSegmentValue(trajectory, changes, line, field, value):
+
+	"""
+	Changing a field of a trajectory segment
+	value: eSO6 text, or (line, field) of the trajectory to copy the value from
+	changes: {(line, field): value} applied by writeHPCTrajectory
+	"""
+	changes[(line, field)] = value
+	if isinstance(value, tuple): trajectory[field][line] = trajectory[value[1]][value[0]]
+	else: trajectory[field][line] = trajectory[field].dtype.type(value)
+
+def writeHPCTrajectory(trajectoryFile, hpcTrajectoryFile, changes):
+
+	"""
+	Writing HPC trajectory file
+	The eSO6 file is copied when changes leave it unmodified
+	Returns True if the trajectory was modified
+	"""
+	if len(changes) == 0: copyfile(trajectoryFile, hpcTrajectoryFile); return False
+	original = [line.split() for line in open(trajectoryFile)]
+	trajectory = [segment[:] for segment in original]
+	for (line, field) in changes:
+		value = changes[(line, field)]
+		trajectory[line][field] = original[value[0]][value[1]] if isinstance(value, tuple) else value
+	if trajectory == original: copyfile(trajectoryFile, hpcTrajectoryFile); return False
+	newTrajFile=open(hpcTrajectoryFile,'w')
+	for segment in trajectory:
+		line=''
+		for data in segment: line+=data+' '
+		newTrajFile.write(line+'\n')
+	newTrajFile.close()
+	return True
+
+def writeTrajectoryStore(trajectoriesFolder, flightsQ):
+
+	"""
+	Writing the store of the eSO6 files 1..flightsQ of a trajectories folder
+	"""
+	storeFolder = trajectoriesFolder+'/'+TRAJ_STORE_FOLDER
+	if not os.path.isdir(storeFolder): os.makedirs(storeFolder)
+	offsets = [0]; initTimes = []; endTimes = []
+	columns = dict((field, []) for field in range(QOF_ESO6_FIELDS))
+	for flight in range(1,int(flightsQ)+1):
+		trajectory, initTime, endTime = _parseTrajectoryFile(trajectoriesFolder+'/'+str(flight).zfill(len(str(flightsQ)))+'.eSo6')
+		for field in columns: columns[field].append(trajectory[field])
+		offsets.append(offsets[-1]+len(trajectory[SEGMENT_FUEL]))
+		initTimes.append(initTime); endTimes.append(endTime)
+	np.save(storeFolder+'/offsets.npy', np.array(offsets, dtype=np.int64))
+	np.save(storeFolder+'/initTime.npy', np.array(initTimes, dtype=np.int64))
+	np.save(storeFolder+'/endTime.npy', np.array(endTimes, dtype=np.int64))
+	for field in columns: np.save(storeFolder+'/'+str(field)+'.npy', np.concatenate(columns[field]))
+
+###############################################################################################################################
+###############################################################################################################################
+
+def _parseTrajectoryFile(trajectoryFile):
+
+	"""
+	Parsing an eSO6 file in columns
+	Returns trajectory {field: array}, initTime [s], endTime [s]
+	"""
+	segments = [line.split() for line in open(trajectoryFile)]
+	trajectory = {}
+	for field in range(QOF_ESO6_FIELDS):
+		values = [segment[field] for segment in segments]
+		if field in STORE_DTYPES:
+			cast = int if np.issubdtype(STORE_DTYPES[field], np.integer) else float
+			trajectory[field] = np.array([cast(value) for value in values], dtype=STORE_DTYPES[field])
+		else: trajectory[field] = np.array(values)
+	initTime = calculateSecFromEpoch(segments[0][SEGMENT_DATE_INIT],segments[0][SEGMENT_TIME_INIT])
+	endTime = calculateSecFromEpoch(segments[-1][SEGMENT_DATE_END],segments[-1][SEGMENT_TIME_END])
+	return trajectory, initTime, endTime
+
+###############################################################################################################################
+###############################################################################################################################